@@ -0,0 +1,160 @@
+"""
+In-process Bloom filters that answer "definitely not in the table" without a query.
+
+``NegativeLookup`` watches one unique column. It fills a Bloom filter from
+the table on first use, then adds new values when a row is saved. A miss
+means the value certainly does not exist, so callers can skip the query. A
+hit may be a false positive, so callers still run their usual query.
+
+Other processes learn about new values through the default cache: a save
+that inserted or changed the watched value bumps a generation counter after
+commit and stores the value under that generation for ``log_timeout``
+seconds. A filter whose generation is behind adds the values it missed, and
+rebuilds only when they have expired from the cache or it fell more than
+``max_catch_up`` generations behind. Saves that leave the value alone
+publish nothing. That only works when the cache is shared, so
+``settings.NEGATIVE_LOOKUPS`` is off for multi-process deployments that use
+the per-process locmem cache. Deleted and renamed-away values stay in the
+filter as harmless false positives until enough accumulate to trigger a
+rebuild.
+"""
+import hashlib
+import math
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+
+_UNKNOWN = object()
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class NegativeLookup:
+    headroom = 2
+    min_capacity = 1024
+    rebuild_after_removed = 0.1
+    max_catch_up = 1000
+    log_timeout = 3600
+
+    def __init__(self, model_label, field):
+        self.model_label = model_label
+        self.field = field
+        self.generation_key = f'bloom:{model_label}.{field}'
+        self.seen_attr = f'_bloom_seen_{field}'
+        self._lock = threading.Lock()
+        self._filter = None
+        self._generation = None
+        self._count = 0
+        self._capacity = 0
+        self._removed = 0
+        post_init.connect(self._loaded, sender=model_label, weak=False)
+        post_save.connect(self._saved, sender=model_label, weak=False)
+        post_delete.connect(self._deleted, sender=model_label, weak=False)
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def might_exist(self, value):
+        """``False`` only when no row has ``field == value``."""
+        if not settings.NEGATIVE_LOOKUPS or value is None:
+            return True
+        with self._lock:
+            generation = cache.get_or_set(self.generation_key, 0, None)
+            if self._filter is None:
+                self._rebuild(generation)
+            elif generation != self._generation:
+                self._catch_up(generation)
+            return str(value) in self._filter
+
+    def _rebuild(self, generation):
+        values = self.model._default_manager.values_list(self.field, flat=True)
+        self._count = values.count()
+        self._removed = 0
+        self._capacity = max(self._count * self.headroom, self.min_capacity)
+        self._filter = BloomFilter(self._capacity)
+        for value in values.iterator():
+            if value is not None:
+                self._filter.add(str(value))
+        self._generation = generation
+
+    def _catch_up(self, generation):
+        behind = generation - self._generation
+        keys = [self._log_key(number) for number in range(self._generation + 1, generation + 1)]
+        found = cache.get_many(keys) if 0 < behind <= self.max_catch_up else {}
+        if len(found) != behind:
+            self._rebuild(generation)
+            return
+        for value in found.values():
+            self._filter.add(value)
+        self._count += behind
+        self._generation = generation
+        if self._count > self._capacity:
+            self._filter = None
+
+    def _log_key(self, generation):
+        return f'{self.generation_key}:{generation}'
+
+    def _publish(self, value):
+        try:
+            generation = cache.incr(self.generation_key)
+        except ValueError:
+            generation = 1
+            cache.set(self.generation_key, generation, None)
+        cache.set(self._log_key(generation), value, self.log_timeout)
+        with self._lock:
+            # Our own value is already in the local filter; only skip it if nothing else moved.
+            if self._generation is not None and generation == self._generation + 1:
+                self._generation = generation
+
+    def _loaded(self, sender, instance, **kwargs):
+        # Remember the loaded value so a save can tell whether it changed; deferred means unknown.
+        instance.__dict__[self.seen_attr] = instance.__dict__.get(self.field, _UNKNOWN)
+
+    def _saved(self, sender, instance, raw=False, created=False, update_fields=None, **kwargs):
+        if update_fields is not None and self.field not in update_fields:
+            return
+        value = getattr(instance, self.field)
+        seen = instance.__dict__.get(self.seen_attr, _UNKNOWN)
+        instance.__dict__[self.seen_attr] = value
+        if value is None or (not created and seen == value):
+            return
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(str(value))
+                if created:
+                    self._count += 1
+                    if self._count > self._capacity:
+                        self._filter = None
+                else:
+                    self._removed += 1
+        transaction.on_commit(lambda: self._publish(str(value)))
+
+    def _deleted(self, sender, instance, **kwargs):
+        # A stale positive elsewhere only costs the query it would have run anyway.
+        with self._lock:
+            self._removed += 1
+            if self._removed > self._count * self.rebuild_after_removed:
+                self._filter = None
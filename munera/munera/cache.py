@@ -0,0 +1,56 @@
+"""
+Cache configuration from a single URL.
+
+``MUNERA_CACHE_URL`` picks the backend behind Django's cache API, so the
+same code can talk to a shared Redis server in deployment and to an
+in-process or file stand-in locally and in tests:
+
+    redis://[:password@]host:6379/0    shared across workers and hosts
+    file:///var/tmp/munera-cache       shared across workers on one host
+    locmem://[name]                    per process (the default)
+    dummy://                           caches nothing
+"""
+from importlib.util import find_spec
+from urllib.parse import parse_qsl, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+# Backends whose entries every worker process sees.
+SHARED_SCHEMES = ('redis', 'rediss', 'file')
+
+
+def cache_config(url):
+    """Turn a cache URL into a ``CACHES`` entry; ``?timeout=`` and ``?key_prefix=`` are honoured."""
+    parts = urlsplit(url or 'locmem://')
+    if parts.scheme not in BACKENDS:
+        raise ImproperlyConfigured(f"Unsupported cache URL scheme {parts.scheme!r} in {url!r}.")
+
+    config = {'BACKEND': BACKENDS[parts.scheme]}
+    if parts.scheme in ('redis', 'rediss'):
+        # Django imports redis-py on first cache access; fail at startup instead.
+        if find_spec('redis') is None:
+            raise ImproperlyConfigured(f"{url!r} needs the redis package (pip install redis).")
+        config['LOCATION'] = parts._replace(query='').geturl()
+    elif parts.scheme == 'file':
+        config['LOCATION'] = parts.path
+    elif parts.scheme == 'locmem':
+        config['LOCATION'] = parts.netloc or 'munera'
+
+    for key, value in parse_qsl(parts.query):
+        if key == 'timeout':
+            config['TIMEOUT'] = int(value)
+        elif key == 'key_prefix':
+            config['KEY_PREFIX'] = value
+    return config
+
+
+def is_shared(url):
+    return urlsplit(url or 'locmem://').scheme in SHARED_SCHEMES
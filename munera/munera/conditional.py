@@ -0,0 +1,67 @@
+"""
+Conditional GET helpers.
+
+Views build a ``PageValidator`` from a handful of cheap stamps (counts and
+latest ``updated_at`` values gathered in a single query) and return
+``304 Not Modified`` before running their full set of queries and rendering.
+"""
+import hashlib
+from datetime import datetime
+
+from django.contrib.messages import get_messages
+from django.db.models import Subquery, Value
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def stamp(queryset, aggregate):
+    """Wrap ``aggregate`` over ``queryset`` as a scalar subquery."""
+    return Subquery(
+        queryset.order_by()
+        .annotate(stamp_group=Value(1))
+        .values('stamp_group')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+
+
+def collect_stamps(anchor, **stamps):
+    """Evaluate every stamp against the single-row ``anchor`` queryset in one query."""
+    return anchor.order_by().annotate(**stamps).values(*stamps).first() or {}
+
+
+def viewer_parts(user):
+    """Per-user values every page renders through ``base.html`` and the sidebar."""
+    return user.pk, user.theme, user.display_name
+
+
+def has_pending_messages(request):
+    # A cached page would swallow flash messages queued by a redirect.
+    return bool(len(get_messages(request)))
+
+
+class PageValidator:
+    def __init__(self, *parts, last_modified=None):
+        digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+        self.etag = f'"{digest}"'
+        self.last_modified = last_modified
+
+    @classmethod
+    def from_stamps(cls, stamps, *parts):
+        timestamps = [value for value in stamps.values() if isinstance(value, datetime)]
+        return cls(sorted(stamps.items()), *parts, last_modified=max(timestamps, default=None))
+
+    def check(self, request):
+        """Return a ``304`` response when the client's copy is still current, else ``None``."""
+        if has_pending_messages(request):
+            return None
+        last_modified = self.last_modified.timestamp() if self.last_modified else None
+        response = get_conditional_response(request, etag=self.etag, last_modified=last_modified)
+        return self.apply(response) if response is not None else None
+
+    def apply(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified:
+            response['Last-Modified'] = http_date(self.last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,44 @@
+"""
+Write paths that let unique constraints decide instead of checking first.
+
+``exists()`` followed by ``create()`` costs two round trips and still lets
+two concurrent requests both pass the check. Inserting directly and treating
+``IntegrityError`` as "already there" costs one statement and is race-free.
+Inside a transaction the insert gets a savepoint so the failure does not
+poison it (PostgreSQL); in autocommit there is nothing to protect.
+"""
+from django.db import IntegrityError, router, transaction
+from django.db.models import Q
+
+
+def create_unique(model, **fields):
+    """Insert ``model(**fields)``; ``None`` when a unique constraint says the row already exists."""
+    manager = model._default_manager
+    using = router.db_for_write(model)
+    try:
+        if transaction.get_connection(using).in_atomic_block:
+            with transaction.atomic(using=using):
+                return manager.db_manager(using).create(**fields)
+        return manager.db_manager(using).create(**fields)
+    except IntegrityError:
+        return None
+
+
+def clashing_fields(model, **values):
+    """Which of the unique ``values`` are already taken; only worth asking after an insert failed."""
+    query = Q()
+    for field, value in values.items():
+        query |= Q(**{field: value})
+    taken = set()
+    for row in model._default_manager.filter(query).values(*values):
+        taken.update(field for field, value in values.items() if row[field] == value)
+    return taken
+
+
+class AtomicSaveMixin:
+    """Run ``save()`` and its ``post_save`` receivers in one transaction, as ``delete()`` already does."""
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
@@ -0,0 +1,248 @@
+"""
+Token-bucket rate limiting for expensive, guessable endpoints.
+
+Each ``Limit`` names a bucket of ``capacity`` tokens refilled at ``rate``
+tokens per second and a function deriving the bucket key from the request
+(client IP, submitted username, ...). ``rate_limit`` checks every limit
+before the view runs, so a rejected request costs a counter update rather
+than a password hash or a query.
+
+Buckets live in ``settings.RATELIMIT_STORE``: ``memory`` keeps them in this
+process, ``cache`` keeps them in the default cache so every worker shares
+them. Both count allowed and rejected requests per limit for monitoring.
+
+Client IPs come from ``REMOTE_ADDR``. Behind a reverse proxy that is the
+proxy's address, so every client would share one bucket: set
+``settings.RATELIMIT_PROXY_COUNT`` to the number of proxies in front of the
+app and the address they appended to ``X-Forwarded-For`` is used instead.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+_registry = {}
+
+
+class Limit:
+    def __init__(self, name, capacity, per, key):
+        """Allow ``capacity`` requests per ``per`` seconds for each value of ``key(request)``."""
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / per
+        self.key = key
+        _registry[name] = self
+
+    def bucket_key(self, request):
+        value = self.key(request)
+        if not value:
+            return None
+        digest = hashlib.blake2b(str(value).lower().encode(), digest_size=12).hexdigest()
+        return f'ratelimit:{self.name}:{digest}'
+
+
+def _refill(state, limit, now):
+    tokens, updated = state if state else (limit.capacity, now)
+    return min(limit.capacity, tokens + (now - updated) * limit.rate)
+
+
+def _wait(state, limit, now):
+    """Seconds until the bucket holds a token, without taking one."""
+    tokens = _refill(state, limit, now)
+    return 0 if tokens >= 1 else (1 - tokens) / limit.rate
+
+
+def _consume(state, limit, now):
+    """Return ``(new_state, retry_after)``; ``retry_after`` is 0 when a token was taken."""
+    tokens = _refill(state, limit, now)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / limit.rate
+
+
+class MemoryStore:
+    """Buckets in this process.
+
+    A bucket that has refilled to capacity behaves like a missing one, so
+    once the map doubles in size the full buckets are swept out. Memory then
+    follows the keys seen in the last refill period instead of every IP and
+    username ever submitted.
+    """
+    sweep_after = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._full_at = {}
+        self._next_sweep = self.sweep_after
+        self._counts = Counter()
+
+    def consume(self, key, limit, now):
+        with self._lock:
+            state, retry_after = _consume(self._buckets.get(key), limit, now)
+            self._buckets[key] = state
+            self._full_at[key] = now + (limit.capacity - state[0]) / limit.rate
+            if len(self._buckets) >= self._next_sweep:
+                self._sweep(now)
+        return retry_after
+
+    def _sweep(self, now):
+        for key in [key for key, full_at in self._full_at.items() if full_at <= now]:
+            del self._buckets[key], self._full_at[key]
+        self._next_sweep = max(self.sweep_after, 2 * len(self._buckets))
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def peek(self, key, limit, now):
+        with self._lock:
+            return _wait(self._buckets.get(key), limit, now)
+
+    def record(self, name, outcome):
+        with self._lock:
+            self._counts[name, outcome] += 1
+
+    def counts(self, name, outcome):
+        return self._counts[name, outcome]
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._full_at.clear()
+            self._next_sweep = self.sweep_after
+            self._counts.clear()
+
+
+class CacheStore:
+    """Buckets in the shared cache. Concurrent requests may race on one bucket and overshoot by a token or two."""
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def consume(self, key, limit, now):
+        state, retry_after = _consume(self.cache.get(key), limit, now)
+        self.cache.set(key, state, math.ceil(limit.capacity / limit.rate) + 1)
+        return retry_after
+
+    def peek(self, key, limit, now):
+        return _wait(self.cache.get(key), limit, now)
+
+    def record(self, name, outcome):
+        key = f'ratelimit-count:{name}:{outcome}'
+        if not self.cache.add(key, 1, None):
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, 1, None)
+
+    def counts(self, name, outcome):
+        return self.cache.get(f'ratelimit-count:{name}:{outcome}', 0)
+
+    def reset(self):
+        self.cache.delete_many([
+            f'ratelimit-count:{name}:{outcome}' for name in _registry for outcome in ('allowed', 'rejected')
+        ])
+
+
+_stores = {}
+
+
+def get_store():
+    kind = settings.RATELIMIT_STORE
+    if kind not in _stores:
+        _stores[kind] = MemoryStore() if kind == 'memory' else CacheStore()
+    return _stores[kind]
+
+
+def stats():
+    """``{limit name: {'allowed': n, 'rejected': n}}`` for every declared limit."""
+    store = get_store()
+    return {
+        name: {outcome: store.counts(name, outcome) for outcome in ('allowed', 'rejected')}
+        for name in sorted(_registry)
+    }
+
+
+def client_ip(request):
+    """``REMOTE_ADDR``, or the address the outermost trusted proxy saw when ``RATELIMIT_PROXY_COUNT`` is set."""
+    proxies = settings.RATELIMIT_PROXY_COUNT
+    if proxies:
+        # Each proxy appends the address it received from; anything before that is client-supplied.
+        forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR')
+
+
+def too_many_requests(request, retry_after):
+    response = HttpResponse("Too many attempts. Please wait and try again.", status=429, content_type='text/plain')
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+
+def _clock(store):
+    return time.monotonic() if isinstance(store, MemoryStore) else time.time()
+
+
+def check(request, limits):
+    """Take a token from each limit's bucket; return the longest wait if any bucket was empty."""
+    if not settings.RATELIMIT_ENABLED:
+        return 0
+    store = get_store()
+    now = _clock(store)
+    retry_after = 0
+    for limit in limits:
+        key = limit.bucket_key(request)
+        if key is None:
+            continue
+        wait = store.consume(key, limit, now)
+        store.record(limit.name, 'rejected' if wait else 'allowed')
+        retry_after = max(retry_after, wait)
+    return retry_after
+
+
+def exhausted(request, limits):
+    """The longest wait among ``limits`` whose bucket is empty, taking no tokens.
+
+    For limits charged only when an attempt fails: call this before the
+    attempt and ``check`` after a failure, so successful requests never
+    spend a token.
+    """
+    if not settings.RATELIMIT_ENABLED:
+        return 0
+    store = get_store()
+    now = _clock(store)
+    retry_after = 0
+    for limit in limits:
+        key = limit.bucket_key(request)
+        if key is None:
+            continue
+        wait = store.peek(key, limit, now)
+        if wait:
+            store.record(limit.name, 'rejected')
+        retry_after = max(retry_after, wait)
+    return retry_after
+
+
+def rate_limit(*limits, methods=('POST',), on_reject=too_many_requests):
+    """View decorator; use ``method_decorator(rate_limit(...), name='post')`` on class-based views."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods:
+                retry_after = check(request, limits)
+                if retry_after:
+                    return on_reject(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,90 @@
+"""
+Read-replica routing.
+
+Views opt in with ``use_replica = True``. For safe requests to those views
+``ReplicaRoutingMiddleware`` points ORM reads at ``settings.REPLICA_DATABASE``;
+every write still goes to ``default``. A request that writes leaves a short
+lived cookie behind, and while it is present that browser's reads stay on the
+primary so users always see their own changes despite replication lag.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_COOKIE = 'munera_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingState:
+    __slots__ = ('read_alias', 'wrote')
+
+    def __init__(self, read_alias=None):
+        self.read_alias = read_alias
+        self.wrote = False
+
+
+_state = ContextVar('munera_routing', default=None)
+
+
+@contextmanager
+def routing(read_alias=None):
+    """Route reads inside the block to ``read_alias`` and record whether anything wrote."""
+    state = RoutingState(read_alias)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        # Once the request has written (select_for_update counts), read it back from the primary.
+        if state is None or state.wrote:
+            return None
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+def _wants_replica(view_func):
+    view_class = getattr(view_func, 'view_class', None)
+    return getattr(view_class, 'use_replica', getattr(view_func, 'use_replica', False))
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routing() as state:
+            request._routing = state
+            response = self.get_response(request)
+        if state.wrote:
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        alias = getattr(settings, 'REPLICA_DATABASE', None)
+        if (
+            alias
+            and request.method in SAFE_METHODS
+            and STICKY_COOKIE not in request.COOKIES
+            and _wants_replica(view_func)
+        ):
+            request._routing.read_alias = alias
@@ -0,0 +1,36 @@
+"""
+Session engines that coalesce writes.
+
+Django saves a session whenever it was *modified*, which includes assigning a
+key the value it already had (``request.session['user_id'] = user.pk`` on
+every login). These engines remember a digest of the data as loaded and
+skip the backend write when the data is unchanged. Use them as ``SESSION_ENGINE``:
+
+    munera.sessions.cache            sessions live in the cache only
+    munera.sessions.cached_db        cache in front of ``django_session``
+    munera.sessions.signed_cookies   no server-side storage at all
+"""
+import hashlib
+
+
+class CoalescingSessionMixin:
+    _loaded_digest = None
+
+    def _digest(self, data):
+        return hashlib.blake2b(self.serializer().dumps(data), digest_size=16).digest()
+
+    def load(self):
+        data = super().load()
+        self._loaded_digest = self._digest(data)
+        return data
+
+    def is_unchanged(self):
+        if self._loaded_digest is None or self.session_key is None:
+            return False
+        return self._digest(self._session) == self._loaded_digest
+
+    def save(self, must_create=False):
+        if not must_create and self.is_unchanged():
+            return
+        super().save(must_create=must_create)
+        self._loaded_digest = self._digest(self._session)
@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends import signed_cookies
+
+from . import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, signed_cookies.SessionStore):
+    pass
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from munera.cache import cache_config, is_shared
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -20,13 +22,20 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
+# Set MUNERA_ENV=production to run with DEBUG off and cached, compiled templates.
+MUNERA_ENV = os.environ.get('MUNERA_ENV', 'development')
+PRODUCTION = MUNERA_ENV == 'production'
+
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-orr7b8xp(*t9@eq*a8a5^&92u--z9mz6@b7*@u&_^e4*xs$!a('
+SECRET_KEY = os.environ.get(
+    'MUNERA_SECRET_KEY',
+    'django-insecure-orr7b8xp(*t9@eq*a8a5^&92u--z9mz6@b7*@u&_^e4*xs$!a(',
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = not PRODUCTION
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('MUNERA_ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -59,7 +68,7 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
+        'APP_DIRS': not PRODUCTION,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
@@ -70,6 +79,35 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    # Parse each template once per process and reuse the compiled node tree.
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
+# Set MUNERA_TEMPLATE_PROFILING=1 to time every {% for %}/{% include %} and flag lazy loops.
+TEMPLATE_PROFILING = os.environ.get('MUNERA_TEMPLATE_PROFILING') == '1'
+
+if TEMPLATE_PROFILING:
+    MIDDLEWARE.insert(0, 'munera.template_profiler.TemplateProfilerMiddleware')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'munera.templates': {
+            'handlers': ['console'],
+            'level': 'DEBUG' if TEMPLATE_PROFILING else 'WARNING',
+        },
+    },
+}
+
 WSGI_APPLICATION = 'munera.wsgi.application'
 
 
@@ -83,6 +121,73 @@ DATABASES = {
     }
 }
 
+# Set MUNERA_REPLICA_DB (a second SQLite file locally) to send reads from views
+# marked use_replica there. Writes always go to 'default', and a user's reads
+# stick to it for REPLICA_STICKY_SECONDS after they write.
+REPLICA_DATABASE = None
+REPLICA_STICKY_SECONDS = int(os.environ.get('MUNERA_REPLICA_STICKY_SECONDS', 15))
+DATABASE_ROUTERS = ['munera.routers.ReplicaRouter']
+
+if os.environ.get('MUNERA_REPLICA_DB'):
+    REPLICA_DATABASE = 'replica'
+    DATABASES[REPLICA_DATABASE] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['MUNERA_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware'),
+                      'munera.routers.ReplicaRoutingMiddleware')
+
+# Change feed cursors (projects.changes) stay this many seconds behind the
+# newest entry, so entries whose transaction commits out of seq order are
+# read again. SQLite serializes writers, so seq is already commit order there.
+CHANGE_FEED_SETTLE_SECONDS = int(os.environ.get(
+    'MUNERA_CHANGE_FEED_SETTLE_SECONDS',
+    0 if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3' else 10,
+))
+
+
+# Cache and sessions
+# MUNERA_CACHE_URL: redis://host:6379/0, file:///path, locmem:// (default) or dummy://
+
+CACHE_URL = os.environ.get('MUNERA_CACHE_URL', 'locmem://')
+
+CACHES = {
+    'default': cache_config(CACHE_URL),
+}
+
+# Sessions live only in the cache when it is shared between workers; otherwise
+# the cache fronts django_session so reads skip SQLite. Unchanged sessions are
+# never written back. MUNERA_SESSION_STORE may force cache, cached_db,
+# signed_cookies (no server-side storage) or db.
+SESSION_STORE = os.environ.get('MUNERA_SESSION_STORE') or ('cache' if is_shared(CACHE_URL) else 'cached_db')
+
+if SESSION_STORE == 'db':
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+else:
+    SESSION_ENGINE = f'munera.sessions.{SESSION_STORE}'
+
+# Token buckets for login and join attempts: 'memory' (this process) or 'cache' (shared).
+RATELIMIT_ENABLED = os.environ.get('MUNERA_RATELIMIT', '1') == '1'
+RATELIMIT_STORE = os.environ.get('MUNERA_RATELIMIT_STORE') or ('cache' if is_shared(CACHE_URL) else 'memory')
+# Reverse proxies in front of the app; each must append to X-Forwarded-For.
+# Left at 0 behind a proxy, every client shares the proxy's per-IP bucket.
+RATELIMIT_PROXY_COUNT = int(os.environ.get('MUNERA_RATELIMIT_PROXY_COUNT', '0'))
+
+# Bloom filters over org codes and usernames (munera.bloom). They need a
+# shared cache to hear about other workers' inserts, so stay off for
+# multi-process production deployments on the per-process locmem cache.
+NEGATIVE_LOOKUPS = os.environ.get('MUNERA_NEGATIVE_LOOKUPS', '1' if is_shared(CACHE_URL) or not PRODUCTION else '0') == '1'
+
+# Outgoing mail. `manage.py send_digests` defaults to this backend; set
+# MUNERA_EMAIL_FILE_PATH to write messages to files instead of the console.
+DEFAULT_FROM_EMAIL = os.environ.get('MUNERA_FROM_EMAIL', 'munera@localhost')
+EMAIL_FILE_PATH = os.environ.get('MUNERA_EMAIL_FILE_PATH')
+EMAIL_BACKEND = os.environ.get('MUNERA_EMAIL_BACKEND') or (
+    'django.core.mail.backends.filebased.EmailBackend' if EMAIL_FILE_PATH
+    else 'django.core.mail.backends.console.EmailBackend'
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -125,6 +230,20 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+# collectstatic writes minified, content-hashed files (plus .gz/.br siblings) here.
+STATIC_ROOT = os.environ.get('MUNERA_STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+if PRODUCTION:
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'munera.staticfiles.CompressedManifestStaticFilesStorage'},
+    }
+
+# Set MUNERA_SERVE_STATIC=1 when no front proxy serves STATIC_ROOT.
+if os.environ.get('MUNERA_SERVE_STATIC') == '1':
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+                      'munera.staticfiles.StaticAssetMiddleware')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
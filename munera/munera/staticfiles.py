@@ -0,0 +1,139 @@
+"""
+Static asset pipeline.
+
+``CompressedManifestStaticFilesStorage`` extends Django's manifest storage so
+``collectstatic`` minifies CSS/JS, writes content-hashed names and leaves
+precompressed ``.gz`` and ``.br`` siblings next to them. ``StaticAssetMiddleware``
+serves the result with far-future immutable caching for deployments without
+a front proxy.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+import brotli
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map')
+MIN_COMPRESS_SIZE = 256
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,])\s*')
+
+
+def minify_css(source):
+    source = _CSS_COMMENT_RE.sub('', source)
+    source = _CSS_SPACE_RE.sub(' ', source)
+    source = _CSS_PUNCTUATION_RE.sub(r'\1', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """Whitespace-only pass: drops indentation, blank lines and whole-line ``//`` comments."""
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//')) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def _save(self, name, content):
+        minify = MINIFIERS.get(os.path.splitext(name)[1])
+        if minify and not name.endswith(('.min.css', '.min.js')):
+            content.seek(0)
+            try:
+                source = content.read().decode('utf-8')
+            except UnicodeDecodeError:
+                content.seek(0)
+            else:
+                content = ContentFile(minify(source).encode('utf-8'))
+        return super()._save(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as handle:
+            data = handle.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        encoders = [
+            ('.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0)),
+            ('.br', lambda raw: brotli.compress(raw, quality=11)),
+        ]
+        for suffix, encode in encoders:
+            compressed = encode(data)
+            if len(compressed) < len(data):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                super()._save(name + suffix, ContentFile(compressed))
+
+
+class StaticAssetMiddleware:
+    """Serve ``STATIC_ROOT`` in-process, preferring precompressed siblings."""
+
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT)
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        immutable = bool(HASHED_NAME_RE.search(name))
+        etag = f'"{name}"' if immutable else None
+        if etag and request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+        else:
+            encoding, served_path = self.negotiate(request, path)
+            content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            response = FileResponse(open(served_path, 'rb'), content_type=content_type)
+            if encoding:
+                response['Content-Encoding'] = encoding
+            if etag:
+                response['ETag'] = etag
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if immutable:
+            response['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+        return response
+
+    def negotiate(self, request, path):
+        accepted = request.headers.get('Accept-Encoding', '')
+        for encoding, suffix in self.encodings:
+            if encoding in accepted and os.path.isfile(path + suffix):
+                return encoding, path + suffix
+        return None, path
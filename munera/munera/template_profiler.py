@@ -0,0 +1,191 @@
+"""
+Template render profiler.
+
+When ``TEMPLATE_PROFILING`` is on, ``TemplateProfilerMiddleware`` wraps every
+``{% for %}`` and ``{% include %}`` render and attributes wall time and query
+count to it. Loops whose body issues at least one query per iteration are
+reported as lazy relation access (e.g. ``membership.user`` without
+``select_related``). Results go to the ``munera.templates`` logger and a
+``Server-Timing`` response header.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template.base import NodeList
+from django.template.defaulttags import ForNode
+from django.template.loader_tags import IncludeNode
+
+logger = logging.getLogger('munera.templates')
+
+_local = threading.local()
+_installed = False
+
+
+class BlockStats:
+    __slots__ = ('label', 'calls', 'seconds', 'queries', 'iterations', 'body_queries')
+
+    def __init__(self, label):
+        self.label = label
+        self.calls = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.iterations = 0
+        self.body_queries = 0
+
+    @property
+    def is_lazy_loop(self):
+        return self.iterations > 1 and self.body_queries >= self.iterations
+
+
+class RenderProfile:
+    def __init__(self):
+        self.queries = 0
+        self.blocks = {}
+        self.stack = []
+
+    def block(self, node):
+        key = id(node)
+        if key not in self.blocks:
+            self.blocks[key] = BlockStats(_label(node))
+        return self.blocks[key]
+
+    def lazy_loops(self):
+        return [stats for stats in self.blocks.values() if stats.is_lazy_loop]
+
+    def slowest(self, limit=10):
+        return sorted(self.blocks.values(), key=lambda stats: stats.seconds, reverse=True)[:limit]
+
+
+class _Frame:
+    __slots__ = ('iterations', 'body_start')
+
+    def __init__(self):
+        self.iterations = 0
+        self.body_start = None
+
+
+class _LoopBody(NodeList):
+    """Replaces ``ForNode.nodelist_loop``; ``ForNode`` walks it once per iteration."""
+
+    def __iter__(self):
+        profile = current_profile()
+        if profile is not None and profile.stack:
+            frame = profile.stack[-1]
+            if frame.iterations == 0:
+                frame.body_start = profile.queries
+            frame.iterations += 1
+        return super().__iter__()
+
+
+def _label(node):
+    origin = getattr(node, 'origin', None)
+    name = getattr(origin, 'template_name', None) or '<unknown>'
+    token = getattr(node, 'token', None)
+    if token is None:
+        return f'{name} {node.__class__.__name__}'
+    return f'{name}:{token.lineno} {{% {token.contents} %}}'
+
+
+def current_profile():
+    return getattr(_local, 'profile', None)
+
+
+def _profiled(render):
+    def wrapper(node, context):
+        profile = current_profile()
+        if profile is None:
+            return render(node, context)
+
+        if isinstance(node, ForNode) and not isinstance(node.nodelist_loop, _LoopBody):
+            body = _LoopBody(node.nodelist_loop)
+            body.contains_nontext = node.nodelist_loop.contains_nontext
+            node.nodelist_loop = body
+
+        frame = _Frame()
+        profile.stack.append(frame)
+        queries_before = profile.queries
+        started = time.perf_counter()
+        try:
+            return render(node, context)
+        finally:
+            profile.stack.pop()
+            stats = profile.block(node)
+            stats.calls += 1
+            stats.seconds += time.perf_counter() - started
+            stats.queries += profile.queries - queries_before
+            stats.iterations += frame.iterations
+            if frame.body_start is not None:
+                stats.body_queries += profile.queries - frame.body_start
+
+    return wrapper
+
+
+def install():
+    """Patch ``ForNode`` and ``IncludeNode`` once; the wrappers are inert outside a profile."""
+    global _installed
+    if _installed:
+        return
+    ForNode.render = _profiled(ForNode.render)
+    IncludeNode.render = _profiled(IncludeNode.render)
+    _installed = True
+
+
+@contextmanager
+def profile_rendering():
+    """Collect a ``RenderProfile`` for everything rendered inside the block."""
+    install()
+    profile = RenderProfile()
+
+    def count_query(execute, sql, params, many, context):
+        profile.queries += 1
+        return execute(sql, params, many, context)
+
+    previous = current_profile()
+    _local.profile = profile
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(count_query))
+            yield profile
+    finally:
+        _local.profile = previous
+
+
+class TemplateProfilerMiddleware:
+    max_timing_entries = 10
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):
+        with profile_rendering() as profile:
+            response = self.get_response(request)
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                response.render()
+
+        if profile.blocks:
+            self.report(request, response, profile)
+        return response
+
+    def report(self, request, response, profile):
+        entries = []
+        for index, stats in enumerate(profile.slowest(self.max_timing_entries)):
+            description = stats.label.replace('"', "'")
+            entries.append(
+                f'tpl{index};dur={stats.seconds * 1000:.2f};desc="{description} ({stats.queries}q)"'
+            )
+            logger.debug(
+                "%s %s: %.2fms, %d queries, %d calls",
+                request.path, stats.label, stats.seconds * 1000, stats.queries, stats.calls,
+            )
+        response['Server-Timing'] = ', '.join(entries)
+
+        for stats in profile.lazy_loops():
+            logger.warning(
+                "%s %s issued %d queries over %d iterations; the loop body is loading relations lazily.",
+                request.path, stats.label, stats.body_queries, stats.iterations,
+            )
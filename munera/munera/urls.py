@@ -19,11 +19,14 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from projects.views import ChangeFeedView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('users.urls')),
     path('organizations/', include('organization.urls')),
     path('projects/', include(('projects.urls', 'projects'), namespace='projects')),
+    path('changes/', ChangeFeedView.as_view(), name='changes'),
 ]
 
 if settings.DEBUG:
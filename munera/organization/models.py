@@ -2,6 +2,8 @@ from django.db import models
 from django.db.models import CASCADE
 from django.conf import settings
 
+from munera.integrity import AtomicSaveMixin
+
 class Role(models.TextChoices):
     Member = "Member"
     Manager = "Manager"
@@ -18,7 +20,7 @@ class Organization(models.Model):
     def __str__(self):
         return f"{self.org_name}"
 
-class OrganizationMember(models.Model):
+class OrganizationMember(AtomicSaveMixin, models.Model):
     organization = models.ForeignKey(Organization, on_delete=CASCADE, related_name="memberships")
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=CASCADE, related_name="organization_memberships")
     role = models.CharField(max_length=7, default=Role.Member, choices=Role.choices, help_text="Role Of User", verbose_name="Role")
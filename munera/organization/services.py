@@ -0,0 +1,4 @@
+from munera.bloom import NegativeLookup
+
+# Answers "no such organization code" for join attempts and code generation without a query.
+org_codes = NegativeLookup('organization.Organization', 'org_code')
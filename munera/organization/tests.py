@@ -1,3 +1,139 @@
-from django.test import TestCase
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from munera import ratelimit
+from munera.bloom import BloomFilter
+from projects.models import Project, Status
+from projects.tests import ProjectTestCase, counting_conflicts, logged_in_client, make_user, post_concurrently
+from .models import Organization, OrganizationMember, Role
+from .services import org_codes
+
+
+class OrganizationDetailTests(TestCase):
+    def setUp(self):
+        self.manager = make_user('manager')
+        self.member = make_user('member')
+        self.organization = Organization.objects.create(
+            org_creator=self.manager, org_name='Acme', org_code='ACME1234'
+        )
+        OrganizationMember.objects.create(organization=self.organization, user=self.manager, role=Role.Manager)
+        OrganizationMember.objects.create(organization=self.organization, user=self.member, role=Role.Member)
+        session = self.client.session
+        session['user_id'] = self.manager.pk
+        session.save()
+
+    def test_role_change_invalidates_cached_page(self):
+        url = reverse('organization_detail', args=[self.organization.org_id])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        OrganizationMember.objects.filter(user=self.member).update(role=Role.Manager)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_member_rename_invalidates_cached_page(self):
+        url = reverse('organization_detail', args=[self.organization.org_id])
+        etag = self.client.get(url)['ETag']
+        self.member.alias, self.member.display_name_preference = 'Sam', 'alias'
+        self.member.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Sam')
+
+
+class NegativeLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ratelimit.get_store().reset()
+        self.manager = make_user('manager')
+        Organization.objects.create(org_creator=self.manager, org_name='Acme', org_code='ACME1234')
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        codes = [f'CODE{i:04d}' for i in range(1000)]
+        for code in codes:
+            bloom.add(code)
+        self.assertTrue(all(code in bloom for code in codes))
+        false_positives = sum(f'MISS{i:04d}' in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_unknown_codes_are_rejected_without_a_lookup(self):
+        self.assertTrue(org_codes.might_exist('ACME1234'))
+        with self.assertNumQueries(0):
+            self.assertFalse(org_codes.might_exist('NOPE0000'))
+
+        other = make_user('other')
+        session = self.client.session
+        session['user_id'] = other.pk
+        session.save()
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('join_organization'), {'org_code': 'NOPE0000'})
+        self.assertRedirects(response, reverse('my_organizations'), fetch_redirect_response=False)
+
+        Organization.objects.create(org_creator=other, org_name='Beta', org_code='BETA0001')
+        self.assertTrue(org_codes.might_exist('BETA0001'))
+        self.client.post(reverse('join_organization'), {'org_code': 'BETA0001'})
+        self.assertTrue(OrganizationMember.objects.filter(user=other, organization__org_code='BETA0001').exists())
+
+
+class TimelineTests(ProjectTestCase):
+    def test_columnar_payload_is_clipped_and_revalidated(self):
+        today = date.today()
+        self.project.start_date, self.project.end_date = today - timedelta(days=400), today + timedelta(days=10)
+        self.project.save()
+        Project.objects.create(organization=self.organization, created_by=self.manager, project_name='Done',
+                               end_date=today - timedelta(days=200))
+        launch = self.make_task('Launch', due_date=today + timedelta(days=5))
+        self.make_task('Kickoff', due_date=today - timedelta(days=399))
+        self.login(self.manager)
+        url = reverse('organization_timeline', args=[self.organization.org_id])
+
+        # User, organization, membership and stamps, then one query each for bars and milestones.
+        window = {'start': today.isoformat(), 'end': (today + timedelta(days=30)).isoformat()}
+        with self.assertNumQueries(6):
+            response = self.client.get(url, window)
+        payload = response.json()
+        self.assertEqual(payload['projects'], {'id': [self.project.pk], 'name': ['Website'], 'start': [0], 'end': [10]})
+        self.assertEqual(payload['milestones']['id'], [launch.pk])
+        self.assertEqual(payload['milestones']['due'], [5])
+        self.assertEqual(payload['statuses'][payload['milestones']['status'][0]], Status.ToDo)
+
+        self.assertEqual(self.client.get(url, window, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        launch.status = Status.Done
+        launch.save()
+        self.assertEqual(self.client.get(url, window, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+class DuplicateJoinTests(TransactionTestCase):
+    def setUp(self):
+        ratelimit.get_store().reset()
+        self.manager = make_user('manager')
+        self.member = make_user('member')
+        self.organization = Organization.objects.create(
+            org_creator=self.manager, org_name='Acme', org_code='ACME1234'
+        )
+
+    def join(self, client):
+        return client.post(reverse('join_organization'), {'org_code': 'ACME1234'})
+
+    def test_join_is_one_insert(self):
+        client = logged_in_client(self.member)
+        org_codes.might_exist('ACME1234')
+        # User and organization lookups, then BEGIN, the INSERT and its change-feed entry, COMMIT;
+        # the duplicate check is the unique constraint.
+        with self.assertNumQueries(6):
+            self.join(client)
+        self.join(client)
+        self.assertEqual(OrganizationMember.objects.filter(user=self.member).count(), 1)
+
+    def test_parallel_duplicate_joins_create_one_membership(self):
+        clients = [logged_in_client(self.member) for _ in range(4)]
+        with counting_conflicts('organization.views.create_unique') as conflicts:
+            statuses = post_concurrently(clients, reverse('join_organization'), {'org_code': 'ACME1234'})
+
+        self.assertEqual(statuses, [302] * len(clients))
+        self.assertEqual(set(conflicts), {OrganizationMember})
+        self.assertGreaterEqual(len(conflicts), len(clients) - 1)
+        self.assertEqual(OrganizationMember.objects.filter(user=self.member).count(), 1)
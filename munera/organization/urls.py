@@ -6,6 +6,9 @@ from .views import (
     CreateOrganizationView,
     DeleteOrganizationView,
     OrganizationDetailView,
+    OrganizationAnalyticsView,
+    OrganizationTimelineView,
+    OrganizationTimeReportView,
     OrganizationMemberRoleUpdateView,
 )
 
@@ -14,6 +17,9 @@ urlpatterns = [
     path('create/', CreateOrganizationView.as_view(), name='create_organization'),
     path('join/', JoinOrganizationView.as_view(), name='join_organization'),
     path('detail/<int:org_id>/', OrganizationDetailView.as_view(), name='organization_detail'),
+    path('analytics/<int:org_id>/', OrganizationAnalyticsView.as_view(), name='organization_analytics'),
+    path('timeline/<int:org_id>/', OrganizationTimelineView.as_view(), name='organization_timeline'),
+    path('time/<int:org_id>/', OrganizationTimeReportView.as_view(), name='organization_time_report'),
     path('leave/<int:org_id>/', LeaveOrganizationView.as_view(), name='leave_organization'),
     path('delete/<int:org_id>/', DeleteOrganizationView.as_view(), name='delete_organization'),
     path('<int:org_id>/members/<int:user_id>/role/', OrganizationMemberRoleUpdateView.as_view(), name='update_member_role'),
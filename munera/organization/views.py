@@ -1,14 +1,25 @@
 from django.contrib import messages
-from django.db.models import Count, Q, F
-from django.http import HttpResponseForbidden
+from django.db.models import Count, Max, Q, F, Sum
+from django.http import HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.decorators import method_decorator
 from django.views import View
+from datetime import date
 import secrets
 import string
 
-from projects.models import Project, ProjectMember, Task, Status
+from munera import ratelimit
+from munera.integrity import create_unique
+from munera.conditional import PageValidator, collect_stamps, stamp, viewer_parts
+from projects.analytics import cached_report
+from projects.schedule import parse_anchor, timeline_payload, timeline_window
+from projects.timesheets import report_window, time_report
+from projects.models import Project, ProjectMember, Task, TaskAssignment, Status
+from projects.services import my_tasks
 from .models import Organization, OrganizationMember, Role
+from .services import org_codes
 from users.models import User
+from users.services import member_cards
 
 
 def get_session_user(request):
@@ -37,6 +48,18 @@ class MyOrganizationsView(View):
         })
 
 
+JOIN_LIMITS = (
+    ratelimit.Limit('join:ip', capacity=30, per=600, key=ratelimit.client_ip),
+    ratelimit.Limit('join:user', capacity=10, per=600, key=lambda request: request.session.get('user_id')),
+)
+
+
+def join_throttled(request, retry_after):
+    messages.error(request, "Too many organization code attempts. Please wait a few minutes and try again.")
+    return redirect('my_organizations')
+
+
+@method_decorator(ratelimit.rate_limit(*JOIN_LIMITS, on_reject=join_throttled), name='post')
 class JoinOrganizationView(View):
     
     def get(self, request):
@@ -53,22 +76,17 @@ class JoinOrganizationView(View):
             messages.error(request, "Please enter an organization code.")
             return redirect('my_organizations')
         
-        try:
-            organization = Organization.objects.get(org_code=org_code)
-        except Organization.DoesNotExist:
+        organization = None
+        if org_codes.might_exist(org_code):
+            organization = Organization.objects.filter(org_code=org_code).first()
+        if organization is None:
             messages.error(request, "Invalid organization code. Please check the code and try again.")
             return redirect('my_organizations')
         
-        if OrganizationMember.objects.filter(organization=organization, user=user).exists():
+        if create_unique(OrganizationMember, organization=organization, user=user, role=Role.Member) is None:
             messages.warning(request, f"You are already a member of '{organization.org_name}'.")
             return redirect('my_organizations')
         
-        OrganizationMember.objects.create(
-            organization=organization,
-            user=user,
-            role=Role.Member
-        )
-        
         messages.success(request, f"You have successfully joined '{organization.org_name}'!")
         return redirect('my_organizations')
 
@@ -173,35 +191,31 @@ class CreateOrganizationView(View):
         characters = string.ascii_uppercase + string.digits
         while True:
             org_code = ''.join(secrets.choice(characters) for _ in range(length))
-            if not Organization.objects.filter(org_code=org_code).exists():
+            if not org_codes.might_exist(org_code) or not Organization.objects.filter(org_code=org_code).exists():
                 return org_code
 
 
 class OrganizationDetailView(View):
     template_name = 'organization/organization_detail.html'
+    use_replica = True
 
     def get(self, request, org_id):
         user = get_session_user(request)
         if not user:
             return redirect('login')
 
-        organization = get_object_or_404(
-            Organization.objects.prefetch_related('memberships__user'),
-            org_id=org_id,
-            members=user
-        )
+        organization = get_object_or_404(Organization, org_id=org_id, members=user)
         membership = OrganizationMember.objects.filter(organization=organization, user=user).first()
+
+        validator = self.get_validator(organization, membership, user)
+        cached = validator.check(request)
+        if cached:
+            return cached
+
         projects = organization.projects.all().annotate(
-            open_tasks=Count('tasks', filter=~Q(tasks__status=Status.Done))
-        ).select_related('organization')
-        manager_task_filter = Q(
-            project__organization=organization,
-            project__memberships__user=user,
-            project__memberships__role=ProjectMember.Role.MANAGER.value,
-        )
-        my_tasks = Task.objects.filter(
-            Q(project__organization=organization, assignments__user=user) | manager_task_filter
-        ).select_related('project').distinct().order_by(F('due_date').asc(nulls_last=True))
+            open_tasks=Count('tasks', filter=Q(tasks__archived_at__isnull=True) & ~Q(tasks__status=Status.Done))
+        ).select_related('organization').defer('project_desc', 'desc_html')
+        tasks = my_tasks(user).filter(project__organization=organization).select_related('project')
         is_org_manager = membership and membership.role == Role.Manager
 
         context = {
@@ -210,10 +224,99 @@ class OrganizationDetailView(View):
             'membership': membership,
             'is_org_manager': is_org_manager,
             'projects': projects,
-            'member_list': organization.memberships.select_related('user'),
-            'my_tasks': my_tasks,
+            'member_list': member_cards(organization.memberships.all()),
+            'my_tasks': tasks.order_by(F('due_date').asc(nulls_last=True)),
         }
-        return render(request, self.template_name, context)
+        return validator.apply(render(request, self.template_name, context))
+
+    def get_validator(self, organization, membership, user):
+        members = OrganizationMember.objects.filter(organization=organization)
+        projects = Project.objects.filter(organization=organization)
+        tasks = Task.objects.filter(project__organization=organization)
+        stamps = collect_stamps(
+            Organization.objects.filter(pk=organization.pk),
+            member_count=stamp(members, Count('pk')),
+            manager_sum=stamp(members.filter(role=Role.Manager), Sum('user_id')),
+            member_updated=stamp(members, Max('user__updated_at')),
+            project_count=stamp(projects, Count('pk')),
+            project_updated=stamp(projects, Max('updated_at')),
+            task_count=stamp(tasks, Count('pk')),
+            task_updated=stamp(tasks, Max('updated_at')),
+            assigned_count=stamp(
+                TaskAssignment.objects.filter(user=user, task__project__organization=organization), Count('pk')
+            ),
+            managed_sum=stamp(
+                ProjectMember.objects.filter(
+                    user=user, project__organization=organization, role=ProjectMember.Role.MANAGER.value
+                ),
+                Sum('project_id'),
+            ),
+        )
+        return PageValidator.from_stamps(stamps, membership.role, *viewer_parts(user))
+
+
+class OrganizationAnalyticsView(View):
+    def get(self, request, org_id):
+        user = get_session_user(request)
+        if not user:
+            return redirect('login')
+
+        organization = get_object_or_404(Organization, org_id=org_id)
+        if not OrganizationMember.objects.filter(organization=organization, user=user, role=Role.Manager).exists():
+            return JsonResponse({'error': "Only organization managers can view analytics."}, status=403)
+
+        tasks = Task.objects.filter(project__organization=organization)
+        return JsonResponse(cached_report(f'organization:{organization.pk}', tasks, date.today()))
+
+
+class OrganizationTimelineView(View):
+    use_replica = True
+
+    def get(self, request, org_id):
+        user = get_session_user(request)
+        if not user:
+            return redirect('login')
+
+        organization = get_object_or_404(Organization, org_id=org_id)
+        if not OrganizationMember.objects.filter(organization=organization, user=user).exists():
+            return JsonResponse({'error': "You must belong to this organization to view its timeline."}, status=403)
+
+        start, end = timeline_window(request.GET.get('start'), request.GET.get('end'), date.today())
+        projects = Project.objects.filter(organization=organization)
+        tasks = Task.objects.filter(project__organization=organization)
+        stamps = collect_stamps(
+            Organization.objects.filter(pk=organization.pk),
+            project_count=stamp(projects, Count('pk')),
+            project_updated=stamp(projects, Max('updated_at')),
+            task_count=stamp(tasks, Count('pk')),
+            task_updated=stamp(tasks, Max('updated_at')),
+        )
+        validator = PageValidator.from_stamps(stamps, start, end)
+        cached = validator.check(request)
+        if cached:
+            return cached
+
+        payload = timeline_payload(projects, start, end)
+        return validator.apply(JsonResponse(payload, json_dumps_params={'separators': (',', ':')}))
+
+
+class OrganizationTimeReportView(View):
+    use_replica = True
+
+    def get(self, request, org_id):
+        user = get_session_user(request)
+        if not user:
+            return redirect('login')
+
+        organization = get_object_or_404(Organization, org_id=org_id)
+        if not OrganizationMember.objects.filter(organization=organization, user=user, role=Role.Manager).exists():
+            return JsonResponse({'error': "Only organization managers can view time reports."}, status=403)
+
+        start, end = report_window(
+            parse_anchor(request.GET.get('start'), None), parse_anchor(request.GET.get('end'), None), date.today(),
+        )
+        payload = time_report(organization, start, end)
+        return JsonResponse(payload, json_dumps_params={'separators': (',', ':')})
 
 
 class OrganizationMemberRoleUpdateView(View):
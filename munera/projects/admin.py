@@ -1,19 +1,65 @@
 from django.contrib import admin
-from .models import Project, ProjectMember, Task, TaskAssignment
+from .models import Change, ChangeCompaction, OutboxMessage, Project, ProjectMember, Task, TaskAssignment, TaskDependency, TaskEvent, TaskTemplate, TimeEntry
 
-class ProjectAdmin(admin.ModelAdmin):
-    list_display = ('project_name', 'organization', 'start_date', 'end_date', 'created_by')
+class ArchivedAdminMixin:
+    def get_queryset(self, request):
+        return self.model.all_objects.all()
+
+class ProjectAdmin(ArchivedAdminMixin, admin.ModelAdmin):
+    list_display = ('project_name', 'organization', 'start_date', 'end_date', 'created_by', 'archived_at')
 
 class ProjectMemberAdmin(admin.ModelAdmin):
     list_display = ('project', 'user', 'role', 'date_joined')
 
-class TaskAdmin(admin.ModelAdmin):
-    list_display = ('task_name', 'project', 'status', 'due_date')
+class TaskAdmin(ArchivedAdminMixin, admin.ModelAdmin):
+    list_display = ('task_name', 'project', 'status', 'due_date', 'archived_at')
 
 class TaskAssignmentAdmin(admin.ModelAdmin):
     list_display = ('task', 'user', 'date_assigned')
 
+class TaskDependencyAdmin(admin.ModelAdmin):
+    list_display = ('blocker', 'blocked', 'created_at')
+    raw_id_fields = ('blocker', 'blocked')
+
+class TaskEventAdmin(admin.ModelAdmin):
+    list_display = ('task', 'kind', 'old_value', 'new_value', 'actor', 'created_at')
+    list_filter = ('kind',)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+class TaskTemplateAdmin(admin.ModelAdmin):
+    list_display = ('template_name', 'project', 'frequency', 'interval', 'starts_on', 'generated_through', 'is_active')
+    list_filter = ('frequency', 'is_active')
+    filter_horizontal = ('default_assignees',)
+
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'digest_date', 'subject', 'created_at', 'sent_at')
+    list_filter = ('kind', 'digest_date')
+
+class ChangeAdmin(admin.ModelAdmin):
+    list_display = ('seq', 'entity', 'entity_id', 'org_id', 'member_id', 'created_at')
+    list_filter = ('entity',)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+class ChangeCompactionAdmin(admin.ModelAdmin):
+    list_display = ('horizon', 'superseded', 'tombstones', 'created_at')
+
+class TimeEntryAdmin(admin.ModelAdmin):
+    list_display = ('task', 'user', 'work_date', 'minutes', 'note')
+    list_filter = ('work_date',)
+    raw_id_fields = ('task', 'user')
+
 admin.site.register(Project, ProjectAdmin)
 admin.site.register(ProjectMember, ProjectMemberAdmin)
 admin.site.register(Task, TaskAdmin)
 admin.site.register(TaskAssignment, TaskAssignmentAdmin)
+admin.site.register(TaskDependency, TaskDependencyAdmin)
+admin.site.register(TaskEvent, TaskEventAdmin)
+admin.site.register(TaskTemplate, TaskTemplateAdmin)
+admin.site.register(OutboxMessage, OutboxMessageAdmin)
+admin.site.register(Change, ChangeAdmin)
+admin.site.register(ChangeCompaction, ChangeCompactionAdmin)
+admin.site.register(TimeEntry, TimeEntryAdmin)
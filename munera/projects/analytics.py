@@ -0,0 +1,135 @@
+"""
+Progress metrics for a set of tasks (one project or a whole organization).
+
+Every metric is a grouped count or average evaluated by the database; Python
+only walks the per-day or per-week buckets that come back.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate, TruncWeek
+
+from .history import cycle_times
+from .models import Status, TaskAssignment, TaskEvent
+
+BURNDOWN_DAYS = 30
+THROUGHPUT_WEEKS = 12
+REPORT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _status_events(tasks):
+    return TaskEvent.objects.filter(task__in=tasks, kind=TaskEvent.Kind.STATUS)
+
+
+def burndown(tasks, today, days=BURNDOWN_DAYS):
+    """Open-task count at the end of each of the last ``days`` days.
+
+    Anchored on today's open count and walked backwards through per-day
+    counts of created, closed and reopened tasks.
+    """
+    start = today - timedelta(days=days - 1)
+    open_now = tasks.exclude(status=Status.Done).count()
+    created = dict(
+        tasks.filter(created_at__date__gt=start)
+        .annotate(day=TruncDate('created_at'))
+        .values_list('day')
+        .annotate(n=Count('pk'))
+        .order_by()
+    )
+    moves = {
+        row['day']: row
+        for row in _status_events(tasks)
+        .filter(created_at__date__gt=start)
+        .annotate(day=TruncDate('created_at'))
+        .values('day')
+        .annotate(
+            closed=Count('pk', filter=Q(new_value=Status.Done)),
+            reopened=Count('pk', filter=Q(old_value=Status.Done)),
+        )
+        .order_by()
+    }
+
+    points = []
+    remaining = open_now
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        points.append({'date': day, 'open': remaining})
+        move = moves.get(day, {})
+        remaining += move.get('closed', 0) - move.get('reopened', 0) - created.get(day, 0)
+    points.reverse()
+    return points
+
+
+def throughput(tasks, today, weeks=THROUGHPUT_WEEKS):
+    """Status transitions per week, keyed by the status moved into."""
+    since = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+    rows = (
+        _status_events(tasks)
+        .filter(created_at__date__gte=since)
+        .annotate(week=TruncDate(TruncWeek('created_at')))
+        .values('week', 'new_value')
+        .annotate(n=Count('pk'))
+        .order_by('week')
+    )
+    buckets = {}
+    for row in rows:
+        buckets.setdefault(row['week'], {status: 0 for status in Status.values})[row['new_value']] = row['n']
+    return [{'week': week, 'counts': counts} for week, counts in buckets.items()]
+
+
+def overdue_by_assignee(tasks, today):
+    return list(
+        TaskAssignment.objects.filter(task__in=tasks, task__due_date__lt=today)
+        .exclude(task__status=Status.Done)
+        .values('user_id', 'user__user_name')
+        .annotate(overdue=Count('pk'))
+        .order_by('-overdue', 'user__user_name')
+    )
+
+
+def member_load(tasks):
+    """Open assignments per member, split by status."""
+    open_statuses = [status for status in Status.values if status != Status.Done]
+    return list(
+        TaskAssignment.objects.filter(task__in=tasks)
+        .exclude(task__status=Status.Done)
+        .values('user_id', 'user__user_name')
+        .annotate(
+            open=Count('pk'),
+            **{
+                f'status_{i}': Count('pk', filter=Q(task__status=status))
+                for i, status in enumerate(open_statuses)
+            },
+        )
+        .order_by('-open', 'user__user_name')
+    )
+
+
+def _seconds(value):
+    return value.total_seconds() if value is not None else None
+
+
+def build_report(tasks, today):
+    open_statuses = [status for status in Status.values if status != Status.Done]
+    cycle = cycle_times(tasks)
+    load = member_load(tasks)
+    for row in load:
+        row['by_status'] = {status: row.pop(f'status_{i}') for i, status in enumerate(open_statuses)}
+    return {
+        'date': today,
+        'burndown': burndown(tasks, today),
+        'throughput': throughput(tasks, today),
+        'overdue_by_assignee': overdue_by_assignee(tasks, today),
+        'member_load': load,
+        'cycle_time': {
+            'statuses': {status: _seconds(value) for status, value in cycle['statuses'].items()},
+            'to_done': _seconds(cycle['to_done']),
+        },
+    }
+
+
+def cached_report(scope, tasks, today):
+    """``build_report`` memoised for the rest of ``today`` under ``scope`` (e.g. ``"project:4"``)."""
+    key = f'analytics:{scope}:{today.isoformat()}'
+    return cache.get_or_set(key, lambda: build_report(tasks, today), REPORT_CACHE_TIMEOUT)
@@ -0,0 +1,76 @@
+"""
+Archiving (soft delete) of projects and tasks.
+
+Archived rows keep their data but drop out of ``Project.objects`` and
+``Task.objects``, and so out of every listing, count and inbox built on them.
+Archiving a project stamps its live tasks with the same ``archived_at``, so
+restoring the project brings back exactly those tasks and no join from a task
+ever has to look at its project's state. ``purge_archived`` hard-deletes rows
+archived before a cutoff in bounded chunks.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .changes import record
+from .inbox import refresh_inbox
+from .models import Project, Task
+
+PURGE_CHUNK_SIZE = 1000
+
+
+def _set_archived(tasks, when, updated):
+    task_ids = list(tasks.values_list('pk', flat=True))
+    Task.all_objects.filter(pk__in=task_ids).update(archived_at=when, updated_at=updated, version=F('version') + 1)
+    refresh_inbox(task_ids=task_ids)
+    record(Task.all_objects.filter(pk__in=task_ids))
+
+
+@transaction.atomic
+def archive_task(task):
+    task.archived_at = timezone.now()
+    _set_archived(Task.objects.filter(pk=task.pk), task.archived_at, task.archived_at)
+
+
+@transaction.atomic
+def restore_task(task):
+    _set_archived(Task.all_objects.filter(pk=task.pk), None, timezone.now())
+    task.archived_at = None
+
+
+@transaction.atomic
+def archive_project(project):
+    project.archived_at = timezone.now()
+    Project.all_objects.filter(pk=project.pk).update(
+        archived_at=project.archived_at, updated_at=project.archived_at, version=F('version') + 1,
+    )
+    record(Project.all_objects.filter(pk=project.pk))
+    _set_archived(Task.objects.filter(project=project), project.archived_at, project.archived_at)
+
+
+@transaction.atomic
+def restore_project(project):
+    now = timezone.now()
+    _set_archived(Task.all_objects.filter(project=project, archived_at=project.archived_at), None, now)
+    Project.all_objects.filter(pk=project.pk).update(archived_at=None, updated_at=now, version=F('version') + 1)
+    record(Project.all_objects.filter(pk=project.pk))
+    project.archived_at = None
+
+
+def purge_archived(cutoff, chunk_size=PURGE_CHUNK_SIZE, dry_run=False):
+    """Delete tasks, then projects, archived before ``cutoff``; one short transaction per chunk."""
+    counts = {}
+    for label, model in (('tasks', Task), ('projects', Project)):
+        expired = model.all_objects.filter(archived_at__lt=cutoff)
+        if dry_run:
+            counts[label] = expired.count()
+            continue
+        counts[label] = 0
+        while True:
+            ids = list(expired.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                model.all_objects.filter(pk__in=ids).delete()
+            counts[label] += len(ids)
+    return counts
@@ -0,0 +1,216 @@
+"""
+The change feed behind ``GET /changes``.
+
+Every write to a task, assignment, project or membership appends a ``Change``
+in the same transaction: the receivers in ``projects.signals`` log single-row
+saves and deletes, and bulk writers call ``record`` for the rows they touched,
+as they already do ``refresh_inbox``. ``seq`` only grows, so a client keeps
+the ``next`` cursor it was given and asks for what came after it. An entry
+carries the row as it is now, or ``None`` once the row is deleted or
+archived, so applying one twice is harmless. Tombstones are per row; an
+archived task's assignments are not tombstoned with it.
+
+``seq`` is commit order only where writers are serialized, as on SQLite. On
+PostgreSQL a transaction can commit a lower ``seq`` after a higher one is
+already visible, so ``next`` stops before the first entry younger than
+``settings.CHANGE_FEED_SETTLE_SECONDS``: those entries are sent again on the
+next poll, together with any lower ``seq`` that has committed since. This
+holds as long as no transaction that writes entries stays open longer than
+the window.
+
+Entries are scoped to an organization. Membership entries also go to the
+member, so someone who leaves still hears that they left. Someone who joins
+needs the organization's existing rows, which sit below their cursor, so
+``joined_since`` makes the view answer with a reset and the client resyncs
+from 0.
+
+Rows written before the feed existed are logged by ``backfill_changes``
+(``manage.py backfill_changes``), which only logs live rows without an
+entry, so it is safe to run again.
+
+``compact_changes`` drops entries superseded by a later one for the same row,
+which never changes what a client converges to, and tombstones older than the
+retention window. Dropping tombstones moves the horizon: a cursor below it may
+have missed a delete, and that client has to start again from 0.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from organization.models import OrganizationMember
+from .models import Change, ChangeCompaction, Project, ProjectMember, Task, TaskAssignment
+
+BATCH_SIZE = 500
+COMPACT_CHUNK_SIZE = 1000
+FEED_LIMIT = 500
+MAX_FEED_LIMIT = 2000
+
+Entity = Change.Entity
+
+
+@dataclass(frozen=True)
+class Feed:
+    entity: str
+    org: str
+    fields: dict
+    member: str = None
+    archivable: bool = False
+
+
+FEEDS = {
+    Task: Feed(Entity.TASK, 'project__organization_id', {
+        'project': 'project_id', 'name': 'task_name', 'desc': 'task_desc', 'status': 'status',
+        'due': 'due_date', 'rank': 'rank', 'version': 'version',
+    }, archivable=True),
+    TaskAssignment: Feed(Entity.ASSIGNMENT, 'task__project__organization_id', {'task': 'task_id', 'user': 'user_id'}),
+    Project: Feed(Entity.PROJECT, 'organization_id', {
+        'org': 'organization_id', 'name': 'project_name', 'desc': 'project_desc',
+        'start': 'start_date', 'end': 'end_date', 'version': 'version',
+    }, archivable=True),
+    ProjectMember: Feed(Entity.PROJECT_MEMBER, 'project__organization_id', {
+        'project': 'project_id', 'user': 'user_id', 'role': 'role',
+    }),
+    OrganizationMember: Feed(Entity.ORG_MEMBER, 'organization_id', {
+        'org': 'organization_id', 'user': 'user_id', 'role': 'role',
+    }, member='user_id'),
+}
+
+
+def _change(feed, row, org_id, now, deleted=False):
+    return Change(
+        entity=feed.entity,
+        entity_id=row['pk'],
+        org_id=org_id,
+        member_id=row[feed.member] if feed.member else None,
+        data=None if deleted or (feed.archivable and row['archived_at']) else {
+            key: row[column] for key, column in feed.fields.items()
+        },
+        created_at=now,
+    )
+
+
+def record(queryset):
+    """Log the current state of every row in ``queryset``; for writes that skip the signals."""
+    feed = FEEDS[queryset.model]
+    columns = list(dict.fromkeys(['pk', feed.org, *feed.fields.values()] + (['archived_at'] if feed.archivable else [])))
+    now = timezone.now()
+    changes = [
+        _change(feed, row, row[feed.org], now)
+        for row in (dict(zip(columns, values)) for values in queryset.values_list(*columns))
+    ]
+    Change.objects.bulk_create(changes, batch_size=BATCH_SIZE)
+    return len(changes)
+
+
+def log_instance(instance, deleted=False):
+    """Log one saved or deleted row with a single INSERT, looking its organization up inside it if needed."""
+    feed = FEEDS[type(instance)]
+    row = {column: getattr(instance, column) for column in feed.fields.values()}
+    row['pk'] = instance.pk
+    if feed.archivable:
+        row['archived_at'] = instance.archived_at
+    relation, _, rest = feed.org.partition('__')
+    if rest and instance._meta.get_field(relation).is_cached(instance) and '__' not in rest:
+        org_id = getattr(getattr(instance, relation), rest)
+    elif rest:
+        parent = instance._meta.get_field(relation).related_model
+        org_id = Subquery(parent._base_manager.filter(pk=getattr(instance, f'{relation}_id')).values(rest)[:1])
+    else:
+        org_id = getattr(instance, feed.org)
+    change = _change(feed, row, org_id, timezone.now(), deleted=deleted)
+    change.save(force_insert=True)
+    return change
+
+
+def current_horizon():
+    return ChangeCompaction.objects.order_by('-pk').values_list('horizon', flat=True).first() or 0
+
+
+def visible_changes(user, since):
+    """Entries after ``since`` from the user's organizations plus their own membership entries."""
+    organizations = OrganizationMember.objects.filter(user=user).values('organization_id')
+    return Change.objects.filter(Q(org_id__in=organizations) | Q(member_id=user.pk), seq__gt=since).order_by('seq')
+
+
+def joined_since(user, since):
+    """Whether the user gained a membership whose first entry comes after ``since``.
+
+    Compaction can drop the join entry a client already saw once a role change
+    supersedes it; that membership then looks new, and the client resyncs
+    once more than it needed to.
+    """
+    memberships = Change.objects.filter(entity=Entity.ORG_MEMBER, member_id=user.pk)
+    known = memberships.filter(seq__lte=since).values('entity_id')
+    return memberships.filter(seq__gt=since, data__isnull=False).exclude(entity_id__in=known).exists()
+
+
+def feed_payload(user, since, limit=FEED_LIMIT):
+    """``{"changes": [[seq, entity, id, data], ...], "next": seq, "more": bool}``; ``data`` is ``None`` for deletes.
+
+    ``next`` is the last ``seq`` before the first entry still inside the
+    settle window, so those entries come back on the next poll.
+    """
+    rows = list(visible_changes(user, since).values_list('seq', 'entity', 'entity_id', 'data', 'created_at')[:limit + 1])
+    more = len(rows) > limit
+    rows = rows[:limit]
+    settled = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_SETTLE_SECONDS)
+    cursor = since
+    for seq, *_, created_at in rows:
+        if created_at > settled:
+            break
+        cursor = seq
+    return {
+        'changes': [list(row[:4]) for row in rows],
+        'next': cursor,
+        # A full page that is still settling would only be fetched again; wait for the next poll instead.
+        'more': more and cursor > since,
+    }
+
+
+def _delete_in_chunks(queryset, chunk_size):
+    deleted = 0
+    while True:
+        seqs = list(queryset.order_by('seq').values_list('seq', flat=True)[:chunk_size])
+        if not seqs:
+            return deleted
+        with transaction.atomic():
+            Change.objects.filter(seq__in=seqs).delete()
+        deleted += len(seqs)
+
+
+def compact_changes(cutoff, chunk_size=COMPACT_CHUNK_SIZE):
+    """Drop superseded entries, then tombstones logged before ``cutoff``; one short transaction per chunk."""
+    newer = Change.objects.filter(entity=OuterRef('entity'), entity_id=OuterRef('entity_id'), seq__gt=OuterRef('seq'))
+    superseded = _delete_in_chunks(Change.objects.filter(Exists(newer)), chunk_size)
+
+    horizon = current_horizon()
+    last = Change.objects.filter(created_at__lt=cutoff, seq__gt=horizon).aggregate(last=Max('seq'))['last']
+    expired = Change.objects.filter(data__isnull=True, seq__gt=horizon, seq__lte=last or horizon)
+    if not last or not expired.exists():
+        return {'superseded': superseded, 'tombstones': 0, 'horizon': horizon}
+    # Publish the new horizon before any tombstone below it disappears.
+    run = ChangeCompaction.objects.create(horizon=last, superseded=superseded)
+    run.tombstones = _delete_in_chunks(expired, chunk_size)
+    run.save(update_fields=['tombstones'])
+    return {'superseded': superseded, 'tombstones': run.tombstones, 'horizon': last}
+
+
+def backfill_changes(chunk_size=COMPACT_CHUNK_SIZE):
+    """Log every live row that has no entry yet, so a client starting from 0 sees data older than the feed."""
+    logged = 0
+    for model, feed in FEEDS.items():
+        rows = model._base_manager.filter(archived_at__isnull=True) if feed.archivable else model._base_manager.all()
+        logged_entry = Change.objects.filter(entity=feed.entity, entity_id=OuterRef('pk'))
+        last = 0
+        while True:
+            ids = list(rows.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                logged += record(rows.filter(pk__in=ids).exclude(Exists(logged_entry)))
+            last = ids[-1]
+    return logged
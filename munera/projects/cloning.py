@@ -0,0 +1,94 @@
+"""
+Set-based duplication of a project with its members, tasks and assignments.
+
+Each table is copied with one read and batched ``bulk_create`` calls inside
+a single transaction, so the statement count grows with the number of
+batches rather than the number of rows. New task ids come back from the
+insert (``RETURNING`` on PostgreSQL and SQLite) and feed an old-to-new id map
+that the assignment and dependency copies are rewritten through.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+
+from .changes import record
+from .dependencies import live_edges
+from .inbox import refresh_inbox
+from .models import Project, ProjectMember, Status, Task, TaskAssignment, TaskDependency
+
+BATCH_SIZE = 500
+
+
+def _shift(day, offset):
+    return day + offset if day else day
+
+
+def _copy_tasks(source, clone, offset, reset_status):
+    rows = list(Task.objects.filter(project=source).order_by('pk').values_list(
+        'pk', 'task_name', 'task_desc', 'desc_html', 'desc_excerpt', 'desc_hash', 'status', 'due_date', 'rank',
+    ))
+    tasks = [
+        Task(
+            project=clone, task_name=name, task_desc=desc, rank=rank,
+            desc_html=desc_html, desc_excerpt=excerpt, desc_hash=desc_hash,
+            status=Status.ToDo if reset_status else status, due_date=_shift(due_date, offset),
+        )
+        for _, name, desc, desc_html, excerpt, desc_hash, status, due_date, rank in rows
+    ]
+    Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+    new_ids = [task.pk for task in tasks]
+    if rows and new_ids[0] is None:
+        # Backends without RETURNING: ids were handed out in insertion order.
+        new_ids = list(Task.objects.filter(project=clone).order_by('pk').values_list('pk', flat=True))
+    return {row[0]: new_id for row, new_id in zip(rows, new_ids)}
+
+
+@transaction.atomic
+def clone_project(source, created_by, project_name, day_offset=0, reset_status=True):
+    """Copy ``source`` into a new project owned by ``created_by``; returns the new ``Project``."""
+    offset = timedelta(days=day_offset)
+    clone = Project.objects.create(
+        organization_id=source.organization_id,
+        created_by=created_by,
+        project_name=project_name,
+        project_desc=source.project_desc,
+        start_date=_shift(source.start_date, offset),
+        end_date=_shift(source.end_date, offset),
+    )
+
+    members = {
+        user_id: role for user_id, role in ProjectMember.objects.filter(project=source).values_list('user_id', 'role')
+    }
+    members[created_by.pk] = ProjectMember.Role.MANAGER.value
+    ProjectMember.objects.bulk_create(
+        [ProjectMember(project=clone, user_id=user_id, role=role) for user_id, role in members.items()],
+        batch_size=BATCH_SIZE,
+    )
+
+    task_ids = _copy_tasks(source, clone, offset, reset_status)
+    TaskAssignment.objects.bulk_create(
+        [
+            TaskAssignment(task_id=task_ids[task_id], user_id=user_id)
+            for task_id, user_id in TaskAssignment.objects.filter(
+                task__project=source, task__archived_at__isnull=True,
+            ).values_list('task_id', 'user_id')
+            if user_id in members
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    TaskDependency.objects.bulk_create(
+        [
+            TaskDependency(blocker_id=task_ids[blocker_id], blocked_id=task_ids[blocked_id])
+            for blocker_id, blocked_id in live_edges(source.pk).values_list('blocker_id', 'blocked_id')
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    # Bulk writes skip the inbox and change-feed signals.
+    new_ids = list(task_ids.values())
+    for start in range(0, len(new_ids), BATCH_SIZE):
+        refresh_inbox(task_ids=new_ids[start:start + BATCH_SIZE])
+    record(ProjectMember.objects.filter(project=clone))
+    record(Task.objects.filter(project=clone))
+    record(TaskAssignment.objects.filter(task__project=clone))
+    return clone
@@ -0,0 +1,128 @@
+"""
+Task dependencies: cycle checks on insert and critical paths per project.
+
+``creates_cycle`` asks the database, with one recursive CTE, whether the
+proposed blocker is already reachable from the task it would block.
+``dependency_graph`` loads a project's live tasks and edges in two queries
+and does the topological pass in memory: every open task takes one day, done
+tasks take none, and a task's earliest finish is one day after its slowest
+blocker's. The result is cached under a generation built from cheap stamps
+(task count and latest update, edge count and newest edge id), so any
+change to the graph or to a status produces a new key.
+"""
+import hashlib
+from collections import defaultdict, deque
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Max
+
+from munera.conditional import collect_stamps, stamp
+from .models import Project, Status, Task, TaskDependency
+
+GRAPH_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class DependencyError(ValueError):
+    pass
+
+
+def creates_cycle(blocker_id, blocked_id):
+    """Would the edge ``blocker -> blocked`` close a loop?"""
+    if blocker_id == blocked_id:
+        return True
+    table = TaskDependency._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH RECURSIVE downstream(task_id) AS (
+                SELECT blocked_id FROM {table} WHERE blocker_id = %s
+                UNION
+                SELECT edge.blocked_id FROM {table} edge JOIN downstream ON edge.blocker_id = downstream.task_id
+            )
+            SELECT 1 FROM downstream WHERE task_id = %s LIMIT 1
+            """,
+            [blocked_id, blocker_id],
+        )
+        return cursor.fetchone() is not None
+
+
+@transaction.atomic
+def add_dependency(blocker, blocked):
+    if blocker.project_id != blocked.project_id:
+        raise DependencyError("Dependencies must stay within one project.")
+    # Serialize edge inserts per project so two concurrent inserts cannot close a loop together.
+    list(Project.objects.select_for_update().filter(pk=blocked.project_id).values_list('pk'))
+    if creates_cycle(blocker.pk, blocked.pk):
+        raise DependencyError(f"'{blocker.task_name}' already waits on '{blocked.task_name}'.")
+    return TaskDependency.objects.get_or_create(blocker=blocker, blocked=blocked)[0]
+
+
+def remove_dependency(blocker, blocked):
+    TaskDependency.objects.filter(blocker=blocker, blocked=blocked).delete()
+
+
+def live_edges(project_id):
+    return TaskDependency.objects.filter(
+        blocked__project_id=project_id, blocked__archived_at__isnull=True, blocker__archived_at__isnull=True,
+    )
+
+
+def graph_generation(project_id):
+    tasks = Task.objects.filter(project_id=project_id)
+    edges = TaskDependency.objects.filter(blocked__project_id=project_id)
+    stamps = collect_stamps(
+        Project.objects.filter(pk=project_id),
+        task_count=stamp(tasks, Count('pk')),
+        task_updated=stamp(tasks, Max('updated_at')),
+        edge_count=stamp(edges, Count('pk')),
+        edge_latest=stamp(edges, Max('pk')),
+    )
+    return hashlib.blake2b(repr(sorted(stamps.items())).encode(), digest_size=8).hexdigest()
+
+
+def build_graph(project_id, today):
+    status_of, due_of = {}, {}
+    for pk, status, due_date in Task.objects.filter(project_id=project_id).values_list('pk', 'status', 'due_date'):
+        status_of[pk], due_of[pk] = status, due_date
+    blockers, waiting = defaultdict(list), defaultdict(list)
+    for blocker_id, blocked_id in live_edges(project_id).values_list('blocker_id', 'blocked_id'):
+        blockers[blocked_id].append(blocker_id)
+        waiting[blocker_id].append(blocked_id)
+
+    pending = {pk: len(blockers[pk]) for pk in status_of}
+    queue = deque(pk for pk, count in pending.items() if not count)
+    finish, via = {}, {}
+    while queue:
+        pk = queue.popleft()
+        start = max((finish[blocker] for blocker in blockers[pk]), default=0)
+        via[pk] = max(blockers[pk], key=finish.__getitem__, default=None)
+        finish[pk] = start + (0 if status_of[pk] == Status.Done else 1)
+        for blocked_id in waiting[pk]:
+            pending[blocked_id] -= 1
+            if not pending[blocked_id]:
+                queue.append(blocked_id)
+
+    path = []
+    end = max(finish, key=finish.__getitem__, default=None)
+    while end is not None:
+        path.append(end)
+        end = via[end]
+    path.reverse()
+
+    return {
+        'earliest_finish': {pk: (today + timedelta(days=days)).isoformat() for pk, days in finish.items()},
+        'critical_path': path,
+        'length_days': finish[path[-1]] if path else 0,
+        'at_risk': sorted(
+            pk for pk, days in finish.items()
+            if due_of[pk] and status_of[pk] != Status.Done and today + timedelta(days=days) > due_of[pk]
+        ),
+    }
+
+
+def dependency_graph(project_id, today):
+    """Earliest finish dates, the critical path and at-risk tasks for a project's dependency graph."""
+    key = f'dependencies:{project_id}:{today.isoformat()}:{graph_generation(project_id)}'
+    return cache.get_or_set(key, lambda: build_graph(project_id, today), GRAPH_CACHE_TIMEOUT)
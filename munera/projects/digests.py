@@ -0,0 +1,140 @@
+"""
+Overdue and due-soon digests for every user in one streaming pass.
+
+``iter_digests`` reads a single query over open assignments ordered by user
+and groups it with ``itertools.groupby``, so only one user's tasks are held
+at a time. Sinks buffer a fixed number of messages before writing them.
+"""
+from dataclasses import dataclass, field
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from .models import OutboxMessage, Status, TaskAssignment
+
+DIGEST_KIND = 'task_digest'
+DUE_SOON_DAYS = 3
+CHUNK_SIZE = 2000
+BATCH_SIZE = 500
+
+DIGEST_FIELDS = (
+    'user_id',
+    'user__email',
+    'user__user_name',
+    'task_id',
+    'task__task_name',
+    'task__due_date',
+    'task__project__project_name',
+)
+
+
+@dataclass(slots=True)
+class Digest:
+    user_id: int
+    email: str
+    user_name: str
+    date: object
+    overdue: list = field(default_factory=list)
+    due_soon: list = field(default_factory=list)
+
+    @property
+    def subject(self):
+        parts = []
+        if self.overdue:
+            parts.append(f"{len(self.overdue)} overdue")
+        if self.due_soon:
+            parts.append(f"{len(self.due_soon)} due soon")
+        return f"Munera tasks: {', '.join(parts)}"
+
+    @property
+    def body(self):
+        lines = [f"Hi {self.user_name},", ""]
+        for title, tasks in (("Overdue", self.overdue), ("Due soon", self.due_soon)):
+            if tasks:
+                lines.append(f"{title}:")
+                lines.extend(f"  - {name} ({project}), due {due:%b %d}" for name, project, due in tasks)
+                lines.append("")
+        return "\n".join(lines)
+
+
+def digest_rows(today, days=DUE_SOON_DAYS):
+    return (
+        TaskAssignment.objects.filter(
+            task__due_date__lte=today + timedelta(days=days),
+            task__archived_at__isnull=True,
+            user__is_active=True,
+        )
+        .exclude(task__status=Status.Done)
+        .order_by('user_id', 'task__due_date', 'task_id')
+        .values_list(*DIGEST_FIELDS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def iter_digests(today, days=DUE_SOON_DAYS):
+    for user_id, rows in groupby(digest_rows(today, days), key=itemgetter(0)):
+        digest = None
+        for _, email, user_name, _, task_name, due_date, project_name in rows:
+            if digest is None:
+                digest = Digest(user_id, email, user_name, today)
+            bucket = digest.overdue if due_date < today else digest.due_soon
+            bucket.append((task_name, project_name, due_date))
+        yield digest
+
+
+class EmailSink:
+    """Send through ``EMAIL_BACKEND`` (e.g. the file-based backend), one connection per batch."""
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pending = []
+        self.connection = get_connection()
+
+    def add(self, digest):
+        self.pending.append(EmailMessage(
+            digest.subject, digest.body, settings.DEFAULT_FROM_EMAIL, [digest.email], connection=self.connection,
+        ))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.connection.send_messages(self.pending)
+            self.pending = []
+
+
+class OutboxSink:
+    """Write ``OutboxMessage`` rows; re-running for the same date adds nothing."""
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, digest):
+        self.pending.append(OutboxMessage(
+            user_id=digest.user_id, kind=DIGEST_KIND, digest_date=digest.date,
+            subject=digest.subject, body=digest.body,
+        ))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            OutboxMessage.objects.bulk_create(self.pending, ignore_conflicts=True)
+            self.pending = []
+
+
+SINKS = {'email': EmailSink, 'outbox': OutboxSink}
+
+
+def send_digests(today, sink, days=DUE_SOON_DAYS):
+    """Feed every user's digest to ``sink``; returns the number of digests built."""
+    count = 0
+    for digest in iter_digests(today, days):
+        sink.add(digest)
+        count += 1
+    sink.flush()
+    return count
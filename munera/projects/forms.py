@@ -1,5 +1,10 @@
 from django import forms
-from .models import Project, Task, TaskAssignment
+from django.db import transaction
+from .changes import record
+from .history import diff_events
+from .inbox import refresh_inbox
+from .models import Project, Task, TaskAssignment, TaskEvent, TimeEntry
+from .versioning import save_changes
 from organization.models import Organization, OrganizationMember, Role as OrgRole
 from users.models import User
 
@@ -23,12 +28,28 @@ class ProjectForm(forms.ModelForm):
         else:
             self.fields['organization'].queryset = Organization.objects.all()
         
+class ProjectCloneForm(forms.Form):
+    project_name = forms.CharField(max_length=100, label="Project Name")
+    day_offset = forms.IntegerField(
+        initial=0, min_value=-3650, max_value=3650, label="Shift Dates By",
+        help_text="Days added to the project and task dates (negative moves them earlier).",
+    )
+    reset_status = forms.BooleanField(
+        initial=True, required=False, label="Reset Task Statuses", help_text="Start every copied task as To Do.",
+    )
+
+
 class TaskForm(forms.ModelForm):
     assignees = forms.ModelMultipleChoiceField(
         queryset=User.objects.none(),
         widget=forms.CheckboxSelectMultiple,
         required=False
     )
+    version = forms.IntegerField(
+        widget=forms.HiddenInput,
+        required=False,
+        error_messages={'required': "This form is out of date. Reload the task and make your changes again."},
+    )
 
     class Meta:
         model = Task
@@ -43,6 +64,12 @@ class TaskForm(forms.ModelForm):
         user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         self._user = user
+        self._tracked = None
+        if self.instance.pk:
+            self._tracked = {'status': self.instance.status, 'due_date': self.instance.due_date}
+            # Without the version the edit was based on there is nothing to detect a conflict against.
+            self.fields['version'].required = True
+            self.fields['version'].initial = self.instance.version
 
         if user:
             self.fields['project'].queryset = Project.objects.filter(
@@ -104,15 +131,56 @@ class TaskForm(forms.ModelForm):
                 raise forms.ValidationError("All assignees must be members of this project.")
         return assignees
 
+    def changed_fields(self):
+        """Model columns this submission changes; assignees live in their own table."""
+        return [name for name in self.changed_data if name in self._meta.fields and name != 'assignees']
+
     def save(self, commit=True):
+        """Create the task, or write an edit with ``save_changes``; may raise ``EditConflict``."""
         task = super().save(commit=False)
         project = self._project_context or self.cleaned_data.get('project')
         task.project = project
-
         if commit:
-            task.save()
-            assignees = self.cleaned_data.get('assignees', [])
-            TaskAssignment.objects.filter(task=task).exclude(user__in=assignees).delete()
-            for user in assignees:
-                TaskAssignment.objects.get_or_create(task=task, user=user)
+            self._commit(task)
         return task
+
+    @transaction.atomic
+    def _commit(self, task):
+        assignees = self.cleaned_data.get('assignees', [])
+        assigned_ids = {user.pk for user in assignees}
+        fields = []
+        if task.pk is None:
+            task.save()
+            existing_ids = set()
+        else:
+            existing_ids = set(TaskAssignment.objects.filter(task=task).values_list('user_id', flat=True))
+            fields = self.changed_fields()
+            if not fields and assigned_ids == existing_ids:
+                return
+            # An assignee-only edit still bumps the version so concurrent edits see it.
+            save_changes(task, fields, self.cleaned_data['version'])
+        if existing_ids - assigned_ids:
+            TaskAssignment.objects.filter(task=task, user_id__in=existing_ids - assigned_ids).delete()
+        added = assigned_ids - existing_ids
+        TaskAssignment.objects.bulk_create(
+            [TaskAssignment(task=task, user_id=pk) for pk in added],
+            ignore_conflicts=True,
+        )
+        if added:
+            record(TaskAssignment.objects.filter(task=task, user_id__in=added))
+        if fields or assigned_ids != existing_ids:
+            # update() and bulk writes skip the signals, so resync this task's inbox rows here.
+            refresh_inbox(task_ids=[task.pk])
+        events = diff_events(task, self._tracked, existing_ids, assigned_ids, actor=self._user)
+        if events:
+            TaskEvent.objects.bulk_create(events)
+
+
+class TimeEntryForm(forms.ModelForm):
+    class Meta:
+        model = TimeEntry
+        fields = ['work_date', 'minutes', 'note']
+        widgets = {
+            'work_date': forms.DateInput(attrs={'type': 'date'}),
+            'minutes': forms.NumberInput(attrs={'min': 1, 'max': 24 * 60, 'step': 5}),
+        }
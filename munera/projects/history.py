@@ -0,0 +1,77 @@
+from django.db.models import Avg, DurationField, ExpressionWrapper, F, Q, Window
+from django.db.models.functions import Coalesce, Lag
+from django.utils import timezone
+
+from .models import Status, TaskEvent
+
+
+def _join_ids(ids):
+    return ",".join(str(pk) for pk in sorted(ids))
+
+
+def split_ids(value):
+    return [int(pk) for pk in value.split(",") if pk]
+
+
+def diff_events(task, before, assignees_before, assignees_after, actor=None):
+    """Build unsaved ``TaskEvent`` rows describing what a save changed.
+
+    ``before`` holds the task's ``status``/``due_date`` prior to the edit, or
+    ``None`` for a new task. All rows share one timestamp so callers can write
+    them with a single ``bulk_create``.
+    """
+    now = timezone.now()
+    events = []
+
+    def add(kind, old, new):
+        events.append(TaskEvent(task=task, actor=actor, kind=kind, old_value=old, new_value=new, created_at=now))
+
+    if before is not None:
+        if before['status'] != task.status:
+            add(TaskEvent.Kind.STATUS, before['status'], task.status)
+        if before['due_date'] != task.due_date:
+            add(
+                TaskEvent.Kind.DUE_DATE,
+                before['due_date'].isoformat() if before['due_date'] else "",
+                task.due_date.isoformat() if task.due_date else "",
+            )
+
+    removed = assignees_before - assignees_after
+    added = assignees_after - assignees_before
+    if removed or added:
+        add(TaskEvent.Kind.ASSIGNEES, _join_ids(removed), _join_ids(added))
+    return events
+
+
+def task_timeline(task):
+    """Newest-first events for one task; served by the ``(task, created_at)`` index."""
+    return TaskEvent.objects.filter(task=task).select_related('actor').order_by('-created_at', '-id')
+
+
+def cycle_times(tasks):
+    """Average time ``tasks`` spent in each status, plus creation-to-done time.
+
+    Each status event closes the interval opened by the previous event for the
+    same task (``LAG`` over the ``(task, created_at)`` index) or by the task's
+    creation, so the averages are computed entirely in the database.
+    """
+    events = TaskEvent.objects.filter(task__in=tasks, kind=TaskEvent.Kind.STATUS).annotate(
+        entered_at=Window(
+            Lag('created_at'),
+            partition_by=[F('task_id')],
+            order_by=[F('created_at').asc(), F('id').asc()],
+        )
+    )
+    stint = ExpressionWrapper(
+        F('created_at') - Coalesce(F('entered_at'), F('task__created_at')), output_field=DurationField()
+    )
+    to_done = ExpressionWrapper(F('created_at') - F('task__created_at'), output_field=DurationField())
+    statuses = [status for status in Status.values if status != Status.Done]
+    result = events.aggregate(
+        to_done=Avg(to_done, filter=Q(new_value=Status.Done)),
+        **{f'status_{i}': Avg(stint, filter=Q(old_value=status)) for i, status in enumerate(statuses)},
+    )
+    return {
+        'statuses': {status: result[f'status_{i}'] for i, status in enumerate(statuses)},
+        'to_done': result['to_done'],
+    }
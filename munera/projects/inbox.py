@@ -0,0 +1,128 @@
+"""
+Maintenance of the denormalized ``TaskInbox``.
+
+A user sees a task because they are assigned to it, manage its project, or
+manage its organization; ``TaskInbox.reason`` keeps one bit per cause. The
+signal handlers in ``projects.signals`` grant or revoke single bits as
+memberships and assignments change. ``refresh_inbox`` recomputes rows from
+scratch for a scope and is what bulk writers and ``repair_inbox`` use.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from organization.models import Role as OrgRole
+from .models import ProjectMember, Status, Task, TaskAssignment, TaskInbox
+
+Reason = TaskInbox.Reason
+ALL_REASONS = Reason.ASSIGNED | Reason.PROJECT_MANAGER | Reason.ORG_MANAGER
+
+
+def reason_values(reasons):
+    """Every stored bitmask that shares at least one bit with ``reasons``."""
+    return [value for value in range(1, ALL_REASONS + 1) if value & reasons]
+
+
+def _entry(user_id, task_id, reason, status, due_date):
+    return TaskInbox(
+        user_id=user_id, task_id=task_id, reason=reason,
+        status=status, due_date=due_date, is_open=status != Status.Done,
+    )
+
+
+def grant(reason, user_ids, tasks):
+    """Set ``reason`` for every pair of ``user_ids`` x ``tasks``, creating rows as needed."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    entries = TaskInbox.objects.filter(user_id__in=user_ids, task__in=tasks)
+    existing = set(entries.values_list('user_id', 'task_id'))
+    entries.update(reason=F('reason').bitor(reason))
+    TaskInbox.objects.bulk_create(
+        [
+            _entry(user_id, task_id, reason, status, due_date)
+            for task_id, status, due_date in tasks.values_list('pk', 'status', 'due_date')
+            for user_id in user_ids
+            if (user_id, task_id) not in existing
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def revoke(reason, user_ids, tasks):
+    """Clear ``reason`` for the given pairs and drop rows left without one. Never inserts."""
+    entries = TaskInbox.objects.filter(user_id__in=list(user_ids), task__in=tasks)
+    entries.update(reason=F('reason').bitand(~reason))
+    entries.filter(reason=0).delete()
+
+
+def _scope_lookups(user_field, task_field, user_ids, task_ids):
+    lookups = {}
+    if user_ids is not None:
+        lookups[f'{user_field}__in'] = user_ids
+    if task_ids is not None:
+        lookups[f'{task_field}__in'] = task_ids
+    return lookups
+
+
+def desired_reasons(user_ids=None, task_ids=None):
+    """``{(user_id, task_id): reason}`` computed from the source tables for the scope."""
+    desired = defaultdict(int)
+    sources = [
+        (Reason.ASSIGNED, TaskAssignment.objects.all(), 'user_id', 'task_id', {'task__archived_at__isnull': True}),
+        (
+            Reason.PROJECT_MANAGER, Task.objects.all(), 'project__memberships__user_id', 'pk',
+            {'project__memberships__role': ProjectMember.Role.MANAGER.value},
+        ),
+        (
+            Reason.ORG_MANAGER, Task.objects.all(), 'project__organization__memberships__user_id', 'pk',
+            {'project__organization__memberships__role': OrgRole.Manager},
+        ),
+    ]
+    for reason, queryset, user_field, task_field, lookups in sources:
+        # A single filter() call so the scope shares the membership join instead of adding another.
+        lookups.update(_scope_lookups(user_field, task_field, user_ids, task_ids))
+        for pair in queryset.filter(**lookups).values_list(user_field, task_field):
+            desired[pair] |= reason
+    return desired
+
+
+@transaction.atomic
+def refresh_inbox(user_ids=None, task_ids=None, dry_run=False):
+    """Rebuild inbox rows for the scope (``None`` means everything); returns change counts."""
+    desired = desired_reasons(user_ids, task_ids)
+    entries = TaskInbox.objects.all()
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+    if task_ids is not None:
+        entries = entries.filter(task_id__in=task_ids)
+    existing = {
+        (entry.user_id, entry.task_id): entry
+        for entry in entries.only('user_id', 'task_id', 'reason', 'status', 'due_date', 'is_open')
+    }
+
+    task_fields = {
+        pk: (status, due_date)
+        for pk, status, due_date in Task.objects.filter(
+            pk__in={task_id for _, task_id in desired.keys() | existing.keys()}
+        ).values_list('pk', 'status', 'due_date')
+    }
+
+    stale = [entry.pk for pair, entry in existing.items() if pair not in desired]
+    changed, missing = [], []
+    for (user_id, task_id), reason in desired.items():
+        status, due_date = task_fields[task_id]
+        entry = existing.get((user_id, task_id))
+        if entry is None:
+            missing.append(_entry(user_id, task_id, reason, status, due_date))
+        elif (entry.reason, entry.status, entry.due_date, entry.is_open) != (reason, status, due_date, status != Status.Done):
+            entry.reason, entry.status, entry.due_date = reason, status, due_date
+            entry.is_open = status != Status.Done
+            changed.append(entry)
+
+    if not dry_run:
+        TaskInbox.objects.filter(pk__in=stale).delete()
+        TaskInbox.objects.bulk_update(changed, ['reason', 'status', 'due_date', 'is_open'])
+        TaskInbox.objects.bulk_create(missing)
+    return {'created': len(missing), 'updated': len(changed), 'deleted': len(stale)}
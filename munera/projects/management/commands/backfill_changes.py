@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from projects.changes import COMPACT_CHUNK_SIZE, backfill_changes
+
+
+class Command(BaseCommand):
+    help = "Log change-feed entries for live rows that have none, such as rows written before the feed existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=COMPACT_CHUNK_SIZE, help="Rows checked per transaction.")
+
+    def handle(self, *args, chunk_size, **options):
+        logged = backfill_changes(chunk_size=chunk_size)
+        self.stdout.write(f"Logged {logged} entries.")
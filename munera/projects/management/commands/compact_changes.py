@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from projects.changes import COMPACT_CHUNK_SIZE, compact_changes
+
+
+class Command(BaseCommand):
+    help = "Drop superseded change-feed entries and tombstones older than --days."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Keep tombstones logged more recently than this.")
+        parser.add_argument('--chunk-size', type=int, default=COMPACT_CHUNK_SIZE, help="Rows deleted per transaction.")
+
+    def handle(self, *args, days, chunk_size, **options):
+        counts = compact_changes(timezone.now() - timedelta(days=days), chunk_size=chunk_size)
+        self.stdout.write(
+            f"Removed {counts['superseded']} superseded entries and {counts['tombstones']} tombstones; "
+            f"horizon is #{counts['horizon']}."
+        )
@@ -0,0 +1,20 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from projects.recurrence import DEFAULT_HORIZON_DAYS, generate_occurrences
+
+
+class Command(BaseCommand):
+    help = "Create upcoming occurrences of recurring task templates. Safe to run as often as you like."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON_DAYS, help="Days ahead to materialize.")
+        parser.add_argument('--today', type=date.fromisoformat, default=None, help="Override today's date (YYYY-MM-DD).")
+
+    def handle(self, *args, horizon, today, **options):
+        counts = generate_occurrences(today or date.today(), horizon)
+        self.stdout.write(
+            f"Processed {counts['templates']} templates: "
+            f"{counts['tasks']} tasks and {counts['assignments']} assignments created."
+        )
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from projects.archive import PURGE_CHUNK_SIZE, purge_archived
+
+
+class Command(BaseCommand):
+    help = "Permanently delete projects and tasks archived more than --days ago, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help="Keep anything archived more recently than this.")
+        parser.add_argument('--chunk-size', type=int, default=PURGE_CHUNK_SIZE, help="Rows deleted per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted without deleting.")
+
+    def handle(self, *args, days, chunk_size, dry_run, **options):
+        counts = purge_archived(timezone.now() - timedelta(days=days), chunk_size=chunk_size, dry_run=dry_run)
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(f"{verb} {counts['tasks']} tasks and {counts['projects']} projects.")
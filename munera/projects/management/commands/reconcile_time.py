@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from projects.timesheets import reconcile_time
+
+
+class Command(BaseCommand):
+    help = "Recompute the time-tracking rollups from the logged entries and report any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report the drift without fixing it.")
+
+    def handle(self, *args, dry_run=False, **options):
+        verb = "Would change" if dry_run else "Changed"
+        for name, counts in reconcile_time(dry_run=dry_run).items():
+            self.stdout.write(
+                f"{verb} {name} rows: {counts['created']} created, {counts['updated']} updated, {counts['deleted']} deleted."
+            )
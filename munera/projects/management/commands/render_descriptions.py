@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.markup import RENDERED_FIELDS, SOURCE_FIELDS, render_description
+
+CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Render task and project descriptions whose stored HTML is missing or out of date."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows read and written per batch.")
+
+    def handle(self, *args, chunk_size, **options):
+        for model in SOURCE_FIELDS:
+            rendered = 0
+            last = 0
+            while True:
+                rows = list(model.all_objects.filter(pk__gt=last).order_by('pk')[:chunk_size])
+                if not rows:
+                    break
+                stale = [row for row in rows if render_description(row)]
+                with transaction.atomic():
+                    model.all_objects.bulk_update(stale, RENDERED_FIELDS)
+                rendered += len(stale)
+                last = rows[-1].pk
+            self.stdout.write(f"Rendered {rendered} {model._meta.verbose_name_plural}.")
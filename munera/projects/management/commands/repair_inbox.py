@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from projects.inbox import refresh_inbox
+
+
+class Command(BaseCommand):
+    help = "Rebuild TaskInbox rows from assignments and memberships and report any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help="Limit to this user id (repeatable).")
+        parser.add_argument('--dry-run', action='store_true', help="Report the drift without fixing it.")
+
+    def handle(self, *args, user_ids=None, dry_run=False, **options):
+        counts = refresh_inbox(user_ids=user_ids, dry_run=dry_run)
+        verb = "Would change" if dry_run else "Changed"
+        self.stdout.write(
+            f"{verb} inbox rows: {counts['created']} created, {counts['updated']} updated, {counts['deleted']} deleted."
+        )
@@ -0,0 +1,18 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from projects.digests import DUE_SOON_DAYS, SINKS, send_digests
+
+
+class Command(BaseCommand):
+    help = "Build overdue and due-soon task digests for every user and hand them to a sink."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sink', choices=sorted(SINKS), default='email', help="Where digests go.")
+        parser.add_argument('--days', type=int, default=DUE_SOON_DAYS, help="How many days ahead counts as due soon.")
+        parser.add_argument('--today', type=date.fromisoformat, default=None, help="Override today's date (YYYY-MM-DD).")
+
+    def handle(self, *args, sink, days, today, **options):
+        count = send_digests(today or date.today(), SINKS[sink](), days)
+        self.stdout.write(f"Built {count} digests ({sink}).")
@@ -0,0 +1,166 @@
+"""
+Stored Markdown rendering for task and project descriptions.
+
+``render_description`` turns the source text into sanitized HTML and a short
+plain-text excerpt and keeps both on the row, along with a hash of the source.
+It runs from ``pre_save`` and from ``save_changes``, and does nothing when the
+hash still matches, so pages read ``desc_html``/``desc_excerpt`` and never
+render per view. ``@username`` and ``#<task id>`` references are resolved
+against the row's organization with at most one query each per save.
+
+The output of ``markdown`` goes through a tag, attribute and URL-scheme
+allowlist, which is what strips raw HTML and ``javascript:`` links out of
+Markdown input.
+"""
+import hashlib
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+import markdown
+from django.urls import reverse
+from django.utils.html import escape, strip_tags
+from django.utils.text import Truncator
+
+from users.models import User
+from .models import Project, Task
+
+# Bump to re-render every stored description (``manage.py render_descriptions``).
+RENDERER_VERSION = 1
+EXCERPT_WORDS = 20
+EXCERPT_CHARS = 240
+RENDERED_FIELDS = ['desc_html', 'desc_excerpt', 'desc_hash']
+SOURCE_FIELDS = {Task: 'task_desc', Project: 'project_desc'}
+
+MENTION_RE = re.compile(r'(?<![\w@/])@([\w.+-]{1,30})(?<![.])')
+TASK_REF_RE = re.compile(r'(?<![\w&/])#(\d{1,9})\b')
+CODE_SPAN_RE = re.compile(r'(`+[^`]*`+)')
+
+ALLOWED_TAGS = {
+    'p', 'br', 'strong', 'em', 'code', 'pre', 'blockquote', 'ul', 'ol', 'li', 'hr', 'a', 'span',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+}
+ALLOWED_ATTRS = {'a': {'href', 'class'}, 'span': {'class'}}
+SAFE_URL_RE = re.compile(r'^(https?:|mailto:|/(?!/))', re.I)
+DROP_CONTENT = {'script', 'style'}
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT:
+            self.skipping += 1
+        if self.skipping or tag not in ALLOWED_TAGS:
+            return
+        kept = []
+        for name, value in attrs:
+            if name not in ALLOWED_ATTRS.get(tag, ()) or value is None:
+                continue
+            if name == 'href' and not SAFE_URL_RE.match(value.strip()):
+                continue
+            kept.append(f' {name}="{escape(value)}"')
+        if tag == 'a' and not any(part.startswith(' href=') for part in kept):
+            return
+        self.parts.append(f"<{tag}{''.join(kept)}>")
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT:
+            self.skipping = max(self.skipping - 1, 0)
+        elif not self.skipping and tag in ALLOWED_TAGS and tag not in ('br', 'hr'):
+            self.parts.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(escape(data))
+
+
+def sanitize(html):
+    """Keep only allowlisted tags, attributes and URL schemes."""
+    sanitizer = _Sanitizer()
+    sanitizer.feed(html)
+    sanitizer.close()
+    # An <a> dropped for an unsafe href still has its closing tag; drop the strays.
+    return _balance_links(''.join(sanitizer.parts))
+
+
+def _balance_links(html):
+    depth, out = 0, []
+    for piece in re.split(r'(<a [^>]*>|</a>)', html):
+        if piece.startswith('<a '):
+            depth += 1
+        elif piece == '</a>':
+            if not depth:
+                continue
+            depth -= 1
+        out.append(piece)
+    return ''.join(out)
+
+
+def content_hash(source):
+    return hashlib.sha256(f'{RENDERER_VERSION}:{source}'.encode()).hexdigest()
+
+
+def _organization(instance):
+    if isinstance(instance, Project):
+        return [instance.organization_id]
+    return Project.all_objects.filter(pk=instance.project_id).values('organization_id')
+
+
+def _references(text, organization):
+    names = set(MENTION_RE.findall(text))
+    task_ids = {int(pk) for pk in TASK_REF_RE.findall(text)}
+    users = set(User.objects.filter(
+        user_name__in=names, organization_memberships__organization__in=organization,
+    ).values_list('user_name', flat=True)) if names else set()
+    tasks = set(Task.objects.filter(
+        pk__in=task_ids, project__organization__in=organization,
+    ).values_list('pk', flat=True)) if task_ids else set()
+    return users, tasks
+
+
+def _link_references(text, users, tasks):
+    def mention(match):
+        name = match.group(1)
+        return f'<span class="mention">@{name}</span>' if name in users else match.group(0)
+
+    def task_ref(match):
+        pk = int(match.group(1))
+        if pk not in tasks:
+            return match.group(0)
+        return f'<a class="task-link" href="{reverse("projects:task-detail", args=[pk])}">#{pk}</a>'
+
+    # Leave code spans as written.
+    parts = CODE_SPAN_RE.split(text)
+    for index in range(0, len(parts), 2):
+        parts[index] = TASK_REF_RE.sub(task_ref, MENTION_RE.sub(mention, parts[index]))
+    return ''.join(parts)
+
+
+def _to_html(text):
+    return markdown.markdown(text, extensions=['fenced_code', 'sane_lists', 'nl2br'])
+
+
+def render_markup(source, organization):
+    """``(html, excerpt)`` for ``source``; ``organization`` is an id list or a queryset of ids."""
+    if not source.strip():
+        return '', ''
+    users, tasks = _references(source, organization)
+    html = sanitize(_to_html(_link_references(source, users, tasks)))
+    plain = ' '.join(strip_tags(html.replace('<br>', ' ').replace('</p>', ' ')).split())
+    excerpt = Truncator(Truncator(unescape(plain)).words(EXCERPT_WORDS)).chars(EXCERPT_CHARS)
+    return html, excerpt
+
+
+def render_description(instance):
+    """Refresh the stored rendering if the description changed; returns the fields it set."""
+    source = getattr(instance, SOURCE_FIELDS[type(instance)]) or ''
+    digest = content_hash(source)
+    if digest == instance.desc_hash:
+        return []
+    instance.desc_html, instance.desc_excerpt = render_markup(source, _organization(instance))
+    instance.desc_hash = digest
+    return list(RENDERED_FIELDS)
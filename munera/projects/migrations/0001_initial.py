@@ -0,0 +1,307 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:41
+
+import datetime
+import django.core.serializers.json
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+import munera.integrity
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('organization', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCompaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horizon', models.BigIntegerField(help_text='Tombstones Up To This Sequence Were Dropped', verbose_name='Horizon')),
+                ('superseded', models.PositiveIntegerField(default=0, verbose_name='Superseded Entries Removed')),
+                ('tombstones', models.PositiveIntegerField(default=0, verbose_name='Tombstones Removed')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('task_id', models.AutoField(editable=False, help_text='Task ID', primary_key=True, serialize=False, verbose_name='Task ID')),
+                ('status', models.CharField(choices=[('To Do', 'Todo'), ('In Progress', 'Inprogress'), ('Testing', 'Testing'), ('Done', 'Done')], help_text='Task Status', max_length=11, verbose_name='Status')),
+                ('task_name', models.CharField(help_text='Name Of Task', max_length=100, verbose_name='Task Name')),
+                ('task_desc', models.TextField(blank=True, help_text='Description Of Task (Markdown)', null=True, verbose_name='Description')),
+                ('desc_html', models.TextField(blank=True, default='', editable=False, help_text='Rendered Description', verbose_name='Description HTML')),
+                ('desc_excerpt', models.CharField(blank=True, default='', editable=False, help_text='Plain-Text Start Of The Description', max_length=255, verbose_name='Excerpt')),
+                ('desc_hash', models.CharField(blank=True, default='', editable=False, help_text='Hash Of The Rendered Source', max_length=64, verbose_name='Description Hash')),
+                ('due_date', models.DateField(blank=True, help_text='Task Due Date', null=True, verbose_name='Due Date')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Task Created At', verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Task Last Modified At', verbose_name='Updated At')),
+                ('archived_at', models.DateTimeField(blank=True, help_text='Task Archived At', null=True, verbose_name='Archived At')),
+                ('version', models.PositiveIntegerField(default=1, editable=False, help_text='Bumped On Every Edit', verbose_name='Version')),
+                ('occurrence_date', models.DateField(blank=True, help_text='Scheduled Date Of A Recurring Task', null=True, verbose_name='Occurrence Date')),
+                ('rank', models.CharField(blank=True, default='', editable=False, help_text='Position Within Its Board Column', max_length=64, verbose_name='Rank')),
+            ],
+            bases=(munera.integrity.AtomicSaveMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('seq', models.BigAutoField(help_text='Position In The Feed', primary_key=True, serialize=False, verbose_name='Sequence')),
+                ('entity', models.CharField(choices=[('task', 'Task'), ('assignment', 'Task Assignment'), ('project', 'Project'), ('project_member', 'Project Member'), ('org_member', 'Organization Member')], max_length=14, verbose_name='Entity')),
+                ('entity_id', models.BigIntegerField(help_text='Primary Key Of The Changed Row', verbose_name='Entity ID')),
+                ('org_id', models.IntegerField(help_text='Organization Whose Members Receive The Change', verbose_name='Organization ID')),
+                ('member_id', models.IntegerField(blank=True, help_text='User Whose Membership Changed', null=True, verbose_name='Member ID')),
+                ('data', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Row Snapshot, Empty For Deletes', null=True, verbose_name='Data')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created At')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['org_id', 'seq'], name='change_org_feed'), models.Index(condition=models.Q(('member_id__isnull', False)), fields=['member_id', 'seq'], name='change_member_feed'), models.Index(fields=['entity', 'entity_id', 'seq'], name='change_entity')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('project_id', models.AutoField(editable=False, help_text='Project ID', primary_key=True, serialize=False, verbose_name='Project ID')),
+                ('project_name', models.CharField(help_text='Name Of Project', max_length=100, verbose_name='Project Name')),
+                ('project_desc', models.TextField(blank=True, help_text='Description Of Project (Markdown)', null=True, verbose_name='Description')),
+                ('desc_html', models.TextField(blank=True, default='', editable=False, help_text='Rendered Description', verbose_name='Description HTML')),
+                ('desc_excerpt', models.CharField(blank=True, default='', editable=False, help_text='Plain-Text Start Of The Description', max_length=255, verbose_name='Excerpt')),
+                ('desc_hash', models.CharField(blank=True, default='', editable=False, help_text='Hash Of The Rendered Source', max_length=64, verbose_name='Description Hash')),
+                ('start_date', models.DateField(blank=True, help_text='Project Start Date', null=True, verbose_name='Start Date')),
+                ('end_date', models.DateField(blank=True, help_text='Project End Date', null=True, verbose_name='End Date')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Project Created At', verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Project Last Modified At', verbose_name='Updated At')),
+                ('archived_at', models.DateTimeField(blank=True, help_text='Project Archived At', null=True, verbose_name='Archived At')),
+                ('version', models.PositiveIntegerField(default=1, editable=False, help_text='Bumped On Every Edit', verbose_name='Version')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_projects', to=settings.AUTH_USER_MODEL)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='projects', to='organization.organization')),
+            ],
+            bases=(munera.integrity.AtomicSaveMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='ProjectMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_joined', models.DateField(default=datetime.date.today, help_text='Date User Joined Project', verbose_name='Joined Date')),
+                ('role', models.CharField(choices=[('Manager', 'Manager'), ('Member', 'Member')], default='Member', help_text='Users role in this member', max_length=7)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='projects.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('project', 'user')},
+            },
+            bases=(munera.integrity.AtomicSaveMixin, models.Model),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='members',
+            field=models.ManyToManyField(related_name='projects', through='projects.ProjectMember', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='ProjectWeekTime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minutes', models.IntegerField(default=0, verbose_name='Minutes')),
+                ('entries', models.IntegerField(default=0, verbose_name='Entries')),
+                ('week', models.DateField(verbose_name='Week')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_time', to='projects.project')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskTime',
+            fields=[
+                ('minutes', models.IntegerField(default=0, verbose_name='Minutes')),
+                ('entries', models.IntegerField(default=0, verbose_name='Entries')),
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='time_total', serialize=False, to='projects.task')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='projects.project'),
+        ),
+        migrations.CreateModel(
+            name='TaskAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_assigned', models.DateField(default=datetime.date.today, help_text='Date User Assigned To Task', verbose_name='Date Assigned')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='projects.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_assignments', to=settings.AUTH_USER_MODEL)),
+            ],
+            bases=(munera.integrity.AtomicSaveMixin, models.Model),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='assignees',
+            field=models.ManyToManyField(related_name='tasks', through='projects.TaskAssignment', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('blocked', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocked_by_edges', to='projects.task')),
+                ('blocker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocking_edges', to='projects.task')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='blocked_by',
+            field=models.ManyToManyField(related_name='blocking', through='projects.TaskDependency', through_fields=('blocked', 'blocker'), to='projects.task'),
+        ),
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('status', 'Status'), ('assignees', 'Assignees'), ('due_date', 'Due Date')], help_text='Field That Changed', max_length=9, verbose_name='Kind')),
+                ('old_value', models.TextField(blank=True, default='', help_text='Previous Value (Removed User IDs For Assignees)', verbose_name='Old Value')),
+                ('new_value', models.TextField(blank=True, default='', help_text='New Value (Added User IDs For Assignees)', verbose_name='New Value')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Time Of Change', verbose_name='Changed At')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='task_events', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='projects.task')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskInbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.PositiveSmallIntegerField(help_text='Bitmask Of Reasons The Task Is Listed', verbose_name='Reason')),
+                ('status', models.CharField(choices=[('To Do', 'Todo'), ('In Progress', 'Inprogress'), ('Testing', 'Testing'), ('Done', 'Done')], help_text='Copy Of Task Status', max_length=11, verbose_name='Status')),
+                ('due_date', models.DateField(blank=True, help_text='Copy Of Task Due Date', null=True, verbose_name='Due Date')),
+                ('is_open', models.BooleanField(default=True, help_text='Task Is Not Done', verbose_name='Open')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='projects.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template_name', models.CharField(help_text='Name Given To Generated Tasks', max_length=100, verbose_name='Task Name')),
+                ('task_desc', models.TextField(blank=True, help_text='Description Given To Generated Tasks', null=True, verbose_name='Description')),
+                ('frequency', models.CharField(choices=[('none', 'Does Not Repeat'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], default='none', help_text='How Often A Task Is Generated', max_length=7, verbose_name='Repeats')),
+                ('interval', models.PositiveSmallIntegerField(default=1, help_text='Repeat Every N Days/Weeks/Months', verbose_name='Interval')),
+                ('starts_on', models.DateField(default=datetime.date.today, help_text='First Occurrence', verbose_name='Starts On')),
+                ('ends_on', models.DateField(blank=True, help_text='Last Possible Occurrence', null=True, verbose_name='Ends On')),
+                ('generated_through', models.DateField(blank=True, help_text='Occurrences Exist Up To This Date', null=True, verbose_name='Generated Through')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_task_templates', to=settings.AUTH_USER_MODEL)),
+                ('default_assignees', models.ManyToManyField(blank=True, related_name='task_templates', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_templates', to='projects.project')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='projects.tasktemplate'),
+        ),
+        migrations.CreateModel(
+            name='TimeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('work_date', models.DateField(help_text='Day The Work Was Done', verbose_name='Date')),
+                ('minutes', models.PositiveIntegerField(help_text='Time Spent In Minutes', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(1440)], verbose_name='Minutes')),
+                ('note', models.CharField(blank=True, default='', help_text='What The Time Was Spent On', max_length=200, verbose_name='Note')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_entries', to='projects.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'time entries',
+            },
+            bases=(munera.integrity.AtomicSaveMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='MemberWeekTime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minutes', models.IntegerField(default=0, verbose_name='Minutes')),
+                ('entries', models.IntegerField(default=0, verbose_name='Entries')),
+                ('week', models.DateField(verbose_name='Week')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_time', to='organization.organization')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_time', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'week'], name='member_week_time_org')],
+                'constraints': [models.UniqueConstraint(fields=('organization', 'user', 'week'), name='unique_member_week_time')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text='Message Type', max_length=20, verbose_name='Kind')),
+                ('digest_date', models.DateField(help_text='Date The Message Covers', verbose_name='Digest Date')),
+                ('subject', models.CharField(max_length=200, verbose_name='Subject')),
+                ('body', models.TextField(verbose_name='Body')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent At')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'kind', 'digest_date'), name='unique_outbox_message')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['organization'], name='project_live_org'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('archived_at__isnull', False)), fields=['archived_at'], name='project_archived'),
+        ),
+        migrations.AddConstraint(
+            model_name='projectweektime',
+            constraint=models.UniqueConstraint(fields=('project', 'week'), name='unique_project_week_time'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='taskassignment',
+            unique_together={('task', 'user')},
+        ),
+        migrations.AddConstraint(
+            model_name='taskdependency',
+            constraint=models.UniqueConstraint(fields=('blocker', 'blocked'), name='unique_task_dependency'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdependency',
+            constraint=models.CheckConstraint(condition=models.Q(('blocker', models.F('blocked')), _negated=True), name='task_dependency_not_self'),
+        ),
+        migrations.AddIndex(
+            model_name='taskevent',
+            index=models.Index(fields=['task', 'created_at'], name='task_event_timeline'),
+        ),
+        migrations.AddIndex(
+            model_name='taskinbox',
+            index=models.Index(condition=models.Q(('is_open', True)), fields=['user', 'due_date'], name='task_inbox_open'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='taskinbox',
+            unique_together={('user', 'task')},
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('archived_at__isnull', True)), fields=['project', 'status', 'rank'], name='task_live_board'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('archived_at__isnull', False)), fields=['archived_at'], name='task_archived'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('template', 'occurrence_date'), name='unique_task_occurrence'),
+        ),
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['task', 'user', 'work_date'], name='time_entry_task_user'),
+        ),
+    ]
@@ -1,7 +1,11 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import CASCADE
+from django.db.models import CASCADE, SET_NULL
+from django.utils import timezone
 from datetime import date
 
+from munera.integrity import AtomicSaveMixin
 from organization.models import Organization
 
 
@@ -13,23 +17,45 @@ class Status(models.TextChoices):
     Done = "Done"
 
 
-class Project(models.Model):
+class LiveManager(models.Manager):
+    """Hides archived rows. ``all_objects`` on the same model still sees them."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(archived_at__isnull=True)
+
+
+class Project(AtomicSaveMixin, models.Model):
     project_id = models.AutoField(primary_key=True, editable=False, null=False, help_text="Project ID", verbose_name="Project ID")
     organization = models.ForeignKey(Organization, on_delete=CASCADE, related_name="projects")
     created_by = models.ForeignKey('users.User', on_delete=CASCADE, related_name="created_projects")
     project_name = models.CharField(max_length=100, null=False, help_text="Name Of Project", verbose_name="Project Name")
-    project_desc = models.TextField(blank=True, null=True, help_text="Description Of Project", verbose_name="Description")
+    project_desc = models.TextField(blank=True, null=True, help_text="Description Of Project (Markdown)", verbose_name="Description")
+    desc_html = models.TextField(blank=True, default="", editable=False, help_text="Rendered Description", verbose_name="Description HTML")
+    desc_excerpt = models.CharField(max_length=255, blank=True, default="", editable=False, help_text="Plain-Text Start Of The Description", verbose_name="Excerpt")
+    desc_hash = models.CharField(max_length=64, blank=True, default="", editable=False, help_text="Hash Of The Rendered Source", verbose_name="Description Hash")
     start_date = models.DateField(blank=True, null=True, help_text="Project Start Date", verbose_name="Start Date")
     end_date = models.DateField(blank=True, null=True, help_text="Project End Date", verbose_name="End Date")
-    
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Project Created At", verbose_name="Created At")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Project Last Modified At", verbose_name="Updated At")
+    archived_at = models.DateTimeField(blank=True, null=True, help_text="Project Archived At", verbose_name="Archived At")
+    version = models.PositiveIntegerField(default=1, editable=False, help_text="Bumped On Every Edit", verbose_name="Version")
     
     members = models.ManyToManyField('users.User', through='ProjectMember', related_name='projects')
 
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["organization"], condition=models.Q(archived_at__isnull=True), name="project_live_org"),
+            models.Index(fields=["archived_at"], condition=models.Q(archived_at__isnull=False), name="project_archived"),
+        ]
+
     def __str__(self):
         return f"{self.project_name}"
 
 
-class ProjectMember(models.Model):
+class ProjectMember(AtomicSaveMixin, models.Model):
     class Role(models.TextChoices):
         MANAGER = "Manager", "Manager"
         MEMBER = "Member", "Member"
@@ -51,20 +77,69 @@ class ProjectMember(models.Model):
         return f"{self.user} ({self.role}) @ {self.project}"
 
 
-class Task(models.Model):
+class TaskTemplate(models.Model):
+    class Frequency(models.TextChoices):
+        NONE = "none", "Does Not Repeat"
+        DAILY = "daily", "Daily"
+        WEEKLY = "weekly", "Weekly"
+        MONTHLY = "monthly", "Monthly"
+
+    project = models.ForeignKey(Project, on_delete=CASCADE, related_name="task_templates")
+    created_by = models.ForeignKey('users.User', on_delete=SET_NULL, null=True, blank=True, related_name="created_task_templates")
+    template_name = models.CharField(max_length=100, help_text="Name Given To Generated Tasks", verbose_name="Task Name")
+    task_desc = models.TextField(blank=True, null=True, help_text="Description Given To Generated Tasks", verbose_name="Description")
+    default_assignees = models.ManyToManyField('users.User', blank=True, related_name="task_templates")
+    frequency = models.CharField(max_length=7, choices=Frequency.choices, default=Frequency.NONE, help_text="How Often A Task Is Generated", verbose_name="Repeats")
+    interval = models.PositiveSmallIntegerField(default=1, help_text="Repeat Every N Days/Weeks/Months", verbose_name="Interval")
+    starts_on = models.DateField(default=date.today, help_text="First Occurrence", verbose_name="Starts On")
+    ends_on = models.DateField(blank=True, null=True, help_text="Last Possible Occurrence", verbose_name="Ends On")
+    generated_through = models.DateField(blank=True, null=True, help_text="Occurrences Exist Up To This Date", verbose_name="Generated Through")
+    is_active = models.BooleanField(default=True, verbose_name="Active")
+
+    def __str__(self):
+        return f"{self.template_name} ({self.get_frequency_display()})"
+
+
+class Task(AtomicSaveMixin, models.Model):
     task_id = models.AutoField(primary_key=True, editable=False, null=False, help_text="Task ID", verbose_name="Task ID")
     project = models.ForeignKey(Project, on_delete=CASCADE, related_name="tasks",)
     status = models.CharField(max_length=11, choices=Status.choices, help_text="Task Status", verbose_name="Status")
     task_name = models.CharField(max_length=100, null=False, help_text="Name Of Task", verbose_name="Task Name")
-    task_desc = models.TextField(blank=True, null=True, help_text="Description Of Task", verbose_name="Description")
+    task_desc = models.TextField(blank=True, null=True, help_text="Description Of Task (Markdown)", verbose_name="Description")
+    desc_html = models.TextField(blank=True, default="", editable=False, help_text="Rendered Description", verbose_name="Description HTML")
+    desc_excerpt = models.CharField(max_length=255, blank=True, default="", editable=False, help_text="Plain-Text Start Of The Description", verbose_name="Excerpt")
+    desc_hash = models.CharField(max_length=64, blank=True, default="", editable=False, help_text="Hash Of The Rendered Source", verbose_name="Description Hash")
     due_date = models.DateField(blank=True, null=True, help_text="Task Due Date", verbose_name="Due Date")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Task Created At", verbose_name="Created At")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Task Last Modified At", verbose_name="Updated At")
+    archived_at = models.DateTimeField(blank=True, null=True, help_text="Task Archived At", verbose_name="Archived At")
+    version = models.PositiveIntegerField(default=1, editable=False, help_text="Bumped On Every Edit", verbose_name="Version")
     
+    template = models.ForeignKey('TaskTemplate', on_delete=SET_NULL, null=True, blank=True, related_name="occurrences")
+    occurrence_date = models.DateField(blank=True, null=True, help_text="Scheduled Date Of A Recurring Task", verbose_name="Occurrence Date")
+    rank = models.CharField(max_length=64, blank=True, default="", editable=False, help_text="Position Within Its Board Column", verbose_name="Rank")
+
     assignees = models.ManyToManyField('users.User', through='TaskAssignment', related_name='tasks')
+    blocked_by = models.ManyToManyField(
+        'self', through='TaskDependency', through_fields=('blocked', 'blocker'), symmetrical=False, related_name='blocking',
+    )
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["template", "occurrence_date"], name="unique_task_occurrence"),
+        ]
+        indexes = [
+            models.Index(fields=["project", "status", "rank"], condition=models.Q(archived_at__isnull=True), name="task_live_board"),
+            models.Index(fields=["archived_at"], condition=models.Q(archived_at__isnull=False), name="task_archived"),
+        ]
 
     def __str__(self):
         return f"{self.task_name}: {self.status}"
 
-class TaskAssignment(models.Model):
+class TaskAssignment(AtomicSaveMixin, models.Model):
     task = models.ForeignKey(Task, on_delete=CASCADE, related_name="assignments")
     user = models.ForeignKey('users.User', on_delete=CASCADE, related_name="task_assignments")
     date_assigned = models.DateField(default=date.today, help_text="Date User Assigned To Task", verbose_name="Date Assigned")
@@ -72,4 +147,190 @@ class TaskAssignment(models.Model):
         unique_together = ("task", "user")
 
     def __str__(self):
-        return f"{self.user} -> {self.task}"
\ No newline at end of file
+        return f"{self.user} -> {self.task}"
+
+
+class TaskDependency(models.Model):
+    blocker = models.ForeignKey(Task, on_delete=CASCADE, related_name="blocking_edges")
+    blocked = models.ForeignKey(Task, on_delete=CASCADE, related_name="blocked_by_edges")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["blocker", "blocked"], name="unique_task_dependency"),
+            models.CheckConstraint(condition=~models.Q(blocker=models.F("blocked")), name="task_dependency_not_self"),
+        ]
+
+    def __str__(self):
+        return f"{self.blocker_id} blocks {self.blocked_id}"
+
+
+class TaskEvent(models.Model):
+    class Kind(models.TextChoices):
+        STATUS = "status", "Status"
+        ASSIGNEES = "assignees", "Assignees"
+        DUE_DATE = "due_date", "Due Date"
+
+    task = models.ForeignKey(Task, on_delete=CASCADE, related_name="events")
+    actor = models.ForeignKey('users.User', on_delete=SET_NULL, null=True, blank=True, related_name="task_events")
+    kind = models.CharField(max_length=9, choices=Kind.choices, help_text="Field That Changed", verbose_name="Kind")
+    # Text, not a bounded CharField: a bulk reassignment lists every user id that changed.
+    old_value = models.TextField(blank=True, default="", help_text="Previous Value (Removed User IDs For Assignees)", verbose_name="Old Value")
+    new_value = models.TextField(blank=True, default="", help_text="New Value (Added User IDs For Assignees)", verbose_name="New Value")
+    created_at = models.DateTimeField(default=timezone.now, help_text="Time Of Change", verbose_name="Changed At")
+
+    class Meta:
+        indexes = [models.Index(fields=["task", "created_at"], name="task_event_timeline")]
+
+    def __str__(self):
+        return f"{self.task_id} {self.kind}: {self.old_value} -> {self.new_value}"
+
+
+class TaskInbox(models.Model):
+    """One row per (user, task) the user should see in "my tasks", kept in sync by ``projects.inbox``."""
+
+    class Reason(models.IntegerChoices):
+        ASSIGNED = 1, "Assigned"
+        PROJECT_MANAGER = 2, "Project Manager"
+        ORG_MANAGER = 4, "Organization Manager"
+
+    user = models.ForeignKey('users.User', on_delete=CASCADE, related_name="inbox")
+    task = models.ForeignKey(Task, on_delete=CASCADE, related_name="inbox_entries")
+    reason = models.PositiveSmallIntegerField(help_text="Bitmask Of Reasons The Task Is Listed", verbose_name="Reason")
+    status = models.CharField(max_length=11, choices=Status.choices, help_text="Copy Of Task Status", verbose_name="Status")
+    due_date = models.DateField(blank=True, null=True, help_text="Copy Of Task Due Date", verbose_name="Due Date")
+    is_open = models.BooleanField(default=True, help_text="Task Is Not Done", verbose_name="Open")
+
+    class Meta:
+        unique_together = ("user", "task")
+        indexes = [models.Index(fields=["user", "due_date"], condition=models.Q(is_open=True), name="task_inbox_open")]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.task_id} ({self.reason})"
+
+
+class OutboxMessage(models.Model):
+    """A generated notification waiting to be delivered (or read in-app)."""
+
+    user = models.ForeignKey('users.User', on_delete=CASCADE, related_name="outbox")
+    kind = models.CharField(max_length=20, help_text="Message Type", verbose_name="Kind")
+    digest_date = models.DateField(help_text="Date The Message Covers", verbose_name="Digest Date")
+    subject = models.CharField(max_length=200, verbose_name="Subject")
+    body = models.TextField(verbose_name="Body")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name="Sent At")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "kind", "digest_date"], name="unique_outbox_message"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for {self.user_id} on {self.digest_date}"
+
+
+class Change(models.Model):
+    """One entry in the sync feed (``projects.changes``); ``data`` is ``None`` for a tombstone."""
+
+    class Entity(models.TextChoices):
+        TASK = "task", "Task"
+        ASSIGNMENT = "assignment", "Task Assignment"
+        PROJECT = "project", "Project"
+        PROJECT_MEMBER = "project_member", "Project Member"
+        ORG_MEMBER = "org_member", "Organization Member"
+
+    seq = models.BigAutoField(primary_key=True, help_text="Position In The Feed", verbose_name="Sequence")
+    entity = models.CharField(max_length=14, choices=Entity.choices, verbose_name="Entity")
+    entity_id = models.BigIntegerField(help_text="Primary Key Of The Changed Row", verbose_name="Entity ID")
+    # Plain ids rather than foreign keys: tombstones outlive the rows they describe.
+    org_id = models.IntegerField(help_text="Organization Whose Members Receive The Change", verbose_name="Organization ID")
+    member_id = models.IntegerField(blank=True, null=True, help_text="User Whose Membership Changed", verbose_name="Member ID")
+    data = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder, help_text="Row Snapshot, Empty For Deletes", verbose_name="Data")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Created At")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["org_id", "seq"], name="change_org_feed"),
+            models.Index(fields=["member_id", "seq"], condition=models.Q(member_id__isnull=False), name="change_member_feed"),
+            models.Index(fields=["entity", "entity_id", "seq"], name="change_entity"),
+        ]
+
+    def __str__(self):
+        return f"#{self.seq} {self.entity} {self.entity_id}{' deleted' if self.data is None else ''}"
+
+
+class ChangeCompaction(models.Model):
+    """A run of ``compact_changes``; clients whose cursor is below ``horizon`` must start over."""
+
+    horizon = models.BigIntegerField(help_text="Tombstones Up To This Sequence Were Dropped", verbose_name="Horizon")
+    superseded = models.PositiveIntegerField(default=0, verbose_name="Superseded Entries Removed")
+    tombstones = models.PositiveIntegerField(default=0, verbose_name="Tombstones Removed")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+
+    def __str__(self):
+        return f"Compacted through #{self.horizon}"
+
+
+class TimeEntry(AtomicSaveMixin, models.Model):
+    """Time a user spent on a task on one day; totals live in the rollups below (``projects.timesheets``)."""
+
+    task = models.ForeignKey(Task, on_delete=CASCADE, related_name="time_entries")
+    user = models.ForeignKey('users.User', on_delete=CASCADE, related_name="time_entries")
+    work_date = models.DateField(help_text="Day The Work Was Done", verbose_name="Date")
+    minutes = models.PositiveIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(24 * 60)], help_text="Time Spent In Minutes", verbose_name="Minutes",
+    )
+    note = models.CharField(max_length=200, blank=True, default="", help_text="What The Time Was Spent On", verbose_name="Note")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+
+    class Meta:
+        verbose_name_plural = "time entries"
+        indexes = [models.Index(fields=["task", "user", "work_date"], name="time_entry_task_user")]
+
+    def __str__(self):
+        return f"{self.minutes}m on {self.task_id} by {self.user_id} ({self.work_date})"
+
+
+class TimeRollup(models.Model):
+    minutes = models.IntegerField(default=0, verbose_name="Minutes")
+    entries = models.IntegerField(default=0, verbose_name="Entries")
+
+    class Meta:
+        abstract = True
+
+
+class TaskTime(TimeRollup):
+    """All time logged against a task."""
+
+    task = models.OneToOneField(Task, on_delete=CASCADE, primary_key=True, related_name="time_total")
+
+    def __str__(self):
+        return f"{self.task_id}: {self.minutes}m"
+
+
+class ProjectWeekTime(TimeRollup):
+    """Time logged against a project's tasks in the week starting ``week`` (a Monday)."""
+
+    project = models.ForeignKey(Project, on_delete=CASCADE, related_name="weekly_time")
+    week = models.DateField(verbose_name="Week")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["project", "week"], name="unique_project_week_time")]
+
+    def __str__(self):
+        return f"{self.project_id} w/c {self.week}: {self.minutes}m"
+
+
+class MemberWeekTime(TimeRollup):
+    """Time one member logged across an organization's tasks in the week starting ``week``."""
+
+    organization = models.ForeignKey(Organization, on_delete=CASCADE, related_name="weekly_time")
+    user = models.ForeignKey('users.User', on_delete=CASCADE, related_name="weekly_time")
+    week = models.DateField(verbose_name="Week")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["organization", "user", "week"], name="unique_member_week_time")]
+        indexes = [models.Index(fields=["organization", "week"], name="member_week_time_org")]
+
+    def __str__(self):
+        return f"{self.user_id} in {self.organization_id} w/c {self.week}: {self.minutes}m"
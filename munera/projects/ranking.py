@@ -0,0 +1,104 @@
+"""
+Fractional (lexicographic) ranks for ordering cards within a board column.
+
+A rank is a base-36 string compared as plain text, so a new key between any
+two neighbours can always be made by extending digits: moving one card
+writes one row instead of renumbering the column. ``rank_between`` never
+returns a key ending in ``0`` and never a prefix of its upper bound, so there
+is always room for another key on either side. Columns whose keys are
+missing or tied (tasks from bulk inserts, stale clients) are respaced with
+``rebalance``, and so is a column once repeated inserts at the same spot
+would push a key past ``MAX_RANK_LENGTH`` (half of ``Task.rank``'s width).
+"""
+import math
+
+from .changes import record
+from .models import Task
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+MAX_RANK_LENGTH = 32
+
+
+def rank_between(before=None, after=None):
+    """A rank strictly between ``before`` and ``after``; ``None`` means unbounded."""
+    before, after = before or '', after
+    if after is not None and before >= after:
+        raise ValueError(f"rank {before!r} is not below {after!r}")
+    result = []
+    bounded = after is not None
+    position = 0
+    while True:
+        lo = DIGITS.index(before[position]) if position < len(before) else 0
+        hi = DIGITS.index(after[position]) if bounded and position < len(after) else BASE
+        if hi - lo > 1:
+            result.append(DIGITS[(lo + hi) // 2])
+            return ''.join(result)
+        result.append(DIGITS[lo])
+        if hi != lo:
+            # Took the lower digit, so every later digit is free of the upper bound.
+            bounded = False
+        position += 1
+
+
+def spaced_ranks(count):
+    """``count`` ascending, evenly spaced ranks of equal width."""
+    width = max(2, math.ceil(math.log(count + 1, BASE)) + 1)
+    step = BASE ** width // (count + 1)
+    ranks = []
+    for index in range(1, count + 1):
+        value, digits = index * step, []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        ranks.append(''.join(reversed(digits)))
+    return ranks
+
+
+def column(project_id, status):
+    return Task.objects.filter(project_id=project_id, status=status).order_by('rank', 'pk')
+
+
+def last_rank(project_id, status, exclude=None):
+    return column(project_id, status).exclude(rank='').exclude(pk=exclude).values_list('rank', flat=True).last()
+
+
+def append_rank(project_id, status, exclude=None):
+    """A rank below every card in the column, respacing it first if the key would grow too long."""
+    rank = rank_between(last_rank(project_id, status, exclude=exclude))
+    if len(rank) > MAX_RANK_LENGTH:
+        rebalance(project_id, status)
+        rank = rank_between(last_rank(project_id, status, exclude=exclude))
+    return rank
+
+
+def rebalance(project_id, status):
+    """Respace a whole column in its current display order; returns ``{task_id: rank}``."""
+    tasks = list(column(project_id, status).only('pk', 'rank'))
+    for task, rank in zip(tasks, spaced_ranks(len(tasks))):
+        task.rank = rank
+    Task.objects.bulk_update(tasks, ['rank'], batch_size=500)
+    record(Task.objects.filter(pk__in=[task.pk for task in tasks]))
+    return {task.pk: task.rank for task in tasks}
+
+
+def rank_for_move(task, status, before_id=None, after_id=None):
+    """Rank placing ``task`` between the cards ``before_id`` and ``after_id`` of column ``status``."""
+    ids = [pk for pk in (before_id, after_id) if pk is not None]
+    ranks = dict(column(task.project_id, status).filter(pk__in=ids).exclude(pk=task.pk).values_list('pk', 'rank'))
+    if len(ranks) != len(ids):
+        raise ValueError("Neighbouring cards must be other tasks in the target column.")
+    if not ids:
+        return append_rank(task.project_id, status, exclude=task.pk)
+
+    before, after = ranks.get(before_id), ranks.get(after_id)
+    if '' in (before, after) or (before is not None and after is not None and before >= after):
+        ranks = rebalance(task.project_id, status)
+        before, after = ranks.get(before_id), ranks.get(after_id)
+        if before is not None and after is not None and before >= after:
+            raise ValueError("The card above must come before the card below.")
+    rank = rank_between(before, after)
+    if len(rank) > MAX_RANK_LENGTH:
+        ranks = rebalance(task.project_id, status)
+        rank = rank_between(ranks.get(before_id), ranks.get(after_id))
+    return rank
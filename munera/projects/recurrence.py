@@ -0,0 +1,139 @@
+"""
+Materialization of recurring ``TaskTemplate`` occurrences.
+
+``generate_occurrences`` creates every occurrence due within the horizon for
+all active templates in one pass: a handful of reads, one ``bulk_create`` for
+tasks and one for assignments. ``TaskTemplate.generated_through`` records how
+far each template has been materialized, so a run with nothing new to do
+reads one empty queryset. The ``(template, occurrence_date)`` constraint
+makes overlapping runs harmless.
+"""
+import calendar
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+
+from .changes import record
+from .inbox import refresh_inbox
+from .markup import RENDERED_FIELDS, render_description
+from .models import Status, Task, TaskAssignment, TaskTemplate
+
+DEFAULT_HORIZON_DAYS = 14
+INBOX_BATCH_SIZE = 500
+
+Frequency = TaskTemplate.Frequency
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def occurrences(template, start, end):
+    """Dates in ``[start, end]`` on which ``template`` recurs."""
+    if template.frequency == Frequency.NONE:
+        return
+    step = max(template.interval, 1)
+    last = min(end, template.ends_on) if template.ends_on else end
+    if template.frequency == Frequency.MONTHLY:
+        index = 0
+        day = template.starts_on
+        while day <= last:
+            if day >= start:
+                yield day
+            index += step
+            # Always step from starts_on so the 31st stays the 31st after a short month.
+            day = _add_months(template.starts_on, index)
+        return
+
+    period = step * (7 if template.frequency == Frequency.WEEKLY else 1)
+    day = template.starts_on
+    if start > day:
+        day += timedelta(days=-(-(start - day).days // period) * period)
+    while day <= last:
+        yield day
+        day += timedelta(days=period)
+
+
+def due_templates(today, horizon_end):
+    """Active repeating templates with occurrences not yet materialized up to ``horizon_end``."""
+    return TaskTemplate.objects.filter(
+        Q(generated_through__isnull=True) | Q(generated_through__lt=horizon_end),
+        Q(ends_on__isnull=True) | Q(ends_on__gte=today),
+        is_active=True,
+        project__archived_at__isnull=True,
+        starts_on__lte=horizon_end,
+    ).exclude(frequency=Frequency.NONE)
+
+
+def generate_occurrences(today, horizon_days=DEFAULT_HORIZON_DAYS):
+    """Create the tasks (and default assignments) due in ``[today, today + horizon_days]``."""
+    horizon_end = today + timedelta(days=horizon_days)
+    templates = list(due_templates(today, horizon_end))
+    if not templates:
+        return {'templates': 0, 'tasks': 0, 'assignments': 0}
+    with transaction.atomic():
+        return _materialize(templates, today, horizon_end)
+
+
+def _materialize(templates, today, horizon_end):
+    template_ids = [template.pk for template in templates]
+    assignees = defaultdict(list)
+    for template_id, user_id in TaskTemplate.default_assignees.through.objects.filter(
+        tasktemplate_id__in=template_ids
+    ).values_list('tasktemplate_id', 'user_id'):
+        assignees[template_id].append(user_id)
+
+    planned = {}
+    first_day = horizon_end
+    for template in templates:
+        start = max(today, template.starts_on)
+        if template.generated_through:
+            start = max(start, template.generated_through + timedelta(days=1))
+        first_day = min(first_day, start)
+        # bulk_create skips pre_save, so render the shared description once per template.
+        sample = Task(project_id=template.project_id, task_desc=template.task_desc)
+        render_description(sample)
+        rendered = {field: getattr(sample, field) for field in RENDERED_FIELDS}
+        for day in occurrences(template, start, horizon_end):
+            planned[template.pk, day] = Task(
+                project_id=template.project_id,
+                template=template,
+                occurrence_date=day,
+                due_date=day,
+                task_name=template.template_name,
+                task_desc=template.task_desc,
+                status=Status.ToDo,
+                **rendered,
+            )
+        template.generated_through = horizon_end
+
+    window = Task.objects.filter(template_id__in=template_ids, occurrence_date__range=(first_day, horizon_end))
+    existing = set(window.values_list('template_id', 'occurrence_date'))
+    Task.objects.bulk_create([task for key, task in planned.items() if key not in existing], ignore_conflicts=True)
+
+    # ignore_conflicts leaves primary keys unset, so read back the rows this run added.
+    created = {
+        (template_id, day): pk
+        for template_id, day, pk in window.values_list('template_id', 'occurrence_date', 'pk')
+        if (template_id, day) in planned and (template_id, day) not in existing
+    }
+    assignments = [
+        TaskAssignment(task_id=pk, user_id=user_id)
+        for (template_id, _), pk in created.items()
+        for user_id in assignees[template_id]
+    ]
+    TaskAssignment.objects.bulk_create(assignments, ignore_conflicts=True)
+    TaskTemplate.objects.bulk_update(templates, ['generated_through'])
+
+    # Bulk writes skip the inbox and change-feed signals.
+    task_ids = list(created.values())
+    for offset in range(0, len(task_ids), INBOX_BATCH_SIZE):
+        batch = task_ids[offset:offset + INBOX_BATCH_SIZE]
+        refresh_inbox(task_ids=batch)
+        record(Task.objects.filter(pk__in=batch))
+        record(TaskAssignment.objects.filter(task_id__in=batch))
+    return {'templates': len(templates), 'tasks': len(created), 'assignments': len(assignments)}
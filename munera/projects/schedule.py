@@ -0,0 +1,143 @@
+from datetime import date, timedelta
+
+from django.db.models import F, Q
+
+from .models import Status, Task
+
+CALENDAR_SPANS = ('week', 'month', 'quarter')
+CALENDAR_TASK_FIELDS = ('id', 'name', 'status', 'project')
+TIMELINE_BEFORE_DAYS = 30
+TIMELINE_AFTER_DAYS = 180
+TIMELINE_MAX_DAYS = 730
+
+
+def parse_anchor(value, default):
+    try:
+        return date.fromisoformat(value) if value else default
+    except ValueError:
+        return default
+
+
+def _first_of_month(value, months_ahead=0):
+    month = value.month - 1 + months_ahead
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def calendar_window(span, anchor):
+    """Return the inclusive ``(start, end)`` dates of the ``span`` containing ``anchor``."""
+    if span == 'week':
+        start = anchor - timedelta(days=anchor.weekday())
+        return start, start + timedelta(days=6)
+
+    months = 3 if span == 'quarter' else 1
+    start = anchor.replace(month=(anchor.month - 1) // months * months + 1, day=1)
+    return start, _first_of_month(start, months) - timedelta(days=1)
+
+
+def tasks_in_window(tasks, start, end):
+    """One range query on ``due_date``, returning only the columns the calendar renders."""
+    return tasks.filter(due_date__range=(start, end)).order_by('due_date', 'task_id').values(
+        'task_id', 'task_name', 'status', 'due_date', 'project_id', 'project__project_name',
+    )
+
+
+def group_by_day(rows):
+    """Bucket rows (already ordered by due date) into ``{due_date: [row, ...]}``."""
+    days = {}
+    for row in rows:
+        days.setdefault(row['due_date'], []).append(row)
+    return days
+
+
+def calendar_weeks(start, end, days):
+    """Lay the window out as Monday-first weeks of ``(day, in_window, tasks)`` cells."""
+    cursor = start - timedelta(days=start.weekday())
+    weeks = []
+    while cursor <= end:
+        week = []
+        for _ in range(7):
+            week.append((cursor, start <= cursor <= end, days.get(cursor, [])))
+            cursor += timedelta(days=1)
+        weeks.append(week)
+    return weeks
+
+
+def calendar_payload(span, start, end, days):
+    """Compact JSON structure: task rows are positional lists described by ``fields``."""
+    projects = {}
+    buckets = {}
+    for day, rows in days.items():
+        buckets[day.isoformat()] = [
+            [row['task_id'], row['task_name'], row['status'], row['project_id']] for row in rows
+        ]
+        for row in rows:
+            projects[row['project_id']] = row['project__project_name']
+
+    return {
+        'span': span,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'prev': (start - timedelta(days=1)).isoformat(),
+        'next': (end + timedelta(days=1)).isoformat(),
+        'fields': CALENDAR_TASK_FIELDS,
+        'projects': projects,
+        'days': buckets,
+    }
+
+
+def timeline_window(start_value, end_value, today):
+    """Inclusive ``(start, end)`` from query parameters, defaulting around ``today`` and capped in length."""
+    start = parse_anchor(start_value, today - timedelta(days=TIMELINE_BEFORE_DAYS))
+    end = parse_anchor(end_value, start + timedelta(days=TIMELINE_BEFORE_DAYS + TIMELINE_AFTER_DAYS))
+    if end < start:
+        start, end = end, start
+    return start, min(end, start + timedelta(days=TIMELINE_MAX_DAYS))
+
+
+def timeline_payload(projects, start, end):
+    """Project bars and task milestones overlapping ``[start, end]`` as parallel arrays.
+
+    Dates are day offsets from ``start``, clipped to the window; a missing
+    project start or end is ``null``. ``milestones.project`` indexes into the
+    ``projects`` arrays and ``milestones.status`` into ``statuses``. Two
+    queries: one for the bars, one for every milestone inside them.
+    """
+    in_window = projects.filter(
+        Q(start_date__lte=end) | Q(start_date__isnull=True),
+        Q(end_date__gte=start) | Q(end_date__isnull=True),
+    )
+
+    def offset(day):
+        return None if day is None else (min(max(day, start), end) - start).days
+
+    bars = {'id': [], 'name': [], 'start': [], 'end': []}
+    position = {}
+    for pk, name, starts, ends in in_window.order_by(F('start_date').asc(nulls_first=True), 'project_id').values_list(
+        'project_id', 'project_name', 'start_date', 'end_date',
+    ):
+        position[pk] = len(bars['id'])
+        bars['id'].append(pk)
+        bars['name'].append(name)
+        bars['start'].append(offset(starts))
+        bars['end'].append(offset(ends))
+
+    status_index = {status: index for index, status in enumerate(Status.values)}
+    milestones = {'project': [], 'id': [], 'name': [], 'due': [], 'status': []}
+    # Filter by the bars already read: re-running the window as a subquery could see a project they don't have.
+    for project_id, pk, name, due_date, status in Task.objects.filter(
+        project_id__in=list(position), due_date__range=(start, end),
+    ).order_by('project_id', 'due_date', 'task_id').values_list('project_id', 'task_id', 'task_name', 'due_date', 'status'):
+        milestones['project'].append(position[project_id])
+        milestones['id'].append(pk)
+        milestones['name'].append(name)
+        milestones['due'].append((due_date - start).days)
+        milestones['status'].append(status_index[status])
+
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': (end - start).days + 1,
+        'statuses': Status.values,
+        'projects': bars,
+        'milestones': milestones,
+    }
@@ -0,0 +1,25 @@
+from .inbox import Reason, reason_values
+from .models import Task
+
+
+def inbox_tasks(user, reasons, open_only=False):
+    """Tasks listed in ``user``'s ``TaskInbox`` for any of ``reasons``.
+
+    All conditions go into one ``filter()`` so they apply to the same inbox
+    row. With ``open_only`` the rows come straight off the partial
+    ``task_inbox_open`` index, already ordered by due date.
+    """
+    lookups = {'inbox_entries__user': user, 'inbox_entries__reason__in': reason_values(reasons)}
+    if not open_only:
+        return Task.objects.filter(**lookups)
+    return Task.objects.filter(**lookups, inbox_entries__is_open=True).order_by('inbox_entries__due_date')
+
+
+def visible_tasks(user):
+    """Tasks assigned to ``user`` or living in projects of organizations they manage."""
+    return inbox_tasks(user, Reason.ASSIGNED | Reason.ORG_MANAGER)
+
+
+def my_tasks(user, open_only=False):
+    """Tasks assigned to ``user`` or living in projects they manage."""
+    return inbox_tasks(user, Reason.ASSIGNED | Reason.PROJECT_MANAGER, open_only=open_only)
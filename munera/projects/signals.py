@@ -0,0 +1,105 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from organization.models import OrganizationMember, Role as OrgRole
+from .changes import FEEDS, log_instance
+from .inbox import Reason, grant, refresh_inbox, revoke
+from .markup import render_description
+from .models import Project, ProjectMember, Task, TaskAssignment, TimeEntry
+from .ranking import append_rank
+from .timesheets import entry_key, move_time, stored_key
+
+
+@receiver(pre_save, sender=Task)
+def task_ranked(sender, instance, raw=False, **kwargs):
+    # New cards join the bottom of their board column.
+    if not raw and not instance.rank and instance._state.adding:
+        instance.rank = append_rank(instance.project_id, instance.status)
+
+
+@receiver(pre_save, sender=Task)
+@receiver(pre_save, sender=Project)
+def description_rendered(sender, instance, raw=False, **kwargs):
+    if not raw:
+        render_description(instance)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_inbox(task_ids=[instance.pk])
+
+
+@receiver(post_save, sender=TaskAssignment)
+def assignment_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        grant(Reason.ASSIGNED, [instance.user_id], Task.objects.filter(pk=instance.task_id))
+
+
+@receiver(post_delete, sender=TaskAssignment)
+def assignment_deleted(sender, instance, **kwargs):
+    revoke(Reason.ASSIGNED, [instance.user_id], Task.objects.filter(pk=instance.task_id))
+
+
+@receiver(post_save, sender=ProjectMember)
+def project_member_saved(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    tasks = Task.objects.filter(project_id=instance.project_id)
+    if instance.role == ProjectMember.Role.MANAGER:
+        grant(Reason.PROJECT_MANAGER, [instance.user_id], tasks)
+    elif not created:
+        # A brand-new plain member has no manager bit to clear.
+        revoke(Reason.PROJECT_MANAGER, [instance.user_id], tasks)
+
+
+@receiver(post_delete, sender=ProjectMember)
+def project_member_deleted(sender, instance, **kwargs):
+    revoke(Reason.PROJECT_MANAGER, [instance.user_id], Task.objects.filter(project_id=instance.project_id))
+
+
+@receiver(post_save, sender=OrganizationMember)
+def organization_member_saved(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    tasks = Task.objects.filter(project__organization_id=instance.organization_id)
+    if instance.role == OrgRole.Manager:
+        grant(Reason.ORG_MANAGER, [instance.user_id], tasks)
+    elif not created:
+        revoke(Reason.ORG_MANAGER, [instance.user_id], tasks)
+
+
+@receiver(post_delete, sender=OrganizationMember)
+def organization_member_deleted(sender, instance, **kwargs):
+    revoke(Reason.ORG_MANAGER, [instance.user_id], Task.objects.filter(project__organization_id=instance.organization_id))
+
+
+@receiver(pre_save, sender=TimeEntry)
+def time_entry_changing(sender, instance, raw=False, **kwargs):
+    # Read what the row counts for now, inside the save's transaction, so the rollups move from the stored values.
+    instance._counted = None if raw or instance._state.adding else stored_key(instance.pk)
+
+
+@receiver(post_save, sender=TimeEntry)
+def time_entry_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        move_time(instance._counted, entry_key(instance))
+
+
+@receiver(post_delete, sender=TimeEntry)
+def time_entry_deleted(sender, instance, **kwargs):
+    move_time(entry_key(instance), None)
+
+
+def change_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        log_instance(instance)
+
+
+def change_deleted(sender, instance, **kwargs):
+    log_instance(instance, deleted=True)
+
+
+for model in FEEDS:
+    post_save.connect(change_saved, sender=model, dispatch_uid=f'changes_saved_{model._meta.label_lower}')
+    post_delete.connect(change_deleted, sender=model, dispatch_uid=f'changes_deleted_{model._meta.label_lower}')
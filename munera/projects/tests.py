@@ -1,3 +1,1089 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+import brotli
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, router
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from munera.integrity import create_unique
+from munera.routers import STICKY_COOKIE, ReplicaRoutingMiddleware
+from munera.staticfiles import StaticAssetMiddleware
+from munera.template_profiler import profile_rendering
+from organization.models import Organization, OrganizationMember, Role as OrgRole
+from users.models import User
+from .analytics import build_report, burndown
+from .archive import archive_task
+from .changes import backfill_changes, compact_changes
+from .cloning import clone_project
+from .dependencies import DependencyError, add_dependency, creates_cycle, dependency_graph
+from .digests import OutboxSink, iter_digests
+from .forms import TaskForm
+from .history import cycle_times, diff_events, split_ids
+from .inbox import refresh_inbox
+from .markup import render_description, render_markup, sanitize
+from .models import (
+    Change, MemberWeekTime, OutboxMessage, Project, ProjectMember, ProjectWeekTime, Status, Task, TaskAssignment, TaskEvent,
+    TaskInbox, TaskTemplate, TaskTime, TimeEntry,
+)
+from .ranking import MAX_RANK_LENGTH, rank_between, rank_for_move, spaced_ranks
+from .recurrence import generate_occurrences, occurrences
+from .schedule import calendar_window
+from .services import my_tasks, visible_tasks
+from .timesheets import reconcile_time, week_of
+from .views import TaskDetailView, TasksPageView
+
+
+def make_user(user_name, **extra):
+    user = User(
+        first_name=extra.pop('first_name', 'Test'),
+        last_name=extra.pop('last_name', 'User'),
+        email=f'{user_name}@example.com',
+        user_name=user_name,
+        **extra,
+    )
+    user.set_password('Password123')
+    user.save()
+    return user
+
+
+def logged_in_client(user):
+    client = Client()
+    session = client.session
+    session['user_id'] = user.pk
+    session.save()
+    return client
+
+
+def post_concurrently(clients, url, data):
+    """POST ``data`` from every client at the same moment; returns their status codes."""
+    barrier = threading.Barrier(len(clients))
+    statuses = []
+
+    def run(client):
+        try:
+            barrier.wait()
+            for _ in range(20):
+                # The shared in-memory test database reports contention instead of waiting.
+                try:
+                    statuses.append(client.post(url, data).status_code)
+                    break
+                except OperationalError:
+                    pass
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+
+@contextmanager
+def counting_conflicts(target):
+    """Patch the ``create_unique`` a view imported; yields the models whose insert hit the unique constraint."""
+    conflicts = []
+
+    def counted(model, **fields):
+        created = create_unique(model, **fields)
+        if created is None:
+            conflicts.append(model)
+        return created
+
+    with mock.patch(target, counted):
+        yield conflicts
+
+
+class ProjectTestCase(TestCase):
+    def setUp(self):
+        self.manager = make_user('manager')
+        self.member = make_user('member')
+        self.organization = Organization.objects.create(
+            org_creator=self.manager, org_name='Acme', org_code='ACME1234'
+        )
+        OrganizationMember.objects.create(organization=self.organization, user=self.manager, role=OrgRole.Manager)
+        OrganizationMember.objects.create(organization=self.organization, user=self.member, role=OrgRole.Member)
+        self.project = Project.objects.create(
+            organization=self.organization, created_by=self.manager, project_name='Website'
+        )
+        ProjectMember.objects.create(project=self.project, user=self.manager, role=ProjectMember.Role.MANAGER)
+        ProjectMember.objects.create(project=self.project, user=self.member, role=ProjectMember.Role.MEMBER)
+
+    def login(self, user):
+        session = self.client.session
+        session['user_id'] = user.pk
+        session.save()
+
+    def make_task(self, name='Task', status=Status.ToDo, due_date=None, assignees=()):
+        task = Task.objects.create(project=self.project, task_name=name, status=status, due_date=due_date)
+        for user in assignees:
+            TaskAssignment.objects.create(task=task, user=user)
+        return task
+
+    def edit(self, task, **changes):
+        data = {
+            'project': self.project.pk,
+            'task_name': task.task_name,
+            'status': task.status,
+            'due_date': task.due_date or '',
+            'assignees': list(task.assignees.values_list('pk', flat=True)),
+            'version': task.version,
+        }
+        data.update(changes)
+        form = TaskForm(data, instance=task, project=self.project, user=self.manager)
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.save()
+
+
+class CalendarWindowTests(TestCase):
+    def test_week_starts_on_monday(self):
+        self.assertEqual(
+            calendar_window('week', date(2026, 10, 15)),
+            (date(2026, 10, 12), date(2026, 10, 18)),
+        )
+
+    def test_month_and_quarter_bounds(self):
+        self.assertEqual(
+            calendar_window('month', date(2024, 2, 10)),
+            (date(2024, 2, 1), date(2024, 2, 29)),
+        )
+        self.assertEqual(
+            calendar_window('quarter', date(2026, 11, 30)),
+            (date(2026, 10, 1), date(2026, 12, 31)),
+        )
+
+
+class TaskCalendarTests(ProjectTestCase):
+    def test_data_groups_window_by_day(self):
+        today = date.today()
+        inside = self.make_task('Inside', due_date=today, assignees=[self.member])
+        self.make_task('Outside', due_date=today + timedelta(days=120), assignees=[self.member])
+        self.login(self.member)
+
+        resp = self.client.get(reverse('projects:calendar-data'), {'span': 'week', 'date': today.isoformat()})
+        self.assertEqual(resp.status_code, 200)
+        payload = resp.json()
+        self.assertEqual(list(payload['days']), [today.isoformat()])
+        self.assertEqual(payload['days'][today.isoformat()][0][0], inside.task_id)
+        self.assertEqual(payload['projects'], {str(self.project.project_id): 'Website'})
+
+    def test_data_returns_304_for_unchanged_window(self):
+        self.make_task('Inside', due_date=date.today(), assignees=[self.member])
+        self.login(self.member)
+        url = reverse('projects:calendar-data')
+
+        first = self.client.get(url)
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+        self.make_task('Another', due_date=date.today(), assignees=[self.member])
+        third = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(third.status_code, 200)
+
+    def test_page_renders(self):
+        self.make_task('Inside', due_date=date.today(), assignees=[self.member])
+        self.login(self.member)
+        resp = self.client.get(reverse('projects:calendar'), {'span': 'quarter'})
+        self.assertContains(resp, 'Inside')
+
+
+class ConditionalGetTests(ProjectTestCase):
+    def test_project_detail_revalidates_until_tasks_change(self):
+        task = self.make_task('Draft', assignees=[self.member])
+        self.login(self.member)
+        url = reverse('projects:project-detail', args=[self.project.project_id])
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        task.status = Status.Testing
+        task.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_project_detail_revalidates_when_members_change(self):
+        self.login(self.member)
+        url = reverse('projects:project-detail', args=[self.project.project_id])
+        etag = self.client.get(url)['ETag']
+
+        self.manager.alias, self.manager.display_name_preference = 'Boss', 'alias'
+        self.manager.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Boss')
+
+        ProjectMember.objects.filter(user=self.member).update(role=ProjectMember.Role.MANAGER)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_skips_304_when_messages_are_pending(self):
+        task = self.make_task('Draft', assignees=[self.member])
+        self.login(self.manager)
+        url = reverse('projects:project-detail', args=[self.project.project_id])
+        etag = self.client.get(url)['ETag']
+
+        self.client.get(reverse('projects:delete_task', args=[task.task_id]))
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, 'Use the delete button to remove tasks.')
+
+
+class TaskHistoryTests(ProjectTestCase):
+    def test_bulk_reassignment_keeps_every_user_id(self):
+        task = self.make_task('Draft')
+        removed, added = set(range(1000000, 1000040)), set(range(2000000, 2000040))
+        [event] = diff_events(task, None, removed, added)
+        self.assertGreater(len(event.new_value), 255)
+        event.full_clean()
+        event.save()
+        event.refresh_from_db()
+        self.assertEqual((set(split_ids(event.old_value)), set(split_ids(event.new_value))), (removed, added))
+
+    def test_save_records_changes_in_one_insert(self):
+        task = self.make_task('Draft', assignees=[self.manager])
+        form = TaskForm(
+            {
+                'project': self.project.pk, 'task_name': 'Draft', 'status': Status.Testing,
+                'due_date': '2026-01-05', 'assignees': [self.member.pk], 'version': task.version,
+            },
+            instance=task, project=self.project, user=self.manager,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        events = {event.kind: event for event in TaskEvent.objects.filter(task=task)}
+        self.assertEqual(events['status'].old_value, Status.ToDo)
+        self.assertEqual(events['status'].new_value, Status.Testing)
+        self.assertEqual(events['due_date'].new_value, '2026-01-05')
+        self.assertEqual(events['assignees'].old_value, str(self.manager.pk))
+        self.assertEqual(events['assignees'].new_value, str(self.member.pk))
+        self.assertEqual(events['status'].actor, self.manager)
+
+    def test_unchanged_save_writes_no_events(self):
+        task = self.make_task('Draft', assignees=[self.member])
+        self.edit(task)
+        self.assertFalse(TaskEvent.objects.exists())
+
+    def test_cycle_times_cover_each_status(self):
+        task = self.make_task('Draft', assignees=[self.member])
+        self.edit(task, status=Status.Testing)
+        self.edit(task, status=Status.Done)
+
+        result = cycle_times(self.project.tasks.all())
+        self.assertIsNotNone(result['statuses'][Status.ToDo])
+        self.assertIsNotNone(result['statuses'][Status.Testing])
+        self.assertIsNone(result['statuses'][Status.InProgress])
+        self.assertIsNotNone(result['to_done'])
+
+    def test_history_page_lists_events(self):
+        task = self.make_task('Draft', assignees=[self.member])
+        self.edit(task, status=Status.Testing, assignees=[self.manager.pk])
+        self.login(self.member)
+        resp = self.client.get(reverse('projects:task-history', args=[task.task_id]))
+        self.assertContains(resp, 'Status changed')
+        self.assertContains(resp, '+ manager')
+
+
+class AnalyticsTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_burndown_walks_back_from_open_count(self):
+        first = self.make_task('First', assignees=[self.member])
+        self.make_task('Second', assignees=[self.member])
+        self.edit(first, status=Status.Done)
+
+        points = burndown(self.project.tasks.all(), date.today(), days=3)
+        self.assertEqual([point['open'] for point in points], [0, 0, 1])
+
+    def test_report_groups_overdue_and_load_by_assignee(self):
+        yesterday = date.today() - timedelta(days=1)
+        task = self.make_task('Late', due_date=yesterday, assignees=[self.member])
+        self.make_task('Later', status=Status.Testing, assignees=[self.member])
+        self.edit(task, status=Status.InProgress)
+
+        report = build_report(self.project.tasks.all(), date.today())
+        self.assertEqual(report['overdue_by_assignee'][0]['overdue'], 1)
+        load = report['member_load'][0]
+        self.assertEqual(load['open'], 2)
+        self.assertEqual(load['by_status'][Status.Testing], 1)
+        self.assertEqual(report['throughput'][0]['counts'][Status.InProgress], 1)
+
+    def test_endpoint_is_manager_only(self):
+        url = reverse('projects:project-analytics', args=[self.project.project_id])
+        self.login(self.member)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.login(self.manager)
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json()['burndown']), 30)
+
+
+class TemplateProfilerTests(ProjectTestCase):
+    def test_flags_lazy_relation_access_in_loops(self):
+        template = Template("{% for m in members %}{{ m.user.user_name }}{% endfor %}")
+        with profile_rendering() as profile:
+            template.render(Context({'members': OrganizationMember.objects.all()}))
+        [loop] = profile.lazy_loops()
+        self.assertEqual((loop.iterations, loop.body_queries, loop.queries), (2, 2, 3))
+
+        with profile_rendering() as profile:
+            template.render(Context({'members': OrganizationMember.objects.select_related('user')}))
+        self.assertEqual(profile.lazy_loops(), [])
+
+    def test_pages_have_no_lazy_loops(self):
+        self.make_task('Draft', due_date=date.today(), assignees=[self.member])
+        self.make_task('Review', assignees=[self.member, self.manager])
+        self.login(self.manager)
+        urls = [
+            reverse('home'),
+            reverse('projects:tasks'),
+            reverse('projects:my-projects'),
+            reverse('projects:project-detail', args=[self.project.project_id]),
+            reverse('organization_detail', args=[self.organization.org_id]),
+        ]
+        for url in urls:
+            with self.subTest(url=url), profile_rendering() as profile:
+                self.assertEqual(self.client.get(url).status_code, 200)
+                self.assertEqual([loop.label for loop in profile.lazy_loops()], [])
+
+
+class StaticPipelineTests(TestCase):
+    def test_collectstatic_writes_hashed_minified_and_compressed_assets(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            STATIC_ROOT=root,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'munera.staticfiles.CompressedManifestStaticFilesStorage'},
+            },
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            with open(os.path.join(root, 'staticfiles.json')) as handle:
+                css = json.load(handle)['paths']['css/main.css']
+            self.assertRegex(css, r'^css/main\.[0-9a-f]{12}\.css$')
+            with open(os.path.join(root, css), 'rb') as handle:
+                minified = handle.read()
+            self.assertNotIn(b'/*', minified)
+            self.assertNotIn(b'\n  ', minified)
+            with open(os.path.join(root, css + '.gz'), 'rb') as handle:
+                self.assertEqual(gzip.decompress(handle.read()), minified)
+            with open(os.path.join(root, css + '.br'), 'rb') as handle:
+                self.assertEqual(brotli.decompress(handle.read()), minified)
+
+            middleware = StaticAssetMiddleware(lambda request: None)
+            request = RequestFactory().get(f'/static/{css}', HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(middleware(request)['Content-Encoding'], 'br')
+            request = RequestFactory().get(f'/static/{css}', HTTP_ACCEPT_ENCODING='gzip, deflate')
+            response = middleware(request)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+            request = RequestFactory().get(f'/static/{css}', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(middleware(request).status_code, 304)
+            self.assertIsNone(middleware(RequestFactory().get('/static/../settings.py')))
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRoutingTests(ProjectTestCase):
+    def route(self, view, method='get', cookies=None, write=False):
+        """Run ``view`` through the middleware; return (read alias, read alias after writing, response)."""
+        seen = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen.append(router.db_for_read(Task))
+            if write:
+                self.project.save()
+            seen.append(router.db_for_read(Task))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies or {})
+        response = middleware(request)
+        return seen[0], seen[1], response
+
+    def test_reads_from_replica_views_go_to_replica(self):
+        before, after, response = self.route(TasksPageView.as_view())
+        self.assertEqual((before, after), ('replica', 'replica'))
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+        self.assertEqual(self.route(TaskDetailView.as_view())[0], 'default')
+        self.assertEqual(self.route(TasksPageView.as_view(), method='post')[0], 'default')
+
+    def test_writes_stick_the_user_to_the_primary(self):
+        before, after, response = self.route(TasksPageView.as_view(), write=True)
+        self.assertEqual((before, after), ('replica', 'default'))
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+        sticky = {STICKY_COOKIE: response.cookies[STICKY_COOKIE].value}
+        self.assertEqual(self.route(TasksPageView.as_view(), cookies=sticky)[0], 'default')
+
+
+@override_settings(REPLICA_DATABASE='replica')
+@modify_settings(MIDDLEWARE={'prepend': 'munera.routers.ReplicaRoutingMiddleware'})
+class ReplicaDatabaseTests(ProjectTestCase):
+    replicated = (User, Organization, OrganizationMember, Project, ProjectMember, Task, TaskAssignment, TaskInbox)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A real second database for this class only. The runner builds its test databases
+        # from settings before any class is set up, so the alias is added and migrated here.
+        replica = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        connections.settings['replica'] = connections.configure_settings({**connections.settings, 'replica': replica})['replica']
+        cls.databases = cls.databases | {'replica'}
+        call_command('migrate', database='replica', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        cls.databases = cls.databases - {'replica'}
+        super().tearDownClass()
+
+    def replicate(self):
+        for model in self.replicated:
+            model._base_manager.using('replica').bulk_create(list(model._base_manager.all()))
+
+    def test_replica_views_read_the_replica_until_the_user_writes(self):
+        task = self.make_task('Draft', assignees=[self.member])
+        self.replicate()
+        # The primary moves on; the replica has not caught up yet.
+        Task.objects.filter(pk=task.pk).update(task_name='Published')
+        self.login(self.member)
+        url = reverse('projects:tasks')
+
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = self.client.get(url)
+        self.assertContains(response, 'Draft')
+        self.assertNotContains(response, 'Published')
+        self.assertTrue(replica_queries.captured_queries)
+
+        response = self.client.post(reverse('projects:task-time', args=[task.pk]),
+                                    {'work_date': date.today().isoformat(), 'minutes': 15})
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = self.client.get(url)
+        self.assertContains(response, 'Published')
+        self.assertEqual(replica_queries.captured_queries, [])
+
+
+class TaskInboxTests(ProjectTestCase):
+    def reasons(self, task):
+        return dict(TaskInbox.objects.filter(task=task).values_list('user__user_name', 'reason'))
+
+    def test_inbox_follows_assignments_roles_and_status(self):
+        Reason = TaskInbox.Reason
+        task = self.make_task('Draft', due_date=date.today(), assignees=[self.member])
+        self.assertEqual(self.reasons(task), {
+            'manager': Reason.PROJECT_MANAGER | Reason.ORG_MANAGER,
+            'member': Reason.ASSIGNED,
+        })
+
+        self.edit(task, assignees=[self.manager.pk], status=Status.Done)
+        self.assertEqual(self.reasons(task), {'manager': Reason.ASSIGNED | Reason.PROJECT_MANAGER | Reason.ORG_MANAGER})
+        self.assertFalse(TaskInbox.objects.get(task=task).is_open)
+        self.assertEqual(list(my_tasks(self.manager, open_only=True)), [])
+
+        membership = ProjectMember.objects.get(project=self.project, user=self.member)
+        membership.role = ProjectMember.Role.MANAGER
+        membership.save()
+        OrganizationMember.objects.filter(user=self.manager).delete()
+        self.assertEqual(self.reasons(task), {
+            'manager': Reason.ASSIGNED | Reason.PROJECT_MANAGER,
+            'member': Reason.PROJECT_MANAGER,
+        })
+        self.assertEqual(list(visible_tasks(self.member)), [])
+        self.assertEqual(list(my_tasks(self.member)), [task])
+
+    def test_repair_restores_dropped_rows(self):
+        task = self.make_task('Draft', assignees=[self.member])
+        expected = set(TaskInbox.objects.values_list('user_id', 'task_id', 'reason', 'is_open'))
+        TaskInbox.objects.filter(user=self.member).delete()
+        TaskInbox.objects.filter(user=self.manager).update(reason=TaskInbox.Reason.ASSIGNED)
+
+        self.assertEqual(refresh_inbox(dry_run=True), {'created': 1, 'updated': 1, 'deleted': 0})
+        call_command('repair_inbox', stdout=io.StringIO())
+        self.assertEqual(set(TaskInbox.objects.values_list('user_id', 'task_id', 'reason', 'is_open')), expected)
+        self.assertEqual(list(visible_tasks(self.member)), [task])
+
+
+class RecurringTaskTests(ProjectTestCase):
+    def test_occurrence_dates(self):
+        weekly = TaskTemplate(frequency=TaskTemplate.Frequency.WEEKLY, interval=2, starts_on=date(2025, 1, 6))
+        self.assertEqual(
+            list(occurrences(weekly, date(2025, 1, 10), date(2025, 2, 10))),
+            [date(2025, 1, 20), date(2025, 2, 3)],
+        )
+        monthly = TaskTemplate(frequency=TaskTemplate.Frequency.MONTHLY, starts_on=date(2025, 1, 31))
+        self.assertEqual(
+            list(occurrences(monthly, date(2025, 1, 1), date(2025, 4, 30))),
+            [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)],
+        )
+
+    def test_generation_is_bulk_and_idempotent(self):
+        today = date(2025, 3, 3)
+        template = TaskTemplate.objects.create(
+            project=self.project, template_name='Standup notes', frequency=TaskTemplate.Frequency.DAILY, starts_on=today,
+        )
+        template.default_assignees.set([self.member])
+
+        # Fixed number of statements however many occurrences are due, inbox and change feed included.
+        with self.assertNumQueries(21):
+            counts = generate_occurrences(today, horizon_days=6)
+        self.assertEqual(counts, {'templates': 1, 'tasks': 7, 'assignments': 7})
+        self.assertEqual(template.occurrences.filter(assignees=self.member).count(), 7)
+        self.assertEqual(TaskInbox.objects.filter(user=self.member).count(), 7)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(generate_occurrences(today, horizon_days=6)['tasks'], 0)
+
+        TaskTemplate.objects.update(generated_through=None)
+        self.assertEqual(generate_occurrences(today + timedelta(days=1), horizon_days=6)['tasks'], 1)
+        self.assertEqual(template.occurrences.count(), 8)
+
+
+class DigestTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = date(2025, 3, 10)
+        self.make_task('Late', due_date=date(2025, 3, 1), assignees=[self.member, self.manager])
+        self.make_task('Soon', due_date=date(2025, 3, 12), assignees=[self.member])
+        self.make_task('Later', due_date=date(2025, 4, 1), assignees=[self.member])
+        self.make_task('Finished', status=Status.Done, due_date=date(2025, 3, 1), assignees=[self.member])
+
+    def test_one_query_groups_tasks_by_user(self):
+        with self.assertNumQueries(1):
+            digests = {digest.user_id: digest for digest in iter_digests(self.today)}
+        self.assertEqual(set(digests), {self.manager.pk, self.member.pk})
+        member = digests[self.member.pk]
+        self.assertEqual([name for name, _, _ in member.overdue], ['Late'])
+        self.assertEqual([name for name, _, _ in member.due_soon], ['Soon'])
+        self.assertEqual(member.subject, 'Munera tasks: 1 overdue, 1 due soon')
+
+    def test_email_and_outbox_sinks(self):
+        call_command('send_digests', '--today', '2025-03-10', stdout=io.StringIO())
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['manager@example.com', 'member@example.com'])
+        self.assertIn('Late (Website)', mail.outbox[0].body)
+
+        for _ in range(2):
+            call_command('send_digests', '--sink', 'outbox', '--today', '2025-03-10', stdout=io.StringIO())
+        self.assertEqual(OutboxMessage.objects.filter(digest_date=self.today).count(), 2)
+
+    def test_outbox_sink_flushes_in_batches(self):
+        sink = OutboxSink(batch_size=1)
+        for digest in iter_digests(self.today):
+            sink.add(digest)
+            self.assertEqual(sink.pending, [])
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+
+class ArchiveTests(ProjectTestCase):
+    def test_archiving_a_project_hides_it_and_restores_only_its_tasks(self):
+        earlier = self.make_task('Dropped', assignees=[self.member])
+        archive_task(earlier)
+        task = self.make_task('Ship', assignees=[self.member])
+        self.login(self.manager)
+
+        self.client.post(reverse('projects:archive-project', args=[self.project.pk]))
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Task.objects.filter(project_id=self.project.pk).exists())
+        self.assertFalse(TaskInbox.objects.exists())
+        self.assertEqual(self.client.get(reverse('projects:project-detail', args=[self.project.pk])).status_code, 404)
+        self.assertContains(self.client.get(reverse('projects:archive')), 'Website')
+
+        self.client.post(reverse('projects:archive-project', args=[self.project.pk]), {'action': 'restore'})
+        self.assertEqual(list(Task.objects.filter(project=self.project)), [task])
+        self.assertTrue(TaskInbox.objects.filter(user=self.member, task=task).exists())
+        self.assertTrue(Task.all_objects.filter(pk=earlier.pk, archived_at__isnull=False).exists())
+
+    def test_delete_view_archives_and_purge_removes_old_rows(self):
+        task = self.make_task('Old', assignees=[self.member])
+        self.login(self.manager)
+        self.client.post(reverse('projects:delete_task', args=[task.pk]))
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+        self.assertTrue(TaskAssignment.objects.filter(task_id=task.pk).exists())
+
+        call_command('purge_archived', '--days', '1', stdout=io.StringIO())
+        self.assertTrue(Task.all_objects.filter(pk=task.pk).exists())
+        Task.all_objects.filter(pk=task.pk).update(archived_at=timezone.now() - timedelta(days=2))
+        call_command('purge_archived', '--days', '1', '--chunk-size', '1', stdout=io.StringIO())
+        self.assertFalse(Task.all_objects.filter(pk=task.pk).exists())
+        self.assertFalse(TaskAssignment.objects.filter(task_id=task.pk).exists())
+
+
+class BoardTests(ProjectTestCase):
+    def move(self, task, **payload):
+        return self.client.patch(
+            reverse('projects:task-move', args=[task.pk]), json.dumps(payload), content_type='application/json',
+        )
+
+    def board(self, status=Status.ToDo):
+        return list(Task.objects.filter(project=self.project, status=status).order_by('rank', 'pk'))
+
+    def test_ranks_always_fit_between_neighbours(self):
+        self.assertEqual(rank_between(None, '01'), '00i')
+        ranks = spaced_ranks(3)
+        self.assertEqual(ranks, sorted(ranks))
+        low, high = ranks[0], ranks[1]
+        for _ in range(50):
+            high = rank_between(low, high)
+            self.assertTrue(low < high < ranks[1])
+
+    def test_move_updates_only_the_moved_row(self):
+        first, second, third = (self.make_task(name) for name in ('First', 'Second', 'Third'))
+        self.assertEqual(self.board(), [first, second, third])
+        self.login(self.manager)
+
+        # Session user, task, membership, neighbour ranks, one UPDATE and its change-feed entry
+        # (read and insert), plus the savepoint pair.
+        with self.assertNumQueries(9):
+            response = self.move(third, status=Status.ToDo, before=first.pk, after=second.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.board(), [first, third, second])
+
+        response = self.move(first, status=Status.InProgress, before=None, after=None)
+        self.assertEqual(response.json()['status'], Status.InProgress)
+        self.assertEqual(self.board(Status.InProgress), [first])
+        self.assertTrue(TaskEvent.objects.filter(task=first, kind=TaskEvent.Kind.STATUS).exists())
+
+    def test_repeated_moves_to_one_spot_keep_ranks_short(self):
+        first, second = self.make_task('First'), self.make_task('Second')
+        # Moving the bottom card to the top over and over would add a digit every few moves.
+        for _ in range(400):
+            top, bottom = self.board()
+            rank = rank_for_move(bottom, Status.ToDo, after_id=top.pk)
+            Task.objects.filter(pk=bottom.pk).update(rank=rank)
+            self.assertEqual(self.board()[0], bottom)
+        self.assertTrue(all(len(task.rank) <= MAX_RANK_LENGTH for task in self.board()))
+
+        for _ in range(400):
+            self.make_task('Later')
+        self.assertLessEqual(max(len(task.rank) for task in self.board()), MAX_RANK_LENGTH)
+
+    def test_unranked_column_is_rebalanced_and_members_cannot_move(self):
+        first, second = self.make_task('First'), self.make_task('Second')
+        Task.objects.update(rank='')
+        self.login(self.manager)
+        self.assertEqual(self.move(second, before=None, after=first.pk).status_code, 200)
+        self.assertEqual(self.board(), [second, first])
+        self.assertEqual(self.move(second, before=first.pk, after=first.pk).status_code, 400)
+
+        self.login(self.member)
+        self.assertEqual(self.move(first, before=second.pk).status_code, 403)
+        self.assertContains(self.client.get(reverse('projects:project-board', args=[self.project.pk])), 'First')
+
+
+class DependencyTests(ProjectTestCase):
+    def test_cycles_are_rejected(self):
+        design, build, ship = (self.make_task(name) for name in ('Design', 'Build', 'Ship'))
+        add_dependency(design, build)
+        add_dependency(build, ship)
+        self.assertEqual(list(ship.blocked_by.all()), [build])
+        self.assertEqual(list(design.blocking.all()), [build])
+
+        with self.assertNumQueries(1):
+            self.assertTrue(creates_cycle(ship.pk, design.pk))
+        with self.assertRaises(DependencyError):
+            add_dependency(ship, design)
+
+        self.login(self.manager)
+        self.client.post(reverse('projects:task-dependencies', args=[design.pk]), {'blocker': ship.pk})
+        self.assertFalse(design.blocked_by.exists())
+
+    def test_critical_path_is_cached_per_generation(self):
+        today = date(2025, 3, 3)
+        design = self.make_task('Design', status=Status.Done)
+        build = self.make_task('Build', due_date=today)
+        docs = self.make_task('Docs')
+        ship = self.make_task('Ship')
+        add_dependency(design, build)
+        add_dependency(build, ship)
+        add_dependency(docs, ship)
+
+        graph = dependency_graph(self.project.pk, today)
+        self.assertEqual(graph['critical_path'], [design.pk, build.pk, ship.pk])
+        self.assertEqual(graph['length_days'], 2)
+        self.assertEqual(graph['at_risk'], [build.pk])
+
+        with self.assertNumQueries(1):
+            dependency_graph(self.project.pk, today)
+        self.edit(build, status=Status.Done)
+        graph = dependency_graph(self.project.pk, today)
+        self.assertEqual(graph['critical_path'], [docs.pk, ship.pk])
+        self.assertEqual(graph['at_risk'], [])
+
+
+class CloneProjectTests(ProjectTestCase):
+    def test_copies_rows_in_batches_and_shifts_dates(self):
+        self.project.start_date = date(2025, 1, 1)
+        self.project.save()
+        design = self.make_task('Design', status=Status.Done, due_date=date(2025, 1, 10), assignees=[self.member])
+        build = self.make_task('Build', assignees=[self.member, self.manager])
+        add_dependency(design, build)
+        archive_task(self.make_task('Dropped'))
+
+        # A fixed number of statements: one read and one insert per table, plus the inbox refresh
+        # and the change feed.
+        with self.assertNumQueries(26):
+            clone = clone_project(self.project, self.member, 'Website v2', day_offset=7)
+
+        self.assertEqual(clone.start_date, date(2025, 1, 8))
+        copies = {task.task_name: task for task in clone.tasks.all()}
+        self.assertEqual(set(copies), {'Design', 'Build'})
+        self.assertEqual((copies['Design'].status, copies['Design'].due_date), (Status.ToDo, date(2025, 1, 17)))
+        self.assertEqual(list(copies['Build'].blocked_by.all()), [copies['Design']])
+        self.assertEqual(set(copies['Build'].assignees.all()), {self.member, self.manager})
+        self.assertEqual(clone.memberships.get(user=self.member).role, ProjectMember.Role.MANAGER)
+        self.assertEqual(TaskInbox.objects.filter(user=self.member, task__project=clone).count(), 2)
+
+    def test_only_managers_can_duplicate(self):
+        url = reverse('projects:clone-project', args=[self.project.pk])
+        self.login(self.member)
+        self.client.post(url, {'project_name': 'Mine', 'day_offset': 0})
+        self.assertFalse(Project.objects.filter(project_name='Mine').exists())
+
+        self.login(self.manager)
+        response = self.client.post(url, {'project_name': 'Mine', 'day_offset': 0, 'reset_status': 'on'})
+        self.assertRedirects(response, reverse('projects:project-detail', args=[Project.objects.get(project_name='Mine').pk]),
+                             fetch_redirect_response=False)
+
+
+class ProjectMemberAddTests(ProjectTestCase):
+    def test_adding_an_existing_member_warns_instead_of_failing(self):
+        self.login(self.manager)
+        url = reverse('projects:add-member', args=[self.project.pk])
+        response = self.client.post(url, {'username': 'member'}, follow=True)
+        self.assertContains(response, 'member is already a member of this project.')
+        self.assertEqual(ProjectMember.objects.filter(project=self.project, user=self.member).count(), 1)
+
+        newcomer = make_user('newcomer')
+        OrganizationMember.objects.create(organization=self.organization, user=newcomer, role=OrgRole.Member)
+        response = self.client.post(url, {'username': 'newcomer'}, follow=True)
+        self.assertContains(response, 'newcomer was added to the project!')
+
+
+class DuplicateMemberAddTests(TransactionTestCase):
+    def test_parallel_adds_create_one_membership(self):
+        manager, newcomer = make_user('manager'), make_user('newcomer')
+        organization = Organization.objects.create(org_creator=manager, org_name='Acme', org_code='ACME1234')
+        OrganizationMember.objects.create(organization=organization, user=manager, role=OrgRole.Manager)
+        OrganizationMember.objects.create(organization=organization, user=newcomer, role=OrgRole.Member)
+        project = Project.objects.create(organization=organization, created_by=manager, project_name='Website')
+        ProjectMember.objects.create(project=project, user=manager, role=ProjectMember.Role.MANAGER)
+        clients = [logged_in_client(manager) for _ in range(4)]
+
+        with counting_conflicts('projects.views.create_unique') as conflicts:
+            statuses = post_concurrently(clients, reverse('projects:add-member', args=[project.pk]), {'username': 'newcomer'})
+
+        self.assertEqual(statuses, [302] * len(clients))
+        self.assertEqual(ProjectMember.objects.filter(project=project, user=newcomer).count(), 1)
+        # Every request but the winner reached the insert and was turned away by the constraint;
+        # one retried after contention may be turned away twice.
+        self.assertEqual(set(conflicts), {ProjectMember})
+        self.assertGreaterEqual(len(conflicts), len(clients) - 1)
+
+
+class EditConflictTests(ProjectTestCase):
+    def test_stale_edit_gets_a_conflict_and_writes_only_changed_columns(self):
+        task = self.make_task('Draft', assignees=[self.member])
+        self.login(self.manager)
+        url = reverse('projects:task-detail', args=[task.pk])
+        stale = {
+            'project': self.project.pk, 'task_name': 'Draft', 'status': Status.ToDo, 'due_date': '',
+            'assignees': [self.member.pk], 'version': task.version,
+        }
+
+        self.edit(task, status=Status.Testing)
+        task.refresh_from_db()
+        self.assertEqual(task.version, 2)
+
+        response = self.client.post(url, {**stale, 'task_name': 'Renamed'})
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, 'Renamed', status_code=409)
+        self.assertEqual(Task.objects.get(pk=task.pk).task_name, 'Draft')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url, {**stale, 'task_name': 'Renamed', 'status': Status.Testing, 'version': 2})
+        update = next(query['sql'] for query in queries if query['sql'].startswith('UPDATE "projects_task"'))
+        self.assertIn('"task_name"', update)
+        self.assertNotIn('"task_desc"', update)
+        task.refresh_from_db()
+        self.assertEqual((task.task_name, task.status, task.version), ('Renamed', Status.Testing, 3))
+
+    def test_edit_without_a_version_is_rejected(self):
+        task = self.make_task('Draft')
+        self.login(self.manager)
+        data = {'project': self.project.pk, 'task_name': 'Renamed', 'status': Status.ToDo, 'due_date': ''}
+        response = self.client.post(reverse('projects:task-detail', args=[task.pk]), data)
+        self.assertContains(response, 'This form is out of date.')
+        task.refresh_from_db()
+        self.assertEqual((task.task_name, task.version), ('Draft', 1))
+
+    def test_rejected_edits_render_the_saved_task_and_every_panel(self):
+        task = self.make_task('Draft', assignees=[self.manager])
+        add_dependency(self.make_task('Design'), task)
+        TimeEntry.objects.create(task=task, user=self.manager, work_date=date.today(), minutes=45)
+        self.login(self.manager)
+        url = reverse('projects:task-detail', args=[task.pk])
+        stale = {
+            'project': self.project.pk, 'task_name': 'Renamed', 'status': Status.ToDo, 'due_date': '',
+            'assignees': [self.manager.pk], 'version': task.version,
+        }
+        self.edit(task, status=Status.Testing)
+
+        for data, status_code in [(stale, 409), ({**stale, 'version': 2, 'task_name': ''}, 200)]:
+            response = self.client.post(url, data)
+            self.assertEqual(response.status_code, status_code)
+            self.assertContains(response, '<h1>Draft</h1>', status_code=status_code)
+            self.assertContains(response, 'Status: Testing', status_code=status_code)
+            self.assertContains(response, 'Design', status_code=status_code)
+            self.assertNotContains(response, 'Nothing blocks this task', status_code=status_code)
+            self.assertContains(response, '45 min logged', status_code=status_code)
+            self.assertNotContains(response, 'You have not logged time', status_code=status_code)
+            self.assertContains(response, 'Log time', status_code=status_code)
+
+
+class ChangeFeedTests(ProjectTestCase):
+    def feed(self, **params):
+        return self.client.get(reverse('changes'), params)
+
+    def test_feed_is_scoped_and_carries_tombstones(self):
+        outsider = make_user('outsider')
+        other = Organization.objects.create(org_creator=outsider, org_name='Other', org_code='OTHER123')
+        Task.objects.create(
+            project=Project.objects.create(organization=other, created_by=outsider, project_name='Secret'),
+            task_name='Hidden', status=Status.ToDo,
+        )
+        task = self.make_task('Draft', assignees=[self.member])
+        self.login(self.member)
+
+        payload = self.feed().json()
+        names = [data['name'] for _, entity, _, data in payload['changes'] if entity == 'task']
+        self.assertEqual(names, ['Draft'])
+        self.assertFalse(payload['more'])
+        self.assertTrue(self.feed(limit=1).json()['more'])
+
+        cursor = payload['next']
+        self.edit(task, status=Status.Testing)
+        archive_task(task)
+        changes = self.feed(since=cursor).json()['changes']
+        self.assertEqual([(entity, pk) for _, entity, pk, _ in changes], [('task', task.pk), ('task', task.pk)])
+        self.assertEqual((changes[0][3]['status'], changes[0][3]['version']), (Status.Testing, 2))
+        self.assertIsNone(changes[1][3])
+
+        # Leaving the organization still reaches the member who left, and nothing after it does.
+        cursor = changes[-1][0]
+        membership = OrganizationMember.objects.get(user=self.member)
+        membership_id = membership.pk
+        membership.delete()
+        self.make_task('Later')
+        self.assertEqual(self.feed(since=cursor).json()['changes'], [[cursor + 1, 'org_member', membership_id, None]])
+
+    def test_compaction_keeps_the_latest_entry_and_moves_the_horizon(self):
+        task = self.make_task('Draft')
+        self.edit(task, status=Status.InProgress)
+        self.edit(task, status=Status.Testing)
+        archive_task(task)
+        self.login(self.member)
+        old_cursor = self.feed(limit=1).json()['next']
+
+        counts = compact_changes(timezone.now() + timedelta(seconds=1))
+        self.assertEqual(counts['tombstones'], 1)
+        self.assertGreaterEqual(counts['superseded'], 3)
+
+        self.assertEqual(self.feed(since=old_cursor).status_code, 410)
+        changes = self.feed().json()['changes']
+        self.assertNotIn(task.pk, [pk for _, entity, pk, _ in changes if entity == 'task'])
+        self.assertEqual(len(changes), len({(entity, pk) for _, entity, pk, _ in changes}))
+
+
+    @override_settings(CHANGE_FEED_SETTLE_SECONDS=60)
+    def test_cursor_stays_behind_entries_that_may_still_be_committing(self):
+        settled = self.make_task('Settled')
+        Change.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        fresh = [self.make_task('Fresh').pk, self.make_task('Fresher').pk]
+        self.login(self.member)
+
+        payload = self.feed().json()
+        tasks = [pk for _, entity, pk, _ in payload['changes'] if entity == 'task']
+        self.assertEqual(tasks, [settled.pk, *fresh])
+        self.assertEqual(payload['next'], Change.objects.get(entity='task', entity_id=settled.pk).seq)
+        again = self.feed(since=payload['next']).json()
+        self.assertEqual([pk for _, entity, pk, _ in again['changes']], fresh)
+        self.assertEqual(again['next'], payload['next'])
+
+        # A page that cannot move the cursor does not ask to be fetched again straight away.
+        page = self.feed(since=payload['next'], limit=1).json()
+        self.assertEqual((len(page['changes']), page['next'], page['more']), (1, payload['next'], False))
+
+    def test_joining_resets_the_cursor_and_backfill_covers_old_rows(self):
+        task = self.make_task('Draft')
+        newcomer = make_user('newcomer')
+        other = Organization.objects.create(org_creator=newcomer, org_name='Other', org_code='OTHER123')
+        OrganizationMember.objects.create(organization=other, user=newcomer, role=OrgRole.Manager)
+        self.login(newcomer)
+        cursor = self.feed().json()['next']
+        self.assertEqual(self.feed(since=cursor).status_code, 200)
+        OrganizationMember.objects.create(organization=self.organization, user=newcomer, role=OrgRole.Member)
+
+        response = self.feed(since=cursor)
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.json()['reset'])
+        payload = self.feed().json()
+        self.assertIn(('task', task.pk), [(entity, pk) for _, entity, pk, _ in payload['changes']])
+        self.assertEqual(self.feed(since=payload['next']).status_code, 200)
+
+        # Rows written before the feed existed are logged once, by the management command.
+        Change.objects.all().delete()
+        out = io.StringIO()
+        call_command('backfill_changes', stdout=out)
+        self.assertNotEqual(out.getvalue(), 'Logged 0 entries.\n')
+        self.assertEqual(backfill_changes(), 0)
+        self.assertIn(('task', task.pk), [(entity, pk) for _, entity, pk, _ in self.feed().json()['changes']])
+
+
+class MarkupTests(ProjectTestCase):
+    def test_description_is_rendered_once_per_change(self):
+        other = self.make_task('Spec')
+        task = Task.objects.create(
+            project=self.project, task_name='Launch', status=Status.ToDo,
+            task_desc=f"Ask @member and @nobody about #{other.pk} and #999999.\n<script>alert(1)</script>\n\nThen ship.",
+        )
+        self.assertIn('<span class="mention">@member</span>', task.desc_html)
+        self.assertIn(f'href="{reverse("projects:task-detail", args=[other.pk])}"', task.desc_html)
+        self.assertIn('@nobody', task.desc_html)
+        self.assertIn('#999999', task.desc_html)
+        self.assertNotIn('<script>', task.desc_html)
+        self.assertTrue(task.desc_excerpt.startswith(f"Ask @member and @nobody about #{other.pk}"))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(render_description(task), [])
+
+        self.edit(task, task_desc='Now this.')
+        task.refresh_from_db()
+        self.assertEqual((task.desc_html, task.desc_excerpt), ('<p>Now this.</p>', 'Now this.'))
+
+    def test_references_resolve_in_one_query_each(self):
+        first, second = self.make_task('First'), self.make_task('Second')
+        with self.assertNumQueries(2):
+            html, _ = render_markup(f'@manager @member #{first.pk} #{second.pk}', [self.organization.pk])
+        self.assertEqual(html.count('class="mention"'), 2)
+        self.assertEqual(html.count('class="task-link"'), 2)
+
+    def test_sanitizer_drops_unsafe_markup(self):
+        self.assertEqual(
+            sanitize('<p onclick="x()">Hi <a href="javascript:alert(1)">there</a><img src=x></p><style>p{}</style>'),
+            '<p>Hi there</p>',
+        )
+
+    def test_cards_show_the_stored_excerpt(self):
+        task = self.make_task('Copy')
+        Task.objects.filter(pk=task.pk).update(desc_excerpt='Stored excerpt')
+        self.login(self.member)
+        self.assertContains(self.client.get(reverse('projects:project-detail', args=[self.project.pk])), 'Stored excerpt')
+
+
+class TimeTrackingTests(ProjectTestCase):
+    def test_rollups_follow_inserts_edits_and_deletes(self):
+        task, other = self.make_task('Build'), self.make_task('Test')
+        monday = week_of(date.today())
+        first = TimeEntry.objects.create(task=task, user=self.member, work_date=monday, minutes=60)
+        TimeEntry.objects.create(task=task, user=self.member, work_date=monday + timedelta(days=2), minutes=30)
+        TimeEntry.objects.create(task=other, user=self.manager, work_date=monday, minutes=45)
+
+        self.assertEqual(TaskTime.objects.get(task=task).minutes, 90)
+        self.assertEqual(ProjectWeekTime.objects.get(project=self.project, week=monday).minutes, 135)
+        self.assertEqual(MemberWeekTime.objects.get(user=self.member, week=monday).entries, 2)
+
+        first.minutes = 20
+        first.save()
+        self.assertEqual(TaskTime.objects.get(task=task).minutes, 50)
+        first.work_date, first.task = monday - timedelta(days=7), other
+        first.save()
+        self.assertEqual(TaskTime.objects.get(task=task).minutes, 30)
+        self.assertEqual(ProjectWeekTime.objects.get(week=monday - timedelta(days=7)).minutes, 20)
+        TimeEntry.objects.filter(task=other).delete()
+        self.assertFalse(TaskTime.objects.filter(task=other).exists())
+        self.assertEqual(ProjectWeekTime.objects.get(week=monday).minutes, 30)
+
+        # Every incremental write agreed with a full recompute.
+        counts = reconcile_time(dry_run=True)
+        self.assertEqual(sum(counts['tasktime'].values()), 0)
+        self.assertEqual(counts['projectweektime'], {'created': 0, 'updated': 0, 'deleted': 0})
+        self.assertEqual(counts['memberweektime'], {'created': 0, 'updated': 0, 'deleted': 0})
+
+    def test_reconcile_repairs_writes_that_skipped_the_signals(self):
+        task = self.make_task('Build')
+        TimeEntry.objects.create(task=task, user=self.member, work_date=date.today(), minutes=60)
+        TimeEntry.objects.update(minutes=90)
+        TaskTime.objects.all().delete()
+
+        call_command('reconcile_time', stdout=io.StringIO())
+        self.assertEqual(TaskTime.objects.get(task=task).minutes, 90)
+        self.assertEqual(ProjectWeekTime.objects.get().minutes, 90)
+        self.assertEqual(MemberWeekTime.objects.get().minutes, 90)
+
+        # Deleting the task takes its entries and every rollup row they fed with it.
+        task.delete()
+        self.assertFalse(ProjectWeekTime.objects.exists() or MemberWeekTime.objects.exists())
+
+    def test_report_reads_only_rollups(self):
+        task = self.make_task('Build')
+        monday = week_of(date.today())
+        for weeks_ago in range(3):
+            TimeEntry.objects.create(task=task, user=self.member, work_date=monday - timedelta(weeks=weeks_ago), minutes=60)
+        self.login(self.member)
+        url = reverse('organization_time_report', args=[self.organization.org_id])
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.login(self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            payload = self.client.get(url, {'start': (monday - timedelta(weeks=1)).isoformat()}).json()
+        self.assertFalse(any('projects_timeentry' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(payload['total'], 120)
+        self.assertEqual(payload['projects'], [[self.project.pk, 'Website', 120]])
+        self.assertEqual(payload['members'], [[self.member.pk, 'member', 120]])
+        self.assertEqual([minutes for _, minutes in payload['weeks']], [60, 60])
+
+    def test_project_members_log_time_from_the_task_page(self):
+        task = self.make_task('Build')
+        self.login(self.member)
+        response = self.client.post(reverse('projects:task-time', args=[task.pk]),
+                                    {'work_date': date.today().isoformat(), 'minutes': 25, 'note': 'Wireframes'})
+        self.assertRedirects(response, reverse('projects:task-detail', args=[task.pk]), fetch_redirect_response=False)
+        self.assertContains(self.client.get(reverse('projects:task-detail', args=[task.pk])), '25 min logged')
+
+        # Swapping an entry for one of the same length still refreshes the viewer's list.
+        url = reverse('projects:task-detail', args=[task.pk])
+        etag = self.client.get(url)['ETag']
+        TimeEntry.objects.get().delete()
+        TimeEntry.objects.create(task=task, user=self.member, work_date=date.today(), minutes=25, note='Mockups')
+        self.assertContains(self.client.get(url, HTTP_IF_NONE_MATCH=etag), 'Mockups')
+
+        entry = TimeEntry.objects.get()
+        outsider = make_user('outsider')
+        self.login(outsider)
+        self.client.post(reverse('projects:delete-time', args=[entry.pk]))
+        self.assertTrue(TimeEntry.objects.exists())
+        self.login(self.member)
+        self.client.post(reverse('projects:delete-time', args=[entry.pk]))
+        self.assertFalse(TaskTime.objects.exists())
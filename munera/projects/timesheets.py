@@ -0,0 +1,156 @@
+"""
+Time tracking: raw ``TimeEntry`` rows plus rollups that reports read instead.
+
+Every entry is counted in three summary rows: its task's ``TaskTime``, its
+project's ``ProjectWeekTime`` and its author's ``MemberWeekTime`` for the
+task's organization, both keyed by the Monday of ``work_date``. The receivers
+in ``projects.signals`` call ``move_time`` on every save and delete, which
+shifts the entry's minutes with ``UPDATE ... SET minutes = minutes + %s`` and
+only inserts the first time a row is needed, so concurrent writers never lose
+an increment. A row goes away with its last entry. Decrements never insert:
+when a cascade removes a task, project or user, its rollup rows are already
+gone.
+
+A report over an organization's year reads at most a row per project and a
+row per member for each week; it never touches ``TimeEntry``. Rollups follow
+the task's project at the time the entry was written; after moving a task
+between projects, or any write that skipped the signals, ``reconcile_time``
+(``manage.py reconcile_time``) recomputes them from the entries in bulk.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncWeek
+
+from munera.integrity import create_unique
+from .models import MemberWeekTime, ProjectWeekTime, Task, TaskTime, TimeEntry
+
+REPORT_WEEKS = 52
+MAX_REPORT_WEEKS = 106
+
+
+def week_of(day):
+    return day - timedelta(days=day.weekday())
+
+
+def entry_key(entry):
+    """What an entry contributes: ``(task_id, user_id, week, minutes)``."""
+    return entry.task_id, entry.user_id, week_of(entry.work_date), entry.minutes
+
+
+def stored_key(entry_id):
+    """``entry_key`` of the row as currently stored, or ``None``."""
+    row = TimeEntry.objects.filter(pk=entry_id).values_list('task_id', 'user_id', 'work_date', 'minutes').first()
+    return row and (row[0], row[1], week_of(row[2]), row[3])
+
+
+def _bump(model, lookups, minutes, entries, insert_values):
+    rows = model.objects.filter(**lookups)
+    if rows.update(minutes=F('minutes') + minutes, entries=F('entries') + entries):
+        if entries < 0:
+            # Drop a row once its last entry is gone, as a recompute would.
+            rows.filter(entries__lte=0).delete()
+        return
+    if entries < 0 or minutes < 0:
+        return
+    if create_unique(model, minutes=minutes, entries=entries, **insert_values()) is None:
+        # Another writer created the row first; add to theirs.
+        rows.update(minutes=F('minutes') + minutes, entries=F('entries') + entries)
+
+
+def _apply(task_id, user_id, week, minutes, entries):
+    owner = []
+
+    def ids():
+        if not owner:
+            owner.extend(Task.all_objects.filter(pk=task_id).values_list('project_id', 'project__organization_id').get())
+        return owner
+
+    _bump(TaskTime, {'task_id': task_id}, minutes, entries, lambda: {'task_id': task_id})
+    _bump(ProjectWeekTime, {'project__tasks': task_id, 'week': week}, minutes, entries,
+          lambda: {'project_id': ids()[0], 'week': week})
+    _bump(MemberWeekTime, {'organization__projects__tasks': task_id, 'user_id': user_id, 'week': week}, minutes, entries,
+          lambda: {'organization_id': ids()[1], 'user_id': user_id, 'week': week})
+
+
+def move_time(before, after):
+    """Take an entry out of the rollups for ``before`` and add it to those for ``after`` (``entry_key`` or ``None``)."""
+    if before == after:
+        return
+    if before and after and before[:3] == after[:3]:
+        _apply(*after[:3], after[3] - before[3], 0)
+        return
+    if before:
+        _apply(*before[:3], -before[3], -1)
+    if after:
+        _apply(*after[:3], after[3], 1)
+
+
+ROLLUPS = {
+    TaskTime: {'task_id': 'task_id'},
+    ProjectWeekTime: {'project_id': F('task__project_id'), 'week': TruncWeek('work_date')},
+    MemberWeekTime: {
+        'organization_id': F('task__project__organization_id'), 'user_id': 'user_id', 'week': TruncWeek('work_date'),
+    },
+}
+
+
+def _reconcile(model, keys, dry_run):
+    names = list(keys)
+    columns = [name for name, source in keys.items() if isinstance(source, str)]
+    aliases = {name: source for name, source in keys.items() if not isinstance(source, str)}
+    desired = {
+        tuple(row[name] for name in names): (row['total'], row['count'])
+        for row in TimeEntry.objects.values(*columns, **aliases).annotate(total=Sum('minutes'), count=Count('pk')).order_by()
+    }
+    existing = {row[1:-2]: (row[0], row[-2:]) for row in model.objects.values_list('pk', *names, 'minutes', 'entries')}
+
+    stale = [pk for key, (pk, _) in existing.items() if key not in desired]
+    changed, missing = [], []
+    for key, (minutes, entries) in desired.items():
+        values = dict(zip(names, key), minutes=minutes, entries=entries)
+        if key not in existing:
+            missing.append(model(**values))
+        elif existing[key][1] != (minutes, entries):
+            changed.append(model(pk=existing[key][0], **values))
+
+    if not dry_run:
+        model.objects.filter(pk__in=stale).delete()
+        model.objects.bulk_update(changed, ['minutes', 'entries'], batch_size=500)
+        model.objects.bulk_create(missing, batch_size=500)
+    return {'created': len(missing), 'updated': len(changed), 'deleted': len(stale)}
+
+
+def reconcile_time(dry_run=False):
+    """Recompute every rollup from ``TimeEntry`` with one grouped query each; returns change counts per model."""
+    with transaction.atomic():
+        return {model._meta.model_name: _reconcile(model, keys, dry_run) for model, keys in ROLLUPS.items()}
+
+
+def report_window(start, end, today):
+    """Whole weeks ``(first Monday, last Monday)`` covering ``[start, end]``; defaults to the last year."""
+    end = week_of(end or today)
+    start = week_of(start or end - timedelta(weeks=REPORT_WEEKS - 1))
+    if end < start:
+        start, end = end, start
+    return start, min(end, start + timedelta(weeks=MAX_REPORT_WEEKS - 1))
+
+
+def time_report(organization, start, end):
+    """Minutes per project, per member and per week for weeks ``start``..``end``, from the rollups only."""
+    projects = ProjectWeekTime.objects.filter(project__organization=organization, week__range=(start, end))
+    members = MemberWeekTime.objects.filter(organization=organization, week__range=(start, end))
+
+    def totals(rows, *columns):
+        return list(rows.values_list(*columns).annotate(total=Sum('minutes')).filter(total__gt=0).order_by(*columns))
+
+    weeks = totals(projects, 'week')
+    return {
+        'start': start,
+        'end': end,
+        'total': sum(minutes for _, minutes in weeks),
+        'weeks': [list(row) for row in weeks],
+        'projects': [list(row) for row in totals(projects, 'project_id', 'project__project_name')],
+        'members': [list(row) for row in totals(members, 'user_id', 'user__user_name')],
+    }
@@ -6,13 +6,27 @@ app_name = 'projects'
 urlpatterns = [
     path('my-projects/', views.MyProjectsView.as_view(), name='my-projects'),
     path('detail/<int:project_id>/', views.ProjectDetailView.as_view(), name='project-detail'),
+    path('duplicate/<int:project_id>/', views.ProjectCloneView.as_view(), name='clone-project'),
+    path('board/<int:project_id>/', views.ProjectBoardView.as_view(), name='project-board'),
+    path('dependencies/<int:project_id>/', views.ProjectDependencyGraphView.as_view(), name='project-dependencies'),
+    path('analytics/<int:project_id>/', views.ProjectAnalyticsView.as_view(), name='project-analytics'),
     path('create/', views.ProjectCreateView.as_view(), name='create-project'),
     path('add-member/<int:project_id>/', views.ProjectMemberAddView.as_view(), name='add-member'),
     path('create-task/<int:project_id>/', views.ProjectTaskCreateView.as_view(), name='create-task'),
     path('tasks/<int:task_id>/', views.TaskDetailView.as_view(), name='task-detail'),
+    path('tasks/<int:task_id>/dependencies/', views.TaskDependencyView.as_view(), name='task-dependencies'),
+    path('tasks/<int:task_id>/move/', views.TaskMoveView.as_view(), name='task-move'),
+    path('tasks/<int:task_id>/history/', views.TaskHistoryView.as_view(), name='task-history'),
+    path('tasks/<int:task_id>/time/', views.TaskTimeView.as_view(), name='task-time'),
+    path('time/<int:entry_id>/delete/', views.TimeEntryDeleteView.as_view(), name='delete-time'),
     path('remove-member/<int:project_id>/<int:user_id>/', views.ProjectMemberRemoveView.as_view(), name='remove-member'),
     path('tasks/', views.TasksPageView.as_view(), name='tasks'),
+    path('calendar/', views.TaskCalendarView.as_view(), name='calendar'),
+    path('calendar/data/', views.TaskCalendarDataView.as_view(), name='calendar-data'),
     path('tasks/delete/<int:task_id>/', views.TaskDeleteView.as_view(), name='delete_task'),
     path('tasks/add/', views.TaskAddView.as_view(), name='add_task'),
+    path('archive/', views.ArchiveView.as_view(), name='archive'),
+    path('archive/project/<int:project_id>/', views.ProjectArchiveView.as_view(), name='archive-project'),
+    path('archive/tasks/<int:task_id>/restore/', views.TaskRestoreView.as_view(), name='restore-task'),
 ]
 
@@ -0,0 +1,41 @@
+"""
+Optimistic concurrency for edits to versioned rows (``Task``, ``Project``).
+
+An edit carries the ``version`` it was made against. ``save_changes`` writes
+only the changed columns with ``UPDATE ... WHERE pk = %s AND version = %s``
+and bumps the version in the same statement. If no row matched, someone else
+saved first, and ``EditConflict`` carries the current row so the caller can
+show what differs. No row locks are taken.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .changes import log_instance
+from .markup import render_description
+
+
+class EditConflict(Exception):
+    def __init__(self, current):
+        super().__init__(f"{current._meta.verbose_name} {current.pk} was changed by someone else.")
+        self.current = current
+
+
+def save_changes(instance, fields, expected_version):
+    """Persist ``fields`` of ``instance`` if its row is still at ``expected_version``."""
+    model = type(instance)
+    now = timezone.now()
+    fields = [*fields, *render_description(instance)]
+    values = {model._meta.get_field(name).attname: getattr(instance, model._meta.get_field(name).attname) for name in fields}
+    with transaction.atomic():
+        updated = model.all_objects.filter(pk=instance.pk, version=expected_version).update(
+            version=F('version') + 1, updated_at=now, **values,
+        )
+        if updated:
+            instance.version = expected_version + 1
+            instance.updated_at = now
+            # The row matched expected_version, so the instance now mirrors it exactly.
+            log_instance(instance)
+    if not updated:
+        raise EditConflict(model.all_objects.get(pk=instance.pk))
+    return instance
@@ -1,11 +1,42 @@
+import json
+from copy import copy
+from datetime import date
+
 from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Sum
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
 from django.views import View
 
+from munera.conditional import PageValidator, collect_stamps, stamp, viewer_parts
+from munera.integrity import create_unique
 from organization.models import OrganizationMember, Role as OrgRole
 from users.models import User
-from .forms import ProjectForm, TaskForm
-from .models import Project, ProjectMember, Task
+from users.services import member_cards, user_names
+from .analytics import cached_report
+from .archive import archive_project, archive_task, restore_project, restore_task
+from .changes import FEED_LIMIT, MAX_FEED_LIMIT, current_horizon, feed_payload, joined_since, record
+from .cloning import clone_project
+from .forms import ProjectCloneForm, ProjectForm, TaskForm, TimeEntryForm
+from .dependencies import DependencyError, add_dependency, dependency_graph, remove_dependency
+from .history import diff_events, split_ids, task_timeline
+from .inbox import refresh_inbox
+from .models import Project, ProjectMember, Status, Task, TaskDependency, TaskEvent, TaskTime, TimeEntry
+from .ranking import rank_for_move
+from .versioning import EditConflict
+from .schedule import (
+    CALENDAR_SPANS,
+    calendar_payload,
+    calendar_weeks,
+    calendar_window,
+    group_by_day,
+    parse_anchor,
+    tasks_in_window,
+)
+from .services import visible_tasks
 
 
 def get_authenticated_user(request):
@@ -44,14 +75,10 @@ class SessionUserMixin:
 
 class TasksPageView(SessionUserMixin, View):
     template_name = 'projects/tasks.html'
+    use_replica = True
 
     def get(self, request):
-        assigned_tasks = Task.objects.filter(assignments__user=self.current_user)
-        managed_tasks = Task.objects.filter(
-            project__organization__memberships__user=self.current_user,
-            project__organization__memberships__role=OrgRole.Manager,
-        )
-        tasks = (assigned_tasks | managed_tasks).select_related('project').distinct().order_by('due_date')
+        tasks = visible_tasks(self.current_user).select_related('project').order_by('due_date')
         manager_project_ids = set(Project.objects.filter(
             organization__memberships__user=self.current_user,
             organization__memberships__role=OrgRole.Manager
@@ -69,6 +96,65 @@ class TasksPageView(SessionUserMixin, View):
         return render(request, self.template_name, context)
 
 
+class CalendarWindowMixin(SessionUserMixin):
+    default_span = 'month'
+
+    def get_window(self, request):
+        span = request.GET.get('span')
+        if span not in CALENDAR_SPANS:
+            span = self.default_span
+        anchor = parse_anchor(request.GET.get('date'), date.today())
+        start, end = calendar_window(span, anchor)
+        return span, start, end
+
+    def get_days(self, start, end):
+        return group_by_day(tasks_in_window(visible_tasks(self.current_user), start, end))
+
+
+class TaskCalendarView(CalendarWindowMixin, View):
+    template_name = 'projects/calendar.html'
+
+    def get(self, request):
+        span, start, end = self.get_window(request)
+        days = self.get_days(start, end)
+        payload = calendar_payload(span, start, end, days)
+        context = {
+            'span': span,
+            'spans': CALENDAR_SPANS,
+            'start': start,
+            'end': end,
+            'prev_date': payload['prev'],
+            'next_date': payload['next'],
+            'weeks': calendar_weeks(start, end, days),
+            'task_count': sum(len(rows) for rows in days.values()),
+            'user': self.current_user,
+        }
+        return render(request, self.template_name, context)
+
+
+class TaskCalendarDataView(CalendarWindowMixin, View):
+
+    def get(self, request):
+        span, start, end = self.get_window(request)
+        window_tasks = Task.objects.filter(
+            pk__in=visible_tasks(self.current_user).values('pk'),
+            due_date__range=(start, end),
+        )
+        stamps = collect_stamps(
+            User.objects.filter(pk=self.current_user.pk),
+            task_count=stamp(window_tasks, Count('pk')),
+            task_updated=stamp(window_tasks, Max('updated_at')),
+            project_updated=stamp(window_tasks, Max('project__updated_at')),
+        )
+        validator = PageValidator.from_stamps(stamps, self.current_user.pk, span, start, end)
+        cached = validator.check(request)
+        if cached:
+            return cached
+
+        payload = calendar_payload(span, start, end, self.get_days(start, end))
+        return validator.apply(JsonResponse(payload, json_dumps_params={'separators': (',', ':')}))
+
+
 class TaskDeleteView(SessionUserMixin, View):
 
     def post(self, request, task_id):
@@ -77,8 +163,8 @@ class TaskDeleteView(SessionUserMixin, View):
             messages.error(request, "Only project managers can delete tasks.")
             return redirect('projects:project-detail', project_id=task.project.project_id)
 
-        task.delete()
-        messages.success(request, "Task removed.")
+        archive_task(task)
+        messages.success(request, "Task archived. Managers can restore it from the archive.")
         return redirect('projects:project-detail', project_id=task.project.project_id)
 
     def get(self, request, task_id):
@@ -87,6 +173,68 @@ class TaskDeleteView(SessionUserMixin, View):
         return redirect('projects:project-detail', project_id=task.project.project_id)
 
 
+class ArchiveView(SessionUserMixin, View):
+    template_name = 'projects/archive.html'
+    paginate_by = 50
+
+    def get(self, request):
+        managed = OrganizationMember.objects.filter(user=self.current_user, role=OrgRole.Manager).values('organization')
+        projects = Project.all_objects.filter(
+            archived_at__isnull=False, organization__in=managed,
+        ).select_related('organization').annotate(task_count=Count('tasks')).order_by('-archived_at')
+        tasks = Task.all_objects.filter(
+            archived_at__isnull=False, project__archived_at__isnull=True, project__organization__in=managed,
+        ).select_related('project').order_by('-archived_at')
+        context = {
+            'archived_projects': projects,
+            'page': Paginator(tasks, self.paginate_by).get_page(request.GET.get('page')),
+            'user': self.current_user,
+        }
+        return render(request, self.template_name, context)
+
+
+class ProjectArchiveView(SessionUserMixin, View):
+
+    def post(self, request, project_id):
+        project = get_object_or_404(Project.all_objects.select_related('organization'), project_id=project_id)
+        if not self.is_manager(project):
+            messages.error(request, "Only organization managers can archive projects.")
+            return redirect('projects:my-projects')
+
+        if request.POST.get('action') == 'restore':
+            if project.archived_at:
+                restore_project(project)
+            messages.success(request, f"'{project.project_name}' restored.")
+            return redirect('projects:project-detail', project_id=project_id)
+
+        if not project.archived_at:
+            archive_project(project)
+        messages.success(request, f"'{project.project_name}' archived.")
+        return redirect('projects:archive')
+
+    def get(self, request, project_id):
+        return redirect('projects:archive')
+
+
+class TaskRestoreView(SessionUserMixin, View):
+
+    def post(self, request, task_id):
+        task = get_object_or_404(Task.all_objects.select_related('project__organization'), task_id=task_id)
+        if not self.is_manager(task.project):
+            messages.error(request, "Only organization managers can restore tasks.")
+            return redirect('projects:archive')
+        if task.project.archived_at:
+            messages.error(request, "Restore the project before restoring its tasks.")
+            return redirect('projects:archive')
+
+        restore_task(task)
+        messages.success(request, "Task restored.")
+        return redirect('projects:task-detail', task_id=task_id)
+
+    def get(self, request, task_id):
+        return redirect('projects:archive')
+
+
 class TaskAddView(SessionUserMixin, View):
 
     template_name = 'projects/add_task.html'
@@ -123,21 +271,65 @@ class TaskDetailView(SessionUserMixin, View):
             messages.error(request, "You must belong to this organization to view its tasks.")
             return redirect('my_organizations')
 
+        validator = self.get_validator(task, org_membership)
+        cached = validator.check(request)
+        if cached:
+            return cached
+
         can_edit = self.is_manager(task.project)
         form = TaskForm(instance=task, project=task.project, user=self.current_user)
         if not can_edit:
             for field in form.fields.values():
                 field.disabled = True
-
-        context = {
+        context = self.get_context(task, form, can_edit, org_membership)
+        return validator.apply(render(request, self.template_name, context))
+
+    def get_context(self, task, form, can_edit, org_membership, conflict=None):
+        """Everything the page shows; ``task`` must be the saved row, not the form's instance."""
+        blocked_by = list(task.blocked_by.order_by('task_name').values('task_id', 'task_name', 'status'))
+        blocking = list(task.blocking.order_by('task_name').values('task_id', 'task_name', 'status'))
+        can_log_time = can_edit or self.get_membership(task.project) is not None
+        return {
             'task': task,
             'project': task.project,
             'form': form,
             'can_edit': can_edit,
+            'conflict': conflict,
             'org_membership': org_membership,
+            'blocked_by': blocked_by,
+            'blocking': blocking,
+            'blocker_choices': (
+                Task.objects.filter(project_id=task.project_id).exclude(pk=task.pk)
+                .exclude(pk__in=[row['task_id'] for row in blocked_by]).order_by('task_name').values('task_id', 'task_name')
+                if can_edit else []
+            ),
+            'can_log_time': can_log_time,
+            'time_form': TimeEntryForm(initial={'work_date': date.today()}) if can_log_time else None,
+            'time_total': TaskTime.objects.filter(task=task).values_list('minutes', flat=True).first() or 0,
+            'my_time': TimeEntry.objects.filter(task=task, user=self.current_user).order_by('-work_date', '-pk')[:10],
             'user': self.current_user,
         }
-        return render(request, self.template_name, context)
+
+    def get_validator(self, task, org_membership):
+        members = ProjectMember.objects.filter(project_id=task.project_id)
+        siblings = Task.objects.filter(project_id=task.project_id)
+        edges = TaskDependency.objects.filter(blocked__project_id=task.project_id)
+        own_time = TimeEntry.objects.filter(task_id=task.pk, user=self.current_user)
+        stamps = collect_stamps(
+            Task.objects.filter(pk=task.pk),
+            task_updated=F('updated_at'),
+            project_updated=F('project__updated_at'),
+            member_count=stamp(members, Count('pk')),
+            member_sum=stamp(members, Sum('user_id')),
+            sibling_count=stamp(siblings, Count('pk')),
+            sibling_updated=stamp(siblings, Max('updated_at')),
+            edge_count=stamp(edges, Count('pk')),
+            edge_latest=stamp(edges, Max('pk')),
+            logged_minutes=stamp(TaskTime.objects.filter(task_id=task.pk), Max('minutes')),
+            own_time_count=stamp(own_time, Count('pk')),
+            own_time_latest=stamp(own_time, Max('pk')),
+        )
+        return PageValidator.from_stamps(stamps, org_membership.role, *viewer_parts(self.current_user))
 
     def post(self, request, task_id):
         task = get_object_or_404(Task.objects.select_related('project__organization'), task_id=task_id)
@@ -151,17 +343,132 @@ class TaskDetailView(SessionUserMixin, View):
             messages.error(request, "Only managers can update this task.")
             return redirect('projects:task-detail', task_id=task_id)
 
-        form = TaskForm(request.POST, instance=task, project=task.project, user=self.current_user)
+        # Validating writes the submitted values onto the instance, so the form gets its own copy.
+        form = TaskForm(request.POST, instance=copy(task), project=task.project, user=self.current_user)
+        status = 200
+        conflict = None
         if form.is_valid():
-            form.save()
-            messages.success(request, "Task updated.")
+            try:
+                form.save()
+                messages.success(request, "Task updated.")
+                return redirect('projects:task-detail', task_id=task_id)
+            except EditConflict as error:
+                status = 409
+                task = error.current
+                conflict = self.conflict_rows(form, task)
+                # Keep the user's edits on screen, rebased on the current version so saving again overwrites.
+                data = request.POST.copy()
+                data['version'] = task.version
+                form = TaskForm(data, instance=copy(task), project=task.project, user=self.current_user)
+                form.is_valid()
+
+        context = self.get_context(task, form, can_edit, org_membership, conflict)
+        return render(request, self.template_name, context, status=status)
+
+    def conflict_rows(self, form, current):
+        """``(label, yours, current)`` for every field the rejected edit touched."""
+        rows = [
+            (form[name].label, form.cleaned_data[name], getattr(current, name))
+            for name in form.changed_fields()
+        ]
+        if 'assignees' in form.changed_data:
+            yours = sorted(user.user_name for user in form.cleaned_data['assignees'])
+            theirs = sorted(current.assignees.values_list('user_name', flat=True))
+            rows.append((form['assignees'].label, ", ".join(yours), ", ".join(theirs)))
+        return rows
+
+
+class TaskDependencyView(SessionUserMixin, View):
+
+    def post(self, request, task_id):
+        task = get_object_or_404(Task.objects.select_related('project__organization'), task_id=task_id)
+        if not self.is_manager(task.project):
+            messages.error(request, "Only managers can change task dependencies.")
+            return redirect('projects:task-detail', task_id=task_id)
+
+        blocker = Task.objects.filter(project_id=task.project_id, pk=request.POST.get('blocker') or None).first()
+        if blocker is None:
+            messages.error(request, "Choose a task from this project.")
+        elif request.POST.get('action') == 'remove':
+            remove_dependency(blocker, task)
+            messages.success(request, f"'{blocker.task_name}' no longer blocks this task.")
+        else:
+            try:
+                add_dependency(blocker, task)
+                messages.success(request, f"'{blocker.task_name}' now blocks this task.")
+            except DependencyError as error:
+                messages.error(request, f"That would create a dependency loop: {error}")
+        return redirect('projects:task-detail', task_id=task_id)
+
+    def get(self, request, task_id):
+        return redirect('projects:task-detail', task_id=task_id)
+
+
+class TaskTimeView(SessionUserMixin, View):
+
+    def post(self, request, task_id):
+        task = get_object_or_404(Task.objects.select_related('project__organization'), task_id=task_id)
+        if not self.is_manager(task.project) and self.get_membership(task.project) is None:
+            messages.error(request, "Only project members can log time on this task.")
             return redirect('projects:task-detail', task_id=task_id)
 
+        form = TimeEntryForm(request.POST)
+        if form.is_valid():
+            entry = form.save(commit=False)
+            entry.task, entry.user = task, self.current_user
+            entry.save()
+            messages.success(request, f"Logged {entry.minutes} minutes.")
+        else:
+            messages.error(request, "Enter a date and between 1 and 1440 minutes.")
+        return redirect('projects:task-detail', task_id=task_id)
+
+    def get(self, request, task_id):
+        return redirect('projects:task-detail', task_id=task_id)
+
+
+class TimeEntryDeleteView(SessionUserMixin, View):
+
+    def post(self, request, entry_id):
+        entry = get_object_or_404(TimeEntry.objects.select_related('task__project__organization'), pk=entry_id)
+        if entry.user_id != self.current_user.pk and not self.is_manager(entry.task.project):
+            messages.error(request, "You can only remove your own time entries.")
+        else:
+            entry.delete()
+            messages.success(request, "Time entry removed.")
+        return redirect('projects:task-detail', task_id=entry.task_id)
+
+
+class TaskHistoryView(SessionUserMixin, View):
+    template_name = 'projects/task_history.html'
+    paginate_by = 25
+
+    def get(self, request, task_id):
+        task = get_object_or_404(Task.objects.select_related('project__organization'), task_id=task_id)
+        if not self.is_org_member(task.project.organization):
+            messages.error(request, "You must belong to this organization to view its tasks.")
+            return redirect('my_organizations')
+
+        page = Paginator(task_timeline(task), self.paginate_by).get_page(request.GET.get('page'))
+        user_ids = set()
+        for event in page:
+            if event.kind == TaskEvent.Kind.ASSIGNEES:
+                user_ids.update(split_ids(event.old_value), split_ids(event.new_value))
+        names = dict(User.objects.filter(pk__in=user_ids).values_list('pk', 'user_name'))
+
+        entries = []
+        for event in page:
+            if event.kind == TaskEvent.Kind.ASSIGNEES:
+                removed = [names.get(pk, f"#{pk}") for pk in split_ids(event.old_value)]
+                added = [names.get(pk, f"#{pk}") for pk in split_ids(event.new_value)]
+            else:
+                removed, added = [], []
+            entries.append({'event': event, 'removed': removed, 'added': added})
+
         context = {
             'task': task,
             'project': task.project,
-            'form': form,
-            'can_edit': can_edit,
+            'page': page,
+            'entries': entries,
             'user': self.current_user,
         }
         return render(request, self.template_name, context)
@@ -208,11 +515,12 @@ class ProjectCreateView(SessionUserMixin, View):
 
 class MyProjectsView(SessionUserMixin, View):
     template_name = 'projects/my_projects.html'
+    use_replica = True
 
     def get(self, request):
         user_projects = Project.objects.filter(
             organization__memberships__user=self.current_user
-        ).select_related('organization').distinct()
+        ).select_related('organization').defer('project_desc', 'desc_html').distinct()
         can_create_projects = OrganizationMember.objects.filter(
             user=self.current_user,
             role=OrgRole.Manager,
@@ -235,12 +543,18 @@ class ProjectDetailView(SessionUserMixin, View):
             messages.error(request, "You must belong to this organization to view its projects.")
             return redirect('my_organizations')
 
+        validator = self.get_validator(project, org_membership)
+        cached = validator.check(request)
+        if cached:
+            return cached
+
         membership = self.get_membership(project)
         user_role = membership.role if membership else None
         is_manager = self.is_manager(project)
 
-        project_members = ProjectMember.objects.filter(project=project).select_related('user')
-        tasks = Task.objects.filter(project=project).select_related('project')
+        project_members = member_cards(ProjectMember.objects.filter(project=project))
+        # Cards show the stored excerpt; skip loading full descriptions.
+        tasks = Task.objects.filter(project=project).select_related('project').defer('task_desc', 'desc_html')
         my_tasks = tasks.filter(assignments__user=self.current_user)
 
         context = {
@@ -253,9 +567,148 @@ class ProjectDetailView(SessionUserMixin, View):
             'org_membership': org_membership,
             'user': self.current_user,
         }
+        return validator.apply(render(request, self.template_name, context))
+
+    def get_validator(self, project, org_membership):
+        tasks = Task.objects.filter(project=project)
+        members = ProjectMember.objects.filter(project=project)
+        stamps = collect_stamps(
+            Project.objects.filter(pk=project.pk),
+            project_updated=F('updated_at'),
+            task_count=stamp(tasks, Count('pk')),
+            task_updated=stamp(tasks, Max('updated_at')),
+            assigned_count=stamp(tasks.filter(assignments__user=self.current_user), Count('pk')),
+            member_count=stamp(members, Count('pk')),
+            member_sum=stamp(members, Sum('user_id')),
+            manager_sum=stamp(members.filter(role=ProjectMember.Role.MANAGER.value), Sum('user_id')),
+            member_updated=stamp(members, Max('user__updated_at')),
+        )
+        return PageValidator.from_stamps(stamps, org_membership.role, *viewer_parts(self.current_user))
+
+
+class ProjectBoardView(SessionUserMixin, View):
+    template_name = 'projects/board.html'
+
+    def get(self, request, project_id):
+        project = get_object_or_404(Project.objects.select_related('organization'), project_id=project_id)
+        if not self.is_org_member(project.organization):
+            messages.error(request, "You must belong to this organization to view its projects.")
+            return redirect('my_organizations')
+
+        columns = {status: [] for status in Status.values}
+        cards = Task.objects.filter(project=project).order_by('status', 'rank', 'pk').values(
+            'task_id', 'task_name', 'status', 'due_date',
+        )
+        for card in cards:
+            columns[card['status']].append(card)
+
+        context = {
+            'project': project,
+            'columns': [(status, label, columns[status]) for status, label in Status.choices],
+            'can_move': self.is_manager(project),
+            'user': self.current_user,
+        }
         return render(request, self.template_name, context)
 
 
+class TaskMoveView(SessionUserMixin, View):
+    """``PATCH {"status", "before", "after"}``: drop a card between two neighbours, writing only that row."""
+    http_method_names = ['patch']
+
+    def patch(self, request, task_id):
+        task = get_object_or_404(Task.objects.select_related('project__organization'), task_id=task_id)
+        if not self.is_manager(task.project):
+            return JsonResponse({'error': "Only organization managers can move tasks."}, status=403)
+
+        try:
+            data = json.loads(request.body)
+            status = data.get('status') or task.status
+            before, after = (int(data[key]) if data.get(key) else None for key in ('before', 'after'))
+        except (AttributeError, TypeError, ValueError):
+            return JsonResponse({'error': "Expected a JSON object with status, before and after."}, status=400)
+        if status not in Status.values:
+            return JsonResponse({'error': "Unknown status."}, status=400)
+
+        with transaction.atomic():
+            try:
+                rank = rank_for_move(task, status, before, after)
+            except ValueError as error:
+                return JsonResponse({'error': str(error)}, status=400)
+            Task.objects.filter(pk=task.pk).update(
+                status=status, rank=rank, updated_at=timezone.now(), version=F('version') + 1,
+            )
+            record(Task.objects.filter(pk=task.pk))
+            if status != task.status:
+                tracked = {'status': task.status, 'due_date': task.due_date}
+                task.status = status
+                TaskEvent.objects.bulk_create(diff_events(task, tracked, set(), set(), actor=self.current_user))
+                refresh_inbox(task_ids=[task.pk])
+        return JsonResponse({'task_id': task.pk, 'status': status, 'rank': rank})
+
+
+class ProjectCloneView(SessionUserMixin, View):
+    template_name = 'projects/clone_project.html'
+
+    def get(self, request, project_id):
+        project = get_object_or_404(Project.objects.select_related('organization'), project_id=project_id)
+        if not self.is_manager(project):
+            messages.error(request, "Only organization managers can duplicate projects.")
+            return redirect('projects:project-detail', project_id=project_id)
+        form = ProjectCloneForm(initial={'project_name': f"Copy of {project.project_name}"[:100]})
+        return render(request, self.template_name, {'form': form, 'project': project, 'user': self.current_user})
+
+    def post(self, request, project_id):
+        project = get_object_or_404(Project.objects.select_related('organization'), project_id=project_id)
+        if not self.is_manager(project):
+            messages.error(request, "Only organization managers can duplicate projects.")
+            return redirect('projects:project-detail', project_id=project_id)
+
+        form = ProjectCloneForm(request.POST)
+        if form.is_valid():
+            clone = clone_project(project, self.current_user, **form.cleaned_data)
+            messages.success(request, f"Created '{clone.project_name}' from '{project.project_name}'.")
+            return redirect('projects:project-detail', project_id=clone.project_id)
+
+        return render(request, self.template_name, {'form': form, 'project': project, 'user': self.current_user})
+
+
+class ProjectAnalyticsView(SessionUserMixin, View):
+
+    def get(self, request, project_id):
+        project = get_object_or_404(Project.objects.select_related('organization'), project_id=project_id)
+        if not self.is_manager(project):
+            return JsonResponse({'error': "Only organization managers can view project analytics."}, status=403)
+
+        report = cached_report(f'project:{project.pk}', Task.objects.filter(project=project), date.today())
+        return JsonResponse(report)
+
+
+class ProjectDependencyGraphView(SessionUserMixin, View):
+
+    def get(self, request, project_id):
+        project = get_object_or_404(Project.objects.select_related('organization'), project_id=project_id)
+        if not self.is_org_member(project.organization):
+            return JsonResponse({'error': "You must belong to this organization to view its projects."}, status=403)
+        return JsonResponse(dependency_graph(project.pk, date.today()))
+
+
+class ChangeFeedView(SessionUserMixin, View):
+    """``GET ?since=<seq>&limit=<n>``: what changed in the user's organizations after ``since``."""
+
+    def get(self, request):
+        try:
+            since = max(int(request.GET.get('since') or 0), 0)
+            limit = min(max(int(request.GET.get('limit') or FEED_LIMIT), 1), MAX_FEED_LIMIT)
+        except ValueError:
+            return JsonResponse({'error': "since and limit must be integers."}, status=400)
+        if since and since < current_horizon():
+            return JsonResponse({'error': "This cursor is older than the retained history; sync again from 0.", 'reset': True}, status=410)
+        if since and joined_since(self.current_user, since):
+            return JsonResponse({'error': "You joined an organization after this cursor; sync again from 0.", 'reset': True}, status=410)
+        payload = feed_payload(self.current_user, since, limit)
+        return JsonResponse(payload, json_dumps_params={'separators': (',', ':')})
+
+
 class ProjectTaskCreateView(SessionUserMixin, View):
     template_name = 'projects/create_task.html'
 
@@ -266,8 +719,19 @@ class ProjectTaskCreateView(SessionUserMixin, View):
             messages.error(request, "Only organization managers can create tasks for this project.")
             return redirect('projects:project-detail', project_id=project_id)
 
-        form = TaskForm(project=project, user=self.current_user)
-        return render(request, self.template_name, {'form': form, 'project': project, 'user': self.current_user})
+        templates = list(project.task_templates.filter(is_active=True).prefetch_related('default_assignees'))
+        initial = {}
+        chosen = next((t for t in templates if str(t.pk) == request.GET.get('template')), None)
+        if chosen:
+            initial = {
+                'task_name': chosen.template_name,
+                'task_desc': chosen.task_desc,
+                'assignees': list(chosen.default_assignees.all()),
+            }
+        form = TaskForm(project=project, user=self.current_user, initial=initial)
+        return render(request, self.template_name, {
+            'form': form, 'project': project, 'user': self.current_user, 'task_templates': templates,
+        })
 
     def post(self, request, project_id):
         project = get_object_or_404(Project, project_id=project_id)
@@ -318,25 +782,25 @@ class ProjectMemberAddView(SessionUserMixin, View):
 
         username_to_add = request.POST.get('username')
 
-        try:
-            user_to_add = User.objects.get(user_name=username_to_add)
-        except User.DoesNotExist:
+        user_to_add = None
+        if user_names.might_exist(username_to_add):
+            user_to_add = User.objects.filter(user_name=username_to_add).annotate(
+                in_organization=Exists(OrganizationMember.objects.filter(
+                    organization_id=project.organization_id, user=OuterRef('pk'),
+                )),
+            ).first()
+        if user_to_add is None:
             messages.error(request, "User not found. Please check the username.")
             return redirect('projects:project-detail', project_id=project_id)
 
-        if ProjectMember.objects.filter(project=project, user=user_to_add).exists():
-            messages.warning(request, f"{user_to_add.user_name} is already a member of this project.")
+        if not user_to_add.in_organization:
+            messages.error(request, "Add this user to the organization before assigning them to the project.")
             return redirect('projects:project-detail', project_id=project_id)
 
-        if not OrganizationMember.objects.filter(organization=project.organization, user=user_to_add).exists():
-            messages.error(request, "Add this user to the organization before assigning them to the project.")
+        if create_unique(ProjectMember, project=project, user=user_to_add, role=ProjectMember.Role.MEMBER.value) is None:
+            messages.warning(request, f"{user_to_add.user_name} is already a member of this project.")
             return redirect('projects:project-detail', project_id=project_id)
 
-        ProjectMember.objects.create(
-            project=project,
-            user=user_to_add,
-            role=ProjectMember.Role.MEMBER.value
-        )
         messages.success(request, f"{user_to_add.user_name} was added to the project!")
         return redirect('projects:project-detail', project_id=project_id)
 
@@ -43,4 +43,51 @@ document.addEventListener('DOMContentLoaded', function () {
     });
   }
 
+  const board = document.querySelector('.board[data-move-url]');
+  if (board) {
+    const csrf = document.querySelector('[name=csrfmiddlewaretoken]').value;
+    let dragged = null;
+
+    board.addEventListener('dragstart', (event) => {
+      dragged = event.target.closest('.board__card');
+      if (dragged) dragged.classList.add('board__card--dragging');
+    });
+    board.addEventListener('dragend', () => {
+      if (dragged) dragged.classList.remove('board__card--dragging');
+      dragged = null;
+    });
+    board.addEventListener('dragover', (event) => {
+      const list = event.target.closest('.board__cards');
+      if (!dragged || !list) return;
+      event.preventDefault();
+      const over = event.target.closest('.board__card');
+      if (over && over !== dragged) {
+        const box = over.getBoundingClientRect();
+        list.insertBefore(dragged, event.clientY < box.top + box.height / 2 ? over : over.nextSibling);
+      } else if (!over) {
+        list.appendChild(dragged);
+      }
+    });
+    board.addEventListener('drop', (event) => {
+      const column = event.target.closest('.board__column');
+      if (!dragged || !column) return;
+      event.preventDefault();
+      const card = dragged;
+      const before = card.previousElementSibling;
+      const after = card.nextElementSibling;
+      // Only the moved card is sent; its neighbours fix the new position.
+      fetch(board.dataset.moveUrl.replace('/0/', '/' + card.dataset.taskId + '/'), {
+        method: 'PATCH',
+        headers: {'Content-Type': 'application/json', 'X-CSRFToken': csrf},
+        body: JSON.stringify({
+          status: column.dataset.status,
+          before: before ? before.dataset.taskId : null,
+          after: after ? after.dataset.taskId : null,
+        }),
+      }).then((response) => {
+        if (!response.ok) window.location.reload();
+      });
+    });
+  }
+
 });
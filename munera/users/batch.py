@@ -0,0 +1,91 @@
+"""
+Named read-only sub-queries for the batch endpoint (``users.views.Batch``).
+
+A client asks for several home-screen pieces in one request. The session user
+and their organization memberships are resolved once into a ``BatchContext``
+that every section reads from, and each section is a single query returning
+plain JSON rows. Sections run one after another on the request's connection:
+Django connections are per thread and SQLite serializes access, so fanning
+out to threads would add connections without adding parallelism here.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db.models import Count, F, Q, Window
+
+from organization.models import OrganizationMember, Role as OrgRole
+from projects.models import Project, Status
+from projects.services import my_tasks
+
+OPEN_TASK_LIMIT = 50
+UPCOMING_DAYS = 14
+UPCOMING_LIMIT = 20
+
+
+@dataclass(frozen=True)
+class BatchContext:
+    user: object
+    today: object
+    memberships: tuple
+
+    @classmethod
+    def load(cls, user, today):
+        memberships = OrganizationMember.objects.filter(user=user).order_by('organization__org_name')
+        return cls(user, today, tuple(memberships.values_list('organization_id', 'organization__org_name', 'role')))
+
+    @property
+    def is_manager(self):
+        return any(role == OrgRole.Manager for _, _, role in self.memberships)
+
+
+TASK_COLUMNS = ('pk', 'task_name', 'project_id', 'project__project_name', 'status', 'due_date')
+
+
+def _task_row(pk, name, project_id, project_name, status, due):
+    return {'id': pk, 'name': name, 'project': project_id, 'project_name': project_name, 'status': status, 'due': due}
+
+
+def organizations(context):
+    return [
+        {'id': org_id, 'name': name, 'role': role}
+        for org_id, name, role in context.memberships
+    ]
+
+
+def projects(context):
+    rows = Project.objects.filter(members=context.user).annotate(
+        open_tasks=Count('tasks', filter=Q(tasks__archived_at__isnull=True) & ~Q(tasks__status=Status.Done)),
+    ).order_by('-start_date', '-project_id')
+    return [
+        {'id': pk, 'name': name, 'organization': org_id, 'start': start, 'end': end, 'open_tasks': open_tasks}
+        for pk, name, org_id, start, end, open_tasks
+        in rows.values_list('project_id', 'project_name', 'organization_id', 'start_date', 'end_date', 'open_tasks')
+    ]
+
+
+def open_tasks(context):
+    # The total rides along on every row, so the count costs no second query.
+    tasks = my_tasks(context.user, open_only=True).annotate(total=Window(Count('pk'))).order_by(
+        F('due_date').asc(nulls_last=True), 'pk',
+    )
+    rows = list(tasks.values_list('total', *TASK_COLUMNS)[:OPEN_TASK_LIMIT])
+    return {'count': rows[0][0] if rows else 0, 'items': [_task_row(*row[1:]) for row in rows]}
+
+
+def upcoming_deadlines(context):
+    end = context.today + timedelta(days=UPCOMING_DAYS)
+    tasks = my_tasks(context.user, open_only=True).filter(due_date__range=(context.today, end))
+    return [_task_row(*row) for row in tasks.values_list(*TASK_COLUMNS)[:UPCOMING_LIMIT]]
+
+
+SECTIONS = {
+    'organizations': organizations,
+    'projects': projects,
+    'open_tasks': open_tasks,
+    'upcoming_deadlines': upcoming_deadlines,
+}
+
+
+def run_batch(context, names):
+    """``{name: section(context)}`` for each requested name, in request order."""
+    return {name: SECTIONS[name](context) for name in names}
@@ -1,6 +1,16 @@
 from django.contrib.auth.hashers import make_password, check_password
 from django.db import models
 
+
+def format_display_name(preference, first_name, last_name, alias, user_name):
+    if preference == 'alias' and alias:
+        return alias
+    elif preference == 'username':
+        return user_name
+    else:
+        return f"{first_name} {last_name}"
+
+
 class User(models.Model):
     USERNAME_FIELD = 'user_name'
     REQUIRED_FIELDS = ['email', 'first_name', 'last_name']
@@ -17,6 +27,7 @@ class User(models.Model):
     is_superuser = models.BooleanField(default=False)
     created_on = models.DateField(auto_now_add=True, help_text="Account Created On", verbose_name="Created On")
     updated_on = models.DateField(auto_now=True, help_text="Account Updated On", verbose_name="Updated On")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Profile Last Modified At", verbose_name="Updated At")
 
     def set_password(self, password):
         self.password = make_password(password)
@@ -87,11 +98,8 @@ class User(models.Model):
 
     @property
     def display_name(self):
-        if self.display_name_preference == 'alias' and self.alias:
-            return self.alias
-        elif self.display_name_preference == 'username':
-            return self.user_name
-        else:
-            return f"{self.first_name} {self.last_name}"
+        return format_display_name(
+            self.display_name_preference, self.first_name, self.last_name, self.alias, self.user_name
+        )
     
     
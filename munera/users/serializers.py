@@ -1,5 +1,7 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
+from munera.integrity import clashing_fields
 from users.models import User
 from users.services import create_user as create_user_service, authenticate_user
 
@@ -34,27 +36,31 @@ class UserCreateSerializer(serializers.ModelSerializer):
 
         if password and len(password) < 8:
             raise serializers.ValidationError({"password": "Password must be at least 8 characters."})
-        
-        username = attrs.get("username")
-        email = attrs.get("email")
-
-        if User.objects.filter(user_name=username).exists():
-            raise serializers.ValidationError({"username": "Username is already taken."})
-        if User.objects.filter(email=email).exists():
-            raise serializers.ValidationError({"email": "Email is already registered."})
 
         return attrs
 
     def create(self, validated_data):
-        user = create_user_service(
-            first_name=validated_data.get("first_name"),
-            last_name=validated_data.get("last_name"),
-            email=validated_data.get("email"),
-            username=validated_data.get("username"),
-            password=validated_data.get("password"),
-            alias=validated_data.get("alias"),
-        )
-        return user
+        """Insert and let the unique columns reject duplicates; raises ``ValidationError`` from ``save()``."""
+        try:
+            with transaction.atomic():
+                return create_user_service(
+                    first_name=validated_data.get("first_name"),
+                    last_name=validated_data.get("last_name"),
+                    email=validated_data.get("email"),
+                    username=validated_data.get("username"),
+                    password=validated_data.get("password"),
+                    alias=validated_data.get("alias"),
+                )
+        except IntegrityError:
+            taken = clashing_fields(User, user_name=validated_data.get("username"), email=validated_data.get("email"))
+            if not taken:
+                raise
+        errors = {}
+        if "user_name" in taken:
+            errors["username"] = "Username is already taken."
+        if "email" in taken:
+            errors["email"] = "Email is already registered."
+        raise serializers.ValidationError(errors)
 
 
 class LoginSerializer(serializers.Serializer):
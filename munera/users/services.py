@@ -1,4 +1,29 @@
-from users.models import User
+from dataclasses import dataclass
+
+from munera.bloom import NegativeLookup
+from users.models import User, format_display_name
+
+# Definite misses for logins and member lookups skip the query.
+user_names = NegativeLookup('users.User', 'user_name')
+
+MEMBER_CARD_FIELDS = (
+    'user_id',
+    'role',
+    'user__user_name',
+    'user__first_name',
+    'user__last_name',
+    'user__alias',
+    'user__display_name_preference',
+)
+
+
+@dataclass(slots=True, frozen=True)
+class MemberCard:
+    user_id: int
+    user_name: str
+    display_name: str
+    role: str
+
 
 def create_user(first_name, last_name, email, username, password, alias = None):
         newUser =  User(first_name=first_name, last_name=last_name, email=email, user_name=username, alias=alias)
@@ -7,6 +32,8 @@ def create_user(first_name, last_name, email, username, password, alias = None):
         return newUser
 
 def authenticate_user(*, username, password):
+    if not user_names.might_exist(username):
+        return None
     try:
         user = User.objects.get(user_name=username)
     except User.DoesNotExist:
@@ -15,3 +42,20 @@ def authenticate_user(*, username, password):
     if user.check_password(password):
         return user
     return None
+
+
+def member_cards(memberships):
+    """Render-ready cards for an ``OrganizationMember``/``ProjectMember`` queryset.
+
+    Reads only the columns a member list shows instead of full ``User`` rows.
+    """
+    return [
+        MemberCard(
+            user_id=user_id,
+            user_name=user_name,
+            display_name=format_display_name(preference, first_name, last_name, alias, user_name),
+            role=role,
+        )
+        for user_id, role, user_name, first_name, last_name, alias, preference
+        in memberships.values_list(*MEMBER_CARD_FIELDS)
+    ]
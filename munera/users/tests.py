@@ -1,7 +1,21 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 
+from munera import ratelimit
+from munera.bloom import BloomFilter
+from munera.cache import cache_config
+from munera.sessions.cached_db import SessionStore
+from organization.models import Organization, OrganizationMember, Role
+from projects.models import ProjectMember, Status
+from projects.tests import ProjectTestCase
 from users.models import User
+from users.services import member_cards, user_names
 
 
 class UserSignupTests(TestCase):
@@ -31,6 +45,26 @@ class UserSignupTests(TestCase):
         self.assertNotEqual(user.password, 'Password123')
         self.assertTrue(user.check_password('Password123'))
 
+    def test_duplicate_username_or_email_is_reported_without_creating_a_user(self):
+        User.objects.create(first_name='Jane', last_name='Doe', email='jane@example.com', user_name='jdoe')
+        url = reverse('create_account')
+        payload = {
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'username': 'jdoe',
+            'email': 'john@example.com',
+            'password': 'Password123',
+            'password_confirm': 'Password123',
+        }
+        resp = self.client.post(url, data=payload)
+        self.assertContains(resp, 'Username is already taken.')
+        self.assertNotContains(resp, 'Email is already registered.')
+
+        resp = self.client.post(url, data={**payload, 'username': 'john', 'email': 'jane@example.com'})
+        self.assertContains(resp, 'Email is already registered.')
+        self.assertNotContains(resp, 'Username is already taken.')
+        self.assertEqual(User.objects.count(), 1)
+
     def test_post_create_account_password_mismatch(self):
         url = reverse('create_account')
         payload = {
@@ -114,3 +148,199 @@ class UserLoginTests(TestCase):
         resp = self.client.post(url, data={'username': 'jdoe', 'password': 'wrong'})
         self.assertEqual(resp.status_code, 200)
         self.assertContains(resp, 'Invalid username or password')
+
+
+class HomeConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User(first_name='John', last_name='Doe', email='john@example.com', user_name='jdoe')
+        self.user.set_password('Password123')
+        self.user.save()
+        session = self.client.session
+        session['user_id'] = self.user.pk
+        session.save()
+
+    def test_home_returns_304_until_profile_changes(self):
+        url = reverse('home')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.user.theme = User.ThemeChoices.DARK
+        self.user.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class MemberCardTests(TestCase):
+    def test_cards_follow_display_name_preference(self):
+        owner = User.objects.create(
+            first_name='Jane', last_name='Roe', email='jane@example.com', user_name='jroe', password='x',
+            alias='JR', display_name_preference=User.DisplayNameChoices.ALIAS,
+        )
+        member = User.objects.create(
+            first_name='John', last_name='Doe', email='john@example.com', user_name='jdoe', password='x',
+            display_name_preference=User.DisplayNameChoices.USERNAME,
+        )
+        organization = Organization.objects.create(org_creator=owner, org_name='Acme', org_code='ACME1234')
+        OrganizationMember.objects.create(organization=organization, user=owner, role=Role.Manager)
+        OrganizationMember.objects.create(organization=organization, user=member, role=Role.Member)
+
+        with self.assertNumQueries(1):
+            cards = member_cards(organization.memberships.order_by('user__user_name'))
+        self.assertEqual([card.display_name for card in cards], ['jdoe', 'JR'])
+        self.assertEqual([card.display_name for card in cards], [member.display_name, owner.display_name])
+        self.assertEqual(cards[1].role, Role.Manager)
+
+
+class CacheAndSessionTests(TestCase):
+    def test_cache_url_parsing(self):
+        self.assertEqual(cache_config('redis://:secret@cache:6379/1?timeout=60'), {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://:secret@cache:6379/1',
+            'TIMEOUT': 60,
+        })
+        self.assertEqual(cache_config('file:///var/tmp/munera')['LOCATION'], '/var/tmp/munera')
+        self.assertEqual(cache_config('')['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+
+        with mock.patch('munera.cache.find_spec', return_value=None):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'needs the redis package'):
+                cache_config('redis://cache:6379/0')
+
+    def test_unchanged_session_is_not_written(self):
+        session = SessionStore()
+        session['user_id'] = 7
+        session.save()
+
+        session = SessionStore(session.session_key)
+        session['user_id'] = 7
+        with self.assertNumQueries(0):
+            session.save()
+
+        session['user_id'] = 8
+        session.save()
+        stored = Session.objects.get(session_key=session.session_key).get_decoded()
+        self.assertEqual(stored['user_id'], 8)
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        ratelimit.get_store().reset()
+
+    def test_login_attempts_are_throttled_per_username_before_any_query(self):
+        url = reverse('login')
+        for _ in range(5):
+            resp = self.client.post(url, {'username': 'ghost', 'password': 'wrong'})
+            self.assertEqual(resp.status_code, 200)
+
+        with self.assertNumQueries(0):
+            resp = self.client.post(url, {'username': 'GHOST', 'password': 'wrong'})
+        self.assertEqual(resp.status_code, 429)
+        self.assertContains(resp, 'Too many login attempts', status_code=429)
+        self.assertEqual(self.client.post(url, {'username': 'other', 'password': 'wrong'}).status_code, 200)
+
+        counts = ratelimit.stats()
+        self.assertEqual(counts['login:username'], {'allowed': 6, 'rejected': 1})
+        self.assertEqual(counts['login:ip'], {'allowed': 7, 'rejected': 0})
+
+    def test_successful_logins_do_not_spend_the_username_budget(self):
+        user = User(first_name='A', last_name='B', email='sam@example.com', user_name='sam')
+        user.set_password('Password123')
+        user.save()
+        url = reverse('login')
+        for _ in range(8):
+            self.client.post(url, {'username': 'sam', 'password': 'Password123'})
+            self.assertIn('user_id', self.client.session)
+            self.client.get(reverse('logout'))
+        self.assertEqual(ratelimit.stats()['login:username'], {'allowed': 0, 'rejected': 0})
+
+    def test_memory_store_drops_refilled_buckets(self):
+        store = ratelimit.MemoryStore()
+        limit = ratelimit._registry['login:username']
+        for n in range(store.sweep_after - 1):
+            store.consume(f'guess-{n}', limit, 0)
+        self.assertEqual(len(store), store.sweep_after - 1)
+
+        # A minute later every guess has refilled; the bucket that filled the map triggers a sweep.
+        store.consume('late', limit, 61)
+        self.assertEqual(len(store), 1)
+
+    @override_settings(RATELIMIT_PROXY_COUNT=1)
+    def test_forwarded_address_is_used_behind_a_proxy(self):
+        request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.9')
+        self.assertEqual(ratelimit.client_ip(request), '203.0.113.9')
+        with self.settings(RATELIMIT_PROXY_COUNT=0):
+            self.assertEqual(ratelimit.client_ip(request), '10.0.0.1')
+
+    def test_counters_are_admin_only(self):
+        user = User.objects.create(first_name='A', last_name='B', email='a@example.com', user_name='admin')
+        session = self.client.session
+        session['user_id'] = user.pk
+        session.save()
+        self.assertEqual(self.client.get(reverse('ratelimit_stats')).status_code, 403)
+
+        User.objects.filter(pk=user.pk).update(is_superuser=True)
+        resp = self.client.get(reverse('ratelimit_stats'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('join:user', resp.json()['limits'])
+
+
+class UserNameLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(first_name='A', last_name='B', email='sam@example.com', user_name='sam')
+
+    def test_only_new_names_are_published_and_applied_without_a_rebuild(self):
+        self.assertTrue(user_names.might_exist('sam'))
+        generation = cache.get(user_names.generation_key)
+
+        # A profile edit that keeps the username publishes nothing.
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(pk=self.user.pk)
+            user.first_name = 'Sam'
+            user.save()
+        self.assertEqual(cache.get(user_names.generation_key), generation)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create(first_name='N', last_name='B', email='newbie@example.com', user_name='newbie')
+        self.assertEqual(cache.get(user_names.generation_key), generation + 1)
+
+        # Another worker one generation behind adds the new name instead of rescanning the table.
+        user_names._generation = generation
+        user_names._filter = BloomFilter(user_names._capacity)
+        with mock.patch.object(user_names, '_rebuild', side_effect=AssertionError("rebuilt")), self.assertNumQueries(0):
+            self.assertTrue(user_names.might_exist('newbie'))
+        self.assertEqual(user_names._generation, generation + 1)
+
+
+class BatchTests(ProjectTestCase):
+    def test_sections_share_one_context_and_revalidate(self):
+        today = date.today()
+        soon = self.make_task('Soon', due_date=today + timedelta(days=2), assignees=[self.member])
+        later = self.make_task('Later', assignees=[self.member])
+        self.make_task('Shipped', status=Status.Done, assignees=[self.member])
+        self.login(self.member)
+        url = reverse('batch')
+
+        # User and stamps, the shared membership context, then one query per remaining section.
+        with self.assertNumQueries(6):
+            response = self.client.get(url, {'q': 'organizations,projects,open_tasks,upcoming_deadlines'})
+        results = response.json()['results']
+        self.assertEqual(results['organizations'], [{'id': self.organization.pk, 'name': 'Acme', 'role': Role.Member}])
+        self.assertEqual([(row['name'], row['open_tasks']) for row in results['projects']], [('Website', 2)])
+        self.assertEqual(results['open_tasks']['count'], 2)
+        self.assertEqual([row['id'] for row in results['open_tasks']['items']], [soon.pk, later.pk])
+        self.assertEqual([row['id'] for row in results['upcoming_deadlines']], [soon.pk])
+        self.assertFalse(response.json()['can_create_projects'])
+
+        query = {'q': 'organizations,projects,open_tasks,upcoming_deadlines'}
+        self.assertEqual(self.client.get(url, query, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(url, {'q': 'projects'}, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        self.assertEqual(self.client.get(url, {'q': 'everything'}).status_code, 400)
+
+    def test_tasks_assigned_after_leaving_the_project_still_revalidate(self):
+        task = self.make_task('Handover', assignees=[self.member])
+        ProjectMember.objects.filter(project=self.project, user=self.member).delete()
+        self.login(self.member)
+        for url in (reverse('home'), reverse('batch') + '?q=open_tasks'):
+            etag = self.client.get(url)['ETag']
+            task.status = Status.InProgress if task.status != Status.InProgress else Status.Testing
+            task.save()
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
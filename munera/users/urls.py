@@ -6,7 +6,9 @@ urlpatterns = [
     path('create_account/', Create_Account.as_view(), name='create_account'),
     path('logout/', Logout.as_view(), name='logout'),
     path('home/', Home.as_view(), name='home'),
+    path('batch/', Batch.as_view(), name='batch'),
     path('profile/', Profile.as_view(), name='profile'),
     path('edit_profile/', EditProfile.as_view(), name='edit_profile'),
     path('change_password/', ChangePassword.as_view(), name='change_password'),
+    path('ratelimit/', RateLimitStats.as_view(), name='ratelimit_stats'),
     ]
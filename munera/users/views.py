@@ -1,12 +1,19 @@
 from datetime import date
 
 from django.contrib import messages
-from django.db.models import Count, Q, F
+from django.db.models import Count, Max, Q, F
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views import View
+from rest_framework.exceptions import ValidationError
+from munera import ratelimit
+from munera.conditional import PageValidator, collect_stamps, stamp, viewer_parts
 from organization.models import Organization, OrganizationMember, Role as OrgRole
-from projects.models import Project, ProjectMember, Task, Status
+from projects.models import Project, ProjectMember, Task, TaskAssignment, Status
+from projects.services import my_tasks
+from users.batch import SECTIONS, BatchContext, run_batch
 from users.forms import UserProfileForm
 from users.models import User
 from users.serializers import LoginSerializer, UserCreateSerializer
@@ -22,11 +29,31 @@ def get_session_user(request):
         return None
 
 
+LOGIN_LIMITS = (
+    ratelimit.Limit('login:ip', capacity=20, per=60, key=ratelimit.client_ip),
+)
+# Charged only for wrong passwords, so knowing a username is not enough to lock its owner out.
+FAILED_LOGIN_LIMITS = (
+    ratelimit.Limit('login:username', capacity=5, per=300, key=lambda request: request.POST.get('username')),
+)
+
+
+def login_throttled(request, retry_after):
+    messages.error(request, f"Too many login attempts. Try again in {int(retry_after) + 1} seconds.")
+    form_data = {'username': request.POST.get('username', '')}
+    return render(request, 'login.html', {"form_data": form_data}, status=429)
+
+
+@method_decorator(ratelimit.rate_limit(*LOGIN_LIMITS, on_reject=login_throttled), name='post')
 class Login(View):
     def get(self, request):
         return render(request, 'login.html', {"form_data": {}})
 
     def post(self, request):
+        retry_after = ratelimit.exhausted(request, FAILED_LOGIN_LIMITS)
+        if retry_after:
+            return login_throttled(request, retry_after)
+
         serializer = LoginSerializer(data=request.POST)
         if serializer.is_valid():
             user = serializer.validated_data["user"]
@@ -36,6 +63,7 @@ class Login(View):
             messages.success(request, "Welcome back!")
             return redirect('home')
 
+        ratelimit.check(request, FAILED_LOGIN_LIMITS)
         form_data = {
             'username': request.POST.get('username', ''),
         }
@@ -59,9 +87,14 @@ class Create_Account(View):
     def post(self, request):
         serializer = UserCreateSerializer(data=request.POST)
         if serializer.is_valid():
-            serializer.save()
-            messages.success(request, "Account created! Please log in.")
-            return redirect('login')
+            try:
+                serializer.save()
+                messages.success(request, "Account created! Please log in.")
+                return redirect('login')
+            except ValidationError as error:
+                errors = error.detail
+        else:
+            errors = serializer.errors
 
         form_data = {
             'username': request.POST.get('username', ''),
@@ -72,7 +105,6 @@ class Create_Account(View):
         }
         messages.error(request, "Please correct the errors below.")
         try:
-            errors = serializer.errors
             if isinstance(errors, dict):
                 for _, errs in errors.items():
                     if isinstance(errs, (list, tuple)):
@@ -88,8 +120,35 @@ class Create_Account(View):
         return render(request, self.template_name, {"form_data": form_data})
 
 
+def home_validator(user, today, *parts):
+    """ETag/Last-Modified for pages and payloads built from the user's home-screen data."""
+    memberships = OrganizationMember.objects.filter(user=user)
+    project_memberships = ProjectMember.objects.filter(user=user)
+    projects = Project.objects.filter(members=user)
+    tasks = Task.objects.filter(project__members=user)
+    # Assignments can outlive project membership, so the listed tasks are stamped on their own.
+    listed = my_tasks(user)
+    stamps = collect_stamps(
+        User.objects.filter(pk=user.pk),
+        org_count=stamp(memberships, Count('pk')),
+        manager_count=stamp(memberships.filter(role=OrgRole.Manager), Count('pk')),
+        project_member_count=stamp(project_memberships, Count('pk')),
+        project_manager_count=stamp(
+            project_memberships.filter(role=ProjectMember.Role.MANAGER.value), Count('pk')
+        ),
+        project_updated=stamp(projects, Max('updated_at')),
+        task_count=stamp(tasks, Count('pk')),
+        task_updated=stamp(tasks, Max('updated_at')),
+        listed_count=stamp(listed, Count('pk')),
+        listed_updated=stamp(listed, Max('updated_at')),
+        assigned_count=stamp(TaskAssignment.objects.filter(user=user), Count('pk')),
+    )
+    return PageValidator.from_stamps(stamps, today, *viewer_parts(user), *parts)
+
+
 class Home(View):
     template_name = 'home.html'
+    use_replica = True
 
     def get(self, request):
         user = get_session_user(request)
@@ -97,22 +156,19 @@ class Home(View):
             return redirect('login')
 
         today = date.today()
+        validator = home_validator(user, today)
+        cached = validator.check(request)
+        if cached:
+            return cached
 
         memberships = OrganizationMember.objects.filter(user=user).select_related('organization')
         organizations = Organization.objects.filter(members=user).select_related('org_creator')
-        projects_qs = Project.objects.filter(members=user).select_related('organization')
+        projects_qs = Project.objects.filter(members=user).select_related('organization').defer('project_desc', 'desc_html')
         projects = projects_qs.annotate(
-            open_tasks=Count('tasks', filter=~Q(tasks__status=Status.Done))
+            open_tasks=Count('tasks', filter=Q(tasks__archived_at__isnull=True) & ~Q(tasks__status=Status.Done))
         )
-        manager_task_filter = Q(
-            project__memberships__user=user,
-            project__memberships__role=ProjectMember.Role.MANAGER.value,
-        )
-        user_tasks = Task.objects.filter(
-            Q(assignments__user=user) | manager_task_filter
-        ).select_related('project').distinct()
-        open_tasks = user_tasks.exclude(status=Status.Done)
-        focus_task = open_tasks.exclude(due_date__isnull=True).order_by('due_date').first() or open_tasks.first()
+        open_tasks = my_tasks(user, open_only=True).select_related('project')
+        focus_task = open_tasks.exclude(due_date__isnull=True).first() or open_tasks.first()
         open_tasks_ordered = open_tasks.order_by(F('due_date').asc(nulls_last=True))
         can_create_projects = OrganizationMember.objects.filter(user=user, role=OrgRole.Manager).exists()
 
@@ -126,13 +182,44 @@ class Home(View):
             "open_tasks_count": open_tasks.count(),
             "due_today_count": open_tasks.filter(due_date=today).count(),
             "open_tasks": open_tasks_ordered[:8],
-            "upcoming_tasks": open_tasks.filter(due_date__gte=today).order_by('due_date')[:5],
+            "upcoming_tasks": open_tasks.filter(due_date__gte=today)[:5],
             "recent_projects": projects_qs.order_by('-start_date', '-project_id')[:4],
             "focus_task": focus_task,
             "can_create_projects": can_create_projects,
             "can_create_tasks": can_create_projects,
         }
-        return render(request, self.template_name, context)
+        return validator.apply(render(request, self.template_name, context))
+
+
+class Batch(View):
+    """``GET ?q=organizations,projects,...``: several home-screen sections in one response."""
+    use_replica = True
+
+    def get(self, request):
+        user = get_session_user(request)
+        if not user:
+            return JsonResponse({'error': "Log in to use the API."}, status=401)
+
+        names = list(dict.fromkeys(name for value in request.GET.getlist('q') for name in value.split(',') if name))
+        unknown = [name for name in names if name not in SECTIONS]
+        if unknown:
+            return JsonResponse({'error': f"Unknown queries: {', '.join(unknown)}.", 'available': list(SECTIONS)}, status=400)
+
+        today = date.today()
+        names = names or list(SECTIONS)
+        validator = home_validator(user, today, *names)
+        cached = validator.check(request)
+        if cached:
+            return cached
+
+        context = BatchContext.load(user, today)
+        payload = {
+            'user': user.pk,
+            'today': today,
+            'can_create_projects': context.is_manager,
+            'results': run_batch(context, names),
+        }
+        return validator.apply(JsonResponse(payload, json_dumps_params={'separators': (',', ':')}))
 
 
 class Profile(View):
@@ -219,3 +306,11 @@ class ChangePassword(View):
         user.save()
         messages.success(request, "Password changed successfully.")
         return redirect('profile')
+
+
+class RateLimitStats(View):
+    def get(self, request):
+        user = get_session_user(request)
+        if not user or not user.is_superuser:
+            return JsonResponse({'error': "Only administrators can view rate limit counters."}, status=403)
+        return JsonResponse({'limits': ratelimit.stats()})